@@ -16,9 +16,30 @@ def extract_text_from_ocr(img,ocr_engine="tesseract"):
         except:
             raise Exception("pytesseract not installed. If using Window please download tesseract and pass the path")
 
+def extract_text_from_ocr_batch(imgs, ocr_engine="tesseract", max_workers: int = 4):
+    """
+    OCR of several images (file paths or file-like objects), in order.
+    tesseract runs as a subprocess per image, so threads run them in parallel.
+    An image that fails gets None, the other images are still read.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def ocr_or_none(img):
+        try:
+            return extract_text_from_ocr(img, ocr_engine=ocr_engine)
+        except Exception as e:
+            print("OCR failed for an image ", e)
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+        return list(pool.map(ocr_or_none, imgs))
+
 # Import necessary libraries
-from transformers import Pix2StructProcessor, Pix2StructForConditionalGeneration
-import torch 
+# transformers and torch are imported when a model is created, not with the module
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+CHART_PROMPT = "Generate underlying data table of the table/chart/figure below:"
 
 class ImageChartDataExtractor():
     """
@@ -32,6 +53,8 @@ class ImageChartDataExtractor():
     """
     # Define the constructor
     def __init__(self, model_name="google/pix2struct-base") -> None:
+        from transformers import Pix2StructProcessor, Pix2StructForConditionalGeneration
+        import torch
         # Initialize the Pix2StructProcessor and Pix2StructForConditionalGeneration
         self.processor = Pix2StructProcessor.from_pretrained(model_name)
         self.model = Pix2StructForConditionalGeneration.from_pretrained(model_name)
@@ -40,6 +63,8 @@ class ImageChartDataExtractor():
         # Move the model to the selected device
         self.model.to(self.device)
         
+    prompt = CHART_PROMPT
+
     # Define the method to extract table from image
     def extract_chart_data_from_image(self, img) -> str:
         """
@@ -52,16 +77,116 @@ class ImageChartDataExtractor():
             str: The decoded data table extracted from the image.
         """
         # Preprocess the image and generate the underlying data table
-        inputs = self.processor(images=img, text="Generate underlying data table of the table/chart/figure below:", return_tensors="pt").to(self.device)
+        inputs = self.processor(images=img, text=self.prompt, return_tensors="pt").to(self.device)
         # Generate predictions using the model
         predictions = self.model.generate(**inputs, max_new_tokens=512)
         # Decode the predictions and remove special tokens
         return self.processor.decode(predictions[0], skip_special_tokens=True)
-        
-        
-from transformers import AutoImageProcessor, TableTransformerModel
-import torch
 
+    def extract_chart_data_from_images(self, imgs, max_new_tokens: int = 512) -> list:
+        """
+        Same as extract_chart_data_from_image for a batch of images, in one
+        forward pass. The processor pads every image to the same number of
+        patches, so images of any size share the batch.
+        """
+        import torch
+        imgs = [ img.convert("RGB") for img in imgs ]
+        inputs = self.processor(images=imgs, text=[self.prompt] * len(imgs), return_tensors="pt").to(self.device)
+        with torch.inference_mode():
+            predictions = self.model.generate(**inputs, max_new_tokens=max_new_tokens)
+        return self.processor.batch_decode(predictions, skip_special_tokens=True)
+
+
+class ChartModelService():
+    """
+    Process-wide access to one ImageChartDataExtractor. The model is loaded
+    on the first extraction, not when the service is created, and inference
+    runs on a bounded pool of threads so concurrent files share the model
+    without oversubscribing the CPU.
+
+    Args:
+        model_name (str): The Pix2Struct model to load.
+        max_workers (int): Images run through the model at the same time.
+        torch_threads (int): Intra-op threads of torch, 0 keeps the torch default.
+    """
+    def __init__(self, model_name="google/pix2struct-base", max_workers: int = 1, torch_threads: int = 0) -> None:
+        self.model_name = model_name
+        self.max_workers = max(max_workers, 1)
+        self.torch_threads = torch_threads
+        self._extractor = None
+        self._load_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pix2struct")
+
+    @property
+    def extractor(self) -> ImageChartDataExtractor:
+        if self._extractor is None:
+            with self._load_lock:
+                if self._extractor is None:
+                    if self.torch_threads > 0:
+                        import torch
+                        torch.set_num_threads(self.torch_threads)
+                    self._extractor = ImageChartDataExtractor(model_name=self.model_name)
+        return self._extractor
+
+    def submit(self, img):
+        """Queues one image, returns a Future of its data table."""
+        return self._pool.submit(lambda: self.extractor.extract_chart_data_from_image(img))
+
+    def extract_chart_data_from_image(self, img) -> str:
+        return self.submit(img).result()
+
+    def extract_chart_data_from_images(self, imgs, batch_size: int = 8) -> list:
+        """
+        Data tables of a list of images, in order. The images are split into
+        batches of `batch_size` that run on the inference pool. When a batch
+        fails its images are retried one at a time, an image that still
+        fails gets None.
+        """
+        imgs = list(imgs)
+        batch_size = max(batch_size, 1)
+        futures = [
+            self._pool.submit(self._extract_batch, imgs[i:i + batch_size])
+            for i in range(0, len(imgs), batch_size)
+        ]
+        return [ text for future in futures for text in future.result() ]
+
+    def _extract_batch(self, batch: list) -> list:
+        try:
+            return self.extractor.extract_chart_data_from_images(batch)
+        except Exception as e:
+            print("Chart batch failed, retrying its images one by one ", e)
+
+        texts = []
+        for img in batch:
+            try:
+                texts.append(self.extractor.extract_chart_data_from_image(img))
+            except Exception as e:
+                print("Chart extraction failed for an image ", e)
+                texts.append(None)
+        return texts
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_chart_model_service = None
+_chart_model_service_lock = threading.Lock()
+
+def get_chart_model_service(model_name="google/pix2struct-base", max_workers: int = 1, torch_threads: int = 0) -> ChartModelService:
+    """
+    Returns the ChartModelService of the process, created on the first call.
+    Later calls get the same service whatever their arguments.
+    """
+    global _chart_model_service
+    if _chart_model_service is None:
+        with _chart_model_service_lock:
+            if _chart_model_service is None:
+                _chart_model_service = ChartModelService(
+                    model_name=model_name, max_workers=max_workers, torch_threads=torch_threads
+                )
+    return _chart_model_service
+
+        
 class TableTransformer():
     """
     Initialize a TableExtractor object.
@@ -78,6 +203,8 @@ class TableTransformer():
     
     # Define the constructor
     def __init__(self, model_name="microsoft/table-transformer-detection") -> None:
+        from transformers import AutoImageProcessor, TableTransformerModel
+        import torch
         # Initialize the Pix2StructProcessor and Pix2StructForConditionalGeneration
         self.processor = AutoImageProcessor.from_pretrained(model_name)
         self.model = TableTransformerModel.from_pretrained(model_name)
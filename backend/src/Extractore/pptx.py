@@ -4,7 +4,7 @@ warnings.simplefilter(action='ignore', category=FutureWarning)
 import io
 import os
 import shutil
-import pandas as pd
+import time
 import numpy as np
 
 from enum import Enum
@@ -15,10 +15,88 @@ from pptx.util import Inches, Cm, Pt
 from pptx.oxml.xmlchemy import OxmlElement
 from pptx.dml.color import ColorFormat, RGBColor
 from typing import List
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, Future
 from .common_functions import *
 
 # from ..utils.common_functions import *
-from .image import extract_text_from_ocr, ImageChartDataExtractor
+from .image import extract_text_from_ocr_batch, get_chart_model_service, CHART_PROMPT
+from .result_cache import get_result_cache
+def timed_call(function, *args):
+    """Returns (function(*args), seconds it took)."""
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+def format_chart_workbook(xlsx_blob: bytes, chart_title: str, chart_type: str) -> str:
+    """
+    Renders the data of a chart from its embedded workbook.
+
+    Args:
+        xlsx_blob (bytes): The chart workbook.
+        chart_title (str): The chart title, None when it has none.
+        chart_type (str): The chart type.
+
+    Returns:
+        str: The chart title, type and data table.
+    """
+    # pandas and openpyxl are only needed when the chart XML has no cached values
+    import pandas as pd
+    chart_data_df = pd.read_excel(io.BytesIO(xlsx_blob)).dropna(axis=1, how='all').dropna(axis=0, how='all')
+    return format_chart_text(chart_title, chart_type, format_dataframe_to_prettytables(chart_data_df))
+
+def format_chart_from_cache(chart, chart_title: str, chart_type: str):
+    """
+    Renders the data of a chart from the category labels and values that
+    PowerPoint caches in the chart XML, without opening the workbook.
+
+    Args:
+        chart (pptx.chart.chart.Chart): The chart.
+        chart_title (str): The chart title, None when it has none.
+        chart_type (str): The chart type.
+
+    Returns:
+        str: The chart title, type and data table, or None when the cache is
+        missing or does not line up (e.g. XY charts), so the workbook is used.
+    """
+    categories = None
+    columns = []
+    for plot in chart.plots:
+        plot_categories = [ "" if label is None else str(label) for label in plot.categories ]
+        if not plot_categories:
+            return None
+        if categories is None:
+            categories = plot_categories
+        elif plot_categories != categories:
+            return None
+        for series in plot.series:
+            values = series.values
+            if len(values) != len(categories):
+                return None
+            columns.append((series.name or "", values))
+
+    if not columns:
+        return None
+
+    # PrettyTable needs unique headers
+    headers, seen = ["Category"], {}
+    for name, _ in columns:
+        seen[name] = seen.get(name, 0) + 1
+        headers.append(name if seen[name] == 1 else f"{name} ({seen[name]})")
+
+    table = PrettyTable(headers)
+    for row, category in enumerate(categories):
+        table.add_row([category] + [ "" if values[row] is None else values[row] for _, values in columns ])
+    return format_chart_text(chart_title, chart_type, str(table))
+
+def format_chart_text(chart_title: str, chart_type: str, chart_str: str) -> str:
+    chart_text = ''
+    if chart_title is not None:
+        chart_text += "Chart Title : " + chart_title
+    chart_text += "\nChart Type : " + chart_type + "\n"
+    chart_text += chart_str
+    return chart_text
+
 class Entity:
     """
     Represents an entity with chart type, text, position, and size.
@@ -63,12 +141,18 @@ class Slide:
         self.slide_text = slide_text
         self.entities = entities
         self.similarity = 0
+        # seconds spent on the slide: shapes (text, tables) and charts
+        self.timings = {}
     
     def __repr__(self): return repr(self.__dict__)
         
         
 class PPTExtractor():
-    def __init__(self, file_path, extraction_method: str = "slide", ocr_engine: str = "tesseract",extract_from_image: bool = True,chart_from_image : bool = True) -> None:
+    def __init__(self, file_path, extraction_method: str = "slide", ocr_engine: str = "tesseract",extract_from_image: bool = True,chart_from_image : bool = True,
+                 chart_model_name: str = "google/pix2struct-base", inference_workers: int = 1, torch_threads: int = 0,
+                 inference_batch_size: int = 8, image_cache_path: str = None, min_image_pixels: int = 64,
+                 min_image_area_ratio: float = 0.01, decorative_repeat_ratio: float = 0.5,
+                 slide_workers: int = 4) -> None:
         """
         Initializes a PPTExtractor object.
 
@@ -76,6 +160,15 @@ class PPTExtractor():
         - file_path (str): The path to the PPT file.
         - extraction_method (str, optional): The method to extract content from slides. Defaults to "slide".
         - ocr_engine (str, optional): The OCR engine to use for image text extraction. Defaults to "tesseract".
+        - chart_model_name, inference_workers, torch_threads (optional): Settings of the shared
+          chart model service, used by the first extractor of the process that meets a picture.
+        - inference_batch_size (int, optional): Pictures per model or OCR batch. Defaults to 8.
+        - image_cache_path (str, optional): SQLite file caching the text of each image. Defaults to no cache.
+        - min_image_pixels, min_image_area_ratio (optional): Pictures narrower than this many pixels,
+          or covering less than this share of the slide, are ignored.
+        - decorative_repeat_ratio (float, optional): Pictures found on at least this share of the
+          slides (and on 3 slides or more) are logos or backgrounds and are ignored.
+        - slide_workers (int, optional): Threads parsing chart workbooks while the slides are walked. Defaults to 4.
         """
         self.file_path = file_path
         self.extraction_method = extraction_method
@@ -83,6 +176,125 @@ class PPTExtractor():
         self.slides = []
         self.extract_from_image = extract_from_image
         self.chart_from_image = chart_from_image
+        self.chart_model_name = chart_model_name
+        self.inference_workers = inference_workers
+        self.torch_threads = torch_threads
+        self.inference_batch_size = inference_batch_size
+        self.image_cache_path = image_cache_path
+        self.min_image_pixels = min_image_pixels
+        self.min_image_area_ratio = min_image_area_ratio
+        self.decorative_repeat_ratio = decorative_repeat_ratio
+        self.slide_workers = slide_workers
+        self.deplot = None
+
+    def get_chart_model(self):
+        # the model is only loaded once a deck has a picture, then shared by every deck
+        if self.deplot is None:
+            self.deplot = get_chart_model_service(
+                model_name=self.chart_model_name,
+                max_workers=self.inference_workers,
+                torch_threads=self.torch_threads,
+            )
+        return self.deplot
+
+    def is_ignored_image(self, shape, slide_area: int) -> bool:
+        """Icons, bullets and spacers carry no chart or text worth an inference."""
+        width, height = shape.image.size
+        if min(width, height) < self.min_image_pixels:
+            return True
+        if slide_area and shape.width * shape.height < self.min_image_area_ratio * slide_area:
+            return True
+        return False
+
+    def collect_pictures(self, presentation):
+        """
+        Finds the pictures of the deck to run through the chart model (or
+        OCR). Ignored pictures are left out and each distinct image appears
+        once in the blobs.
+
+        Returns:
+        - tuple: ([((slide_number, shape_id), image_hash)], {image_hash: blob}).
+        """
+        slide_area = (presentation.slide_width or 0) * (presentation.slide_height or 0)
+        pictures = []
+        blobs = {}
+        image_slides = defaultdict(set)
+        for slide_number, slide in enumerate(presentation.slides, start=1):
+            for shape in slide.shapes:
+                try:
+                    if shape.shape_type != MSO_SHAPE_TYPE.PICTURE or self.is_ignored_image(shape, slide_area):
+                        continue
+                    image = shape.image
+                    pictures.append(((slide_number, shape.shape_id), image.sha1))
+                    blobs.setdefault(image.sha1, image.blob)
+                    image_slides[image.sha1].add(slide_number)
+                except Exception as e:
+                    print("Ignoring picture of slide ", slide_number, " Error ", e)
+
+        # the same picture on most slides is a logo or a background
+        slides_count = len(presentation.slides)
+        for image_hash, slides in image_slides.items():
+            if len(slides) >= 3 and len(slides) >= self.decorative_repeat_ratio * slides_count:
+                del blobs[image_hash]
+
+        return pictures, blobs
+
+    def infer_image_texts(self, blobs: dict) -> dict:
+        """
+        Text of each image of {image_hash: blob}, read from the image cache
+        or inferred in batches and then cached.
+        """
+        if self.chart_from_image:
+            extractor, prompt = self.chart_model_name, CHART_PROMPT
+        else:
+            extractor, prompt = self.ocr_engine, ""
+
+        cache = get_result_cache(self.image_cache_path, table_name="image_results") if self.image_cache_path else None
+
+        texts = {}
+        if cache is not None:
+            try:
+                texts = cache.get_many(blobs.keys(), extractor=extractor, prompt=prompt)
+            except Exception as e:
+                print("Image cache read failed ", e)
+
+        missing = [ image_hash for image_hash in blobs if image_hash not in texts ]
+        if not missing:
+            return texts
+
+        if self.chart_from_image:
+            # an image PIL cannot read (e.g. WMF) only loses its own text
+            images = {}
+            for image_hash in missing:
+                try:
+                    images[image_hash] = Image.open(io.BytesIO(blobs[image_hash]))
+                except Exception as e:
+                    print("Ignoring unreadable picture ", image_hash, " Error ", e)
+            missing = list(images)
+            inferred = self.get_chart_model().extract_chart_data_from_images(
+                list(images.values()),
+                batch_size=self.inference_batch_size,
+            ) if images else []
+        else:
+            inferred = extract_text_from_ocr_batch(
+                [ io.BytesIO(blobs[image_hash]) for image_hash in missing ],
+                ocr_engine=self.ocr_engine,
+                max_workers=self.inference_batch_size,
+            )
+        # failed images are neither cached nor kept, they are retried by the next extraction
+        inferred_texts = {
+            image_hash: text for image_hash, text in zip(missing, inferred)
+            if text is not None
+        }
+
+        if cache is not None:
+            try:
+                cache.set_many(inferred_texts, extractor=extractor, prompt=prompt)
+            except Exception as e:
+                print("Image cache write failed ", e)
+
+        texts.update(inferred_texts)
+        return texts
 
     def extract(self,maintain_order : bool = False):
         """
@@ -105,72 +317,134 @@ class PPTExtractor():
         self.slide_height = presentation.slide_height
         self.slide_width = presentation.slide_width
         self.entities = []
-        self.deplot = ImageChartDataExtractor()
-        
-        for slide_number, slide in enumerate(presentation.slides):
-            try:
-                slide_number += 1
-                entities = []
-                slide_wise_text = ''
-                slide_wise_table = ''
-                slide_wise_chart = ''
-                slide_wise_ocr = ''
-
-                slide_title = ""
+        self.images_seconds = 0.0
+
+        pictures, blobs = self.collect_pictures(presentation) if self.extract_from_image else ([], {})
+
+        with ThreadPoolExecutor(max_workers=self.slide_workers) as pool:
+            # pictures are inferred while the slides are walked
+            image_texts_future = None
+            if blobs:
+                image_texts_future = pool.submit(timed_call, self.infer_image_texts, blobs)
+
+            slides_parts = []
+            for slide_number, slide in enumerate(presentation.slides, start=1):
+                started = time.perf_counter()
                 try:
-                    slide_title += slide.shapes.title.text
-                except:
-                    pass
-                
-                
-                slide_text = "Slide Number : "+str(slide_number)
-                slide_text += "\nSlide Title : "+str(slide_title)
-                
-                # Extract text from shapes
-                for shape in slide.shapes:
-                    if shape.has_text_frame:
-                        for paragraph in shape.text_frame.paragraphs:
-                            for run in paragraph.runs:
-                                slide_wise_text += run.text
-                                slide_text += "\nSlide Text : "+run.text
-                                entities.append(Entity("text", run.text, shape.left, shape.top, shape.width, shape.height))
-                    
-                    # Extract table from shapes
-                    if shape.has_table:
-                        table = shape.table
-                        table_str = convert_pptx_table_to_prettytable(table)
-                        slide_wise_table += " \n " + table_str + " \n "
-                        slide_text += "\nSlide Table : "+table_str
-                        entities.append(Entity("table", table_str, shape.left, shape.top, shape.width, shape.height))
-                    
-                    # Extract chart from shapes
-                    if shape.has_chart:
-                        chart = shape.chart
-                        chart_data_df = pd.read_excel(chart.part.chart_workbook.xlsx_part.blob).dropna(axis=1, how='all').dropna(axis=0, how='all')
-                        chart_str = format_dataframe_to_prettytables(chart_data_df)
-                        chart_text = ''
-                        if chart.has_title:
-                            chart_text += "Chart Title : " + chart.chart_title.text_frame.text
-                        chart_text += "\nChart Type : " + str(chart.chart_type) + "\n"
-                        chart_text += chart_str
-                        slide_wise_chart += " \n " + chart_text + " \n "
-                        slide_text += "\nSlide Chart : "+chart_text
-                        entities.append(Entity("chart", chart_text, shape.left, shape.top, shape.width, shape.height))
-                    
-                    # Extract OCR text from images
-                    if shape.shape_type == MSO_SHAPE_TYPE.PICTURE and self.extract_from_image:
-                        if self.chart_from_image:
-                            text = self.deplot.extract_chart_data_from_image(Image.open(io.BytesIO(shape.image.blob))) 
-                            # text = self.deplot.extract_chart_data_from_image(io.BytesIO(shape.image.blob)) 
-                        else:
-                            text = extract_text_from_ocr(Image.open(io.BytesIO(shape.image.blob)))
-                            # text = extract_text_from_ocr(io.BytesIO(shape.image.blob))
-                        slide_wise_ocr += text + " \n "
-                        slide_text += "\nSlide OCR : "+text
-                        entities.append(Entity("image", text, shape.left, shape.top, shape.width, shape.height))
-
-                if not maintain_order:
-                    slide_text = f"""
+                    slide_title, parts = self.collect_slide_parts(slide_number, slide, pool)
+                except Exception as e:
+                    print("Ignoring slide ", slide_number, " Error ", e)
+                    continue
+                slides_parts.append((slide_number, slide_title, parts, time.perf_counter() - started))
+
+            image_texts = {}
+            if image_texts_future is not None:
+                try:
+                    texts, self.images_seconds = image_texts_future.result()
+                except Exception as e:
+                    # only the text of the pictures is lost, never the slides
+                    print("Ignoring picture texts of the deck Error ", e)
+                    texts = {}
+                image_texts = { key: texts[image_hash] for key, image_hash in pictures if image_hash in texts }
+
+            # slides are assembled in deck order once their charts are parsed
+            for slide_number, slide_title, parts, shapes_seconds in slides_parts:
+                try:
+                    slide = self.build_slide(slide_number, slide_title, parts, image_texts, maintain_order)
+                except Exception as e:
+                    print("Ignoring slide ", slide_number, " Error ", e)
+                    continue
+                slide.timings["shapes_seconds"] = shapes_seconds
+                print("slide_Number: ", slide_number)
+                print("slide_Number: ", slide.slide_text)
+                self.slides.append(slide)
+
+    def collect_slide_parts(self, slide_number: int, slide, pool):
+        """
+        Reads the text and tables of a slide and submits its charts to `pool`.
+
+        Returns:
+        - tuple: (slide title, [(kind, value, shape)] in shape order). The value
+          is the text, (chart text, seconds) or a Future of it for charts, or
+          the image_texts key for pictures.
+        """
+        slide_title = ""
+        try:
+            slide_title += slide.shapes.title.text
+        except:
+            pass
+
+        parts = []
+        for shape in slide.shapes:
+            # Extract text from shapes
+            if shape.has_text_frame:
+                for paragraph in shape.text_frame.paragraphs:
+                    for run in paragraph.runs:
+                        parts.append(("text", run.text, shape))
+
+            # Extract table from shapes
+            if shape.has_table:
+                parts.append(("table", convert_pptx_table_to_prettytable(shape.table), shape))
+
+            # Extract chart from shapes: from the values cached in the chart XML,
+            # else the embedded workbook is parsed on the pool
+            if shape.has_chart:
+                chart = shape.chart
+                chart_title = chart.chart_title.text_frame.text if chart.has_title else None
+                chart_text, seconds = timed_call(format_chart_from_cache, chart, chart_title, str(chart.chart_type))
+                if chart_text is not None:
+                    parts.append(("chart", (chart_text, seconds), shape))
+                else:
+                    parts.append(("chart", pool.submit(
+                        timed_call, format_chart_workbook,
+                        chart.part.chart_workbook.xlsx_part.blob, chart_title, str(chart.chart_type)
+                    ), shape))
+
+            # Extract OCR text from images
+            if shape.shape_type == MSO_SHAPE_TYPE.PICTURE and self.extract_from_image:
+                parts.append(("image", (slide_number, shape.shape_id), shape))
+
+        return slide_title, parts
+
+    def build_slide(self, slide_number: int, slide_title: str, parts: list, image_texts: dict,
+                    maintain_order: bool = False) -> Slide:
+        entities = []
+        slide_wise_text = ''
+        slide_wise_table = ''
+        slide_wise_chart = ''
+        slide_wise_ocr = ''
+        charts_seconds = 0.0
+
+        slide_text = "Slide Number : "+str(slide_number)
+        slide_text += "\nSlide Title : "+str(slide_title)
+
+        for kind, value, shape in parts:
+            if kind == "text":
+                slide_wise_text += value
+                slide_text += "\nSlide Text : "+value
+                entities.append(Entity("text", value, shape.left, shape.top, shape.width, shape.height))
+
+            elif kind == "table":
+                slide_wise_table += " \n " + value + " \n "
+                slide_text += "\nSlide Table : "+value
+                entities.append(Entity("table", value, shape.left, shape.top, shape.width, shape.height))
+
+            elif kind == "chart":
+                chart_text, seconds = value.result() if isinstance(value, Future) else value
+                charts_seconds += seconds
+                slide_wise_chart += " \n " + chart_text + " \n "
+                slide_text += "\nSlide Chart : "+chart_text
+                entities.append(Entity("chart", chart_text, shape.left, shape.top, shape.width, shape.height))
+
+            # ignored pictures have no text
+            elif kind == "image" and value in image_texts:
+                text = image_texts[value]
+                slide_wise_ocr += text + " \n "
+                slide_text += "\nSlide OCR : "+text
+                entities.append(Entity("image", text, shape.left, shape.top, shape.width, shape.height))
+
+        if not maintain_order:
+            slide_text = f"""
                     Slide Number {slide_number}
                     Slide Title : {slide_title}
                     Slide Text : {slide_wise_text}
@@ -181,10 +455,9 @@ class PPTExtractor():
                     Slide Image OCR Text : 
                     {slide_wise_ocr}
                     """
-                print("slide_Number: ", slide_number)
-                print("slide_Number: ", slide_text)
-                self.slides.append(Slide(slide_number, slide_title, slide_text, entities))
-            except Exception as e:
-                print("Ignoring slide ", slide_number, " Error ", e)
+
+        slide = Slide(slide_number, slide_title, slide_text, entities)
+        slide.timings["charts_seconds"] = charts_seconds
+        return slide
         
         
\ No newline at end of file
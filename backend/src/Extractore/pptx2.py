@@ -1,9 +1,9 @@
 from .pptx import PPTExtractor
+from .result_cache import get_result_cache
 # from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_ollama import OllamaLLM
-from langchain.schema import HumanMessage, SystemMessage
-
-from transformers import AutoTokenizer
+import asyncio
+import hashlib
+from functools import lru_cache
 
 from .common_functions import *
 
@@ -14,68 +14,136 @@ from .common_functions import *
 #     encode_kwargs={"normalize_embeddings": True}
 # )
 
-tokenizer = AutoTokenizer.from_pretrained("bert-base-uncased")
+@lru_cache(maxsize=1)
+def get_tokenizer():
+    # transformers and the tokenizer files are only loaded when tokens are counted
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained("bert-base-uncased")
 
 # def get_embedding(text):
 #     return embedding_model.embed_query(text)
 
 def count_tokens(text):
-    return len(tokenizer.tokenize(text))
+    return len(get_tokenizer().tokenize(text))
 
-class PPTSummarizer(PPTExtractor):
-    def __init__(self, file_path, extraction_method: str = "slide", ocr_engine: str = "tesseract") -> None:
-        super().__init__(file_path, extraction_method, ocr_engine)
-        super().extract()
+DEFAULT_SUMMARIZE_MODEL = "mistral-small:22b-instruct-2409-q5_K_M"
+SUMMARIZE_PROMPT = "Tu reçois les informations d'une diapositive PowerPoint, telles que le texte, les tableaux, les graphiques ou le texte extrait d’images (OCR). Génère un résumé concis et précis de la diapositive, en citant les sources utilisées (tableaux/graphiques) si applicable."
+SUMMARIZE_STREAM_PROMPT = "Tu reçois les informations d'une diapositive PowerPoint, telles que le texte, les tableaux, les graphiques ou le texte extrait d’images (OCR). Tu dois générer un résumé de la diapositive. Assure-toi de citer tes sources si ta réponse provient d’un tableau ou d’un graphique, et sois précis."
 
-    def summarize(self, summarize_method="slide", slide_number=0, summarize_model="mistral-small:22b-instruct-2409-q5_K_M", system_prompt="Tu reçois les informations d'une diapositive PowerPoint, telles que le texte, les tableaux, les graphiques ou le texte extrait d’images (OCR). Génère un résumé concis et précis de la diapositive, en citant les sources utilisées (tableaux/graphiques) si applicable."):
-        llm = OllamaLLM(model=summarize_model)
+def create_ollama_llm(model: str, base_url: str = None):
+    # its async http client belongs to the event loop that first uses it, so
+    # one client is created per summarization run and shared by every slide
+    from langchain_ollama import OllamaLLM
+    if base_url:
+        return OllamaLLM(model=model, base_url=base_url)
+    return OllamaLLM(model=model)
 
-        if summarize_method == "slide":
-            summarize_response = []
-            for slide in self.slides:
-                slide_text = slide.slide_text
-                messages = [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=slide_text)
-                ]
-                response = llm.invoke(messages)
-                summarize_response.append({
-                    "Slide Number": slide.slide_number,
-                    "Title": slide.slide_title,
-                    "Summary": response
-                })
-            return summarize_response
-        else:
-            raise Exception("Summarize method not supported.")
+class PPTSummarizer(PPTExtractor):
+    def __init__(self, file_path, extraction_method: str = "slide", ocr_engine: str = "tesseract",
+                 ollama_base_url: str = None, summary_cache_path: str = None, summary_concurrency: int = 4,
+                 **kwargs) -> None:
+        """
+        Extracts the deck, see PPTExtractor for the extraction arguments.
+
+        Args:
+        - ollama_base_url (str, optional): The Ollama server. Defaults to the langchain_ollama default.
+        - summary_cache_path (str, optional): SQLite file caching summaries by slide text, model
+          and system prompt. Defaults to no cache.
+        - summary_concurrency (int, optional): Requests sent to Ollama at the same time. Defaults to 4.
+        """
+        super().__init__(file_path, extraction_method, ocr_engine, **kwargs)
+        self.ollama_base_url = ollama_base_url
+        self.summary_cache_path = summary_cache_path
+        self.summary_concurrency = summary_concurrency
+        super().extract()
 
-    def summarize_stream(self, summarize_method: str = "slide", slide_number: int = 0, summarize_model: str = "mistral-small:22b-instruct-2409-q5_K_M", system_prompt: str = "Tu reçois les informations d'une diapositive PowerPoint, telles que le texte, les tableaux, les graphiques ou le texte extrait d’images (OCR). Tu dois générer un résumé de la diapositive. Assure-toi de citer tes sources si ta réponse provient d’un tableau ou d’un graphique, et sois précis."):
-        llm = OllamaLLM(model=summarize_model)
+    def get_summary_requests(self, summarize_method: str):
+        """[(result fields, text to summarize)] in deck order."""
         if summarize_method == "slide":
-            for slide in self.slides:
-                slide_text = slide.slide_text
-                messages = [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=slide_text)
-                ]
-                response = llm.invoke(messages)
-                yield {
-                    "Slide Number": slide.slide_number,
-                    "Title": slide.slide_title,
-                    "Summary": response
-                }
+            return [
+                ({"Slide Number": slide.slide_number, "Title": slide.slide_title}, slide.slide_text)
+                for slide in self.slides
+            ]
         elif summarize_method == "charts":
-            for slide in self.slides:
-                for entity in slide.entities:
-                    if entity.chart_type in ["table", "chart"]:
-                        messages = [
-                            SystemMessage(content=system_prompt),
-                            HumanMessage(content=entity.text)
-                        ]
-                        response = llm.invoke(messages)
-                        yield {
-                            "Slide Number": slide.slide_number,
-                            "Entity Type": entity.chart_type,
-                            "Summary": response
-                        }
-        else:
+            return [
+                ({"Slide Number": slide.slide_number, "Entity Type": entity.chart_type}, entity.text)
+                for slide in self.slides
+                for entity in slide.entities
+                if entity.chart_type in ["table", "chart"]
+            ]
+        raise Exception("Summarize method not supported.")
+
+    async def asummarize_stream(self, summarize_method: str = "slide", summarize_model: str = DEFAULT_SUMMARIZE_MODEL,
+                                system_prompt: str = SUMMARIZE_STREAM_PROMPT, max_concurrency: int = None):
+        """
+        Yields the summaries in deck order as soon as each one and the ones
+        before it are ready. Up to `max_concurrency` requests run at once,
+        identical texts are summarized once, and cached summaries are reused.
+        """
+        from langchain.schema import HumanMessage, SystemMessage
+
+        requests = self.get_summary_requests(summarize_method)
+        if not requests:
+            return
+
+        llm = create_ollama_llm(summarize_model, self.ollama_base_url)
+        cache = get_result_cache(self.summary_cache_path, table_name="summaries") if self.summary_cache_path else None
+        semaphore = asyncio.Semaphore(max(max_concurrency or self.summary_concurrency, 1))
+
+        keys = [ hashlib.sha256(text.encode("utf-8")).hexdigest() for _, text in requests ]
+        cached = {}
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.get_many, keys, summarize_model, system_prompt)
+
+        async def summarize_text(key: str, text: str) -> str:
+            if key in cached:
+                return cached[key]
+            async with semaphore:
+                summary = await llm.ainvoke([ SystemMessage(content=system_prompt), HumanMessage(content=text) ])
+            if cache is not None:
+                await asyncio.to_thread(cache.set_many, {key: summary}, summarize_model, system_prompt)
+            return summary
+
+        tasks = {}
+        for key, (_, text) in zip(keys, requests):
+            if key not in tasks:
+                tasks[key] = asyncio.ensure_future(summarize_text(key, text))
+
+        try:
+            for key, (fields, _) in zip(keys, requests):
+                yield {**fields, "Summary": await tasks[key]}
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+    async def asummarize(self, summarize_method: str = "slide", summarize_model: str = DEFAULT_SUMMARIZE_MODEL,
+                         system_prompt: str = SUMMARIZE_PROMPT, max_concurrency: int = None) -> list:
+        return [
+            summary async for summary in self.asummarize_stream(
+                summarize_method=summarize_method, summarize_model=summarize_model,
+                system_prompt=system_prompt, max_concurrency=max_concurrency,
+            )
+        ]
+
+    def summarize(self, summarize_method="slide", slide_number=0, summarize_model=DEFAULT_SUMMARIZE_MODEL, system_prompt=SUMMARIZE_PROMPT):
+        if summarize_method != "slide":
             raise Exception("Summarize method not supported.")
+        return asyncio.run(self.asummarize(
+            summarize_method=summarize_method, summarize_model=summarize_model, system_prompt=system_prompt
+        ))
+
+    def summarize_stream(self, summarize_method: str = "slide", slide_number: int = 0, summarize_model: str = DEFAULT_SUMMARIZE_MODEL, system_prompt: str = SUMMARIZE_STREAM_PROMPT):
+        # drives asummarize_stream on a private event loop, for synchronous callers
+        loop = asyncio.new_event_loop()
+        summaries = self.asummarize_stream(
+            summarize_method=summarize_method, summarize_model=summarize_model, system_prompt=system_prompt
+        )
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(summaries.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(summaries.aclose())
+            loop.close()
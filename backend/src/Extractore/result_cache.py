@@ -0,0 +1,75 @@
+import sqlite3
+import threading
+import time
+
+
+class ResultCache():
+    """
+    Persistent cache of model outputs (text of images, slide summaries),
+    keyed by the hash of the input content, the extractor (model id or OCR
+    engine) and the prompt. Backed by SQLite in WAL mode so the processing
+    workers of a node can share one file.
+
+    Args:
+        db_path (str): The SQLite file, created if missing.
+        table_name (str): The table of this kind of result.
+    """
+    def __init__(self, db_path: str, table_name: str = "image_results") -> None:
+        self.db_path = db_path
+        self.table_name = table_name
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table_name} ("
+                " content_hash TEXT NOT NULL,"
+                " extractor TEXT NOT NULL,"
+                " prompt TEXT NOT NULL,"
+                " text TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (content_hash, extractor, prompt))"
+            )
+            self._connection.commit()
+
+    def get_many(self, content_hashes, extractor: str, prompt: str = "") -> dict:
+        """Returns {content_hash: text} of the cached results among `content_hashes`."""
+        content_hashes = list(set(content_hashes))
+        results = {}
+        with self._lock:
+            # stay below the SQLite limit of bound parameters
+            for i in range(0, len(content_hashes), 500):
+                batch = content_hashes[i:i + 500]
+                rows = self._connection.execute(
+                    f"SELECT content_hash, text FROM {self.table_name}"
+                    f" WHERE extractor = ? AND prompt = ? AND content_hash IN ({','.join('?' * len(batch))})",
+                    [extractor, prompt, *batch],
+                ).fetchall()
+                results.update(rows)
+        return results
+
+    def set_many(self, texts: dict, extractor: str, prompt: str = "") -> None:
+        """Stores {content_hash: text}."""
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO {self.table_name} (content_hash, extractor, prompt, text, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [ (content_hash, extractor, prompt, text, now) for content_hash, text in texts.items() ],
+            )
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_result_caches = {}
+_result_caches_lock = threading.Lock()
+
+def get_result_cache(db_path: str, table_name: str = "image_results") -> ResultCache:
+    """Returns the ResultCache of `db_path` and `table_name` for this process, opened on the first call."""
+    with _result_caches_lock:
+        if (db_path, table_name) not in _result_caches:
+            _result_caches[(db_path, table_name)] = ResultCache(db_path, table_name=table_name)
+        return _result_caches[(db_path, table_name)]
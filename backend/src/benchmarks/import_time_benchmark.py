@@ -0,0 +1,87 @@
+"""
+Measure what importing the API costs a fresh process.
+
+Usage (from backend/src):
+    python -m benchmarks.import_time_benchmark --module main --runs 5 --top 15
+
+Each run imports the module in a new interpreter with `-X importtime` and
+reports the wall time, the peak RSS of the child and the slowest imports
+(cumulative time). Heavy ML packages (torch, transformers, ...) that end
+up imported are listed too: none of them should be needed to serve a
+request that does not run a model.
+"""
+import argparse
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = (
+    "torch", "transformers", "sentence_transformers",
+    "langchain", "langchain_ollama", "pandas",
+)
+
+CHECK_SCRIPT = (
+    "import importlib, sys; importlib.import_module(sys.argv[1]); "
+    "print('heavy:' + ','.join(m for m in sys.argv[2:] if m in sys.modules))"
+)
+
+
+def import_module_in_child(module: str):
+    """Returns (seconds, stderr of -X importtime, heavy modules that were imported)."""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHECK_SCRIPT, module, *HEAVY_MODULES],
+        capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    # imported modules may print too, the answer is on the "heavy:" line
+    heavy_line = [ line for line in result.stdout.splitlines() if line.startswith("heavy:") ][-1]
+    heavy = [ name for name in heavy_line[len("heavy:"):].split(",") if name ]
+    return elapsed, result.stderr, heavy
+
+
+def slowest_imports(importtime_output: str, top: int):
+    """(cumulative microseconds, module) of the `top` slowest imports."""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # import time: self [us] | cumulative | imported package
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), module.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time of the API entry point")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    timings = []
+    importtime_output, heavy = "", []
+    for _ in range(args.runs):
+        elapsed, importtime_output, heavy = import_module_in_child(args.module)
+        timings.append(elapsed)
+
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    max_rss_mb = max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+    print(f"import {args.module}: median {statistics.median(timings):.2f}s "
+          f"min {min(timings):.2f}s max {max(timings):.2f}s over {args.runs} runs")
+    print(f"peak RSS of the child processes: {max_rss_mb:.0f} MB")
+    print(f"heavy modules imported: {', '.join(heavy) or 'none'}")
+    print(f"slowest imports (cumulative, last run):")
+    for cumulative, module in slowest_imports(importtime_output, args.top):
+        print(f"  {cumulative / 1e6:8.3f}s  {module}")
+
+
+if __name__ == "__main__":
+    main()
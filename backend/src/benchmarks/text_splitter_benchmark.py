@@ -0,0 +1,78 @@
+"""
+Benchmark the chunker on a large synthetic document.
+
+Usage (from backend/src):
+    python -m benchmarks.text_splitter_benchmark --pages 1000 --chunk-size 100 --overlap-size 20
+
+Reports the throughput of `TokenTextSplitter` and, for reference, of the
+previous character based splitter (string concatenation, no overlap).
+"""
+import argparse
+import random
+import time
+
+from helpers.text_splitter import TokenTextSplitter, get_tokenizer_spans
+
+WORDS = (
+    "la les des une analyse rapport vecteur index requête projet données "
+    "model embedding retrieval chunk page slide tableau graphique résultat"
+).split()
+
+
+def make_pages(pages: int, lines_per_page: int, seed: int = 7):
+    rng = random.Random(seed)
+    for page in range(pages):
+        lines = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 16))) + rng.choice([".", "", ","])
+            for _ in range(lines_per_page)
+        ]
+        yield "\n".join(lines), {"page": page, "format": "pdf"}
+
+
+def legacy_char_splitter(texts, chunk_size: int, splitter_tag: str = "\n"):
+    full_text = " ".join(texts)
+    lines = [ doc.strip() for doc in full_text.split(splitter_tag) if len(doc.strip()) > 1 ]
+    chunks, current_chunk = [], ""
+    for line in lines:
+        current_chunk += line + splitter_tag
+        if len(current_chunk) >= chunk_size:
+            chunks.append(current_chunk.strip())
+            current_chunk = ""
+    chunks.append(current_chunk.strip())
+    return chunks
+
+
+def main(args):
+    pages = list(make_pages(args.pages, args.lines_per_page))
+    total_chars = sum(len(text) for text, _ in pages)
+
+    splitter = TokenTextSplitter(
+        chunk_size=args.chunk_size,
+        overlap_size=args.overlap_size,
+        token_spans=get_tokenizer_spans(args.tokenizer),
+    )
+
+    started = time.perf_counter()
+    chunks = list(splitter.split_pages(pages))
+    token_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    legacy_chunks = legacy_char_splitter([ text for text, _ in pages ], chunk_size=args.chunk_size * 5)
+    legacy_seconds = time.perf_counter() - started
+
+    print(f"input: {args.pages} pages, {total_chars / 1e6:.1f}M characters")
+    print(f"token splitter : {len(chunks):>7} chunks in {token_seconds:.3f}s "
+          f"({total_chars / token_seconds / 1e6:.1f}M chars/s), "
+          f"max {max(m['chunk_tokens'] for _, m in chunks)} tokens/chunk")
+    print(f"legacy splitter: {len(legacy_chunks):>7} chunks in {legacy_seconds:.3f}s "
+          f"({total_chars / legacy_seconds / 1e6:.1f}M chars/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the text splitter")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--lines-per-page", type=int, default=40)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--overlap-size", type=int, default=20)
+    parser.add_argument("--tokenizer", default=None, help="Hugging Face tokenizer name")
+    main(parser.parse_args())
@@ -13,14 +13,24 @@ class DataController(BaseController):
 
     def validate_uploaded_file(self, file: UploadFile):
 
-        if file.content_type not in self.app_settings.FILE_ALLOWED_TYPES:
+        return self.validate_file_properties(
+            content_type=file.content_type, file_size=file.size
+        )
+
+    def validate_file_properties(self, content_type: str, file_size: int = None):
+
+        if content_type not in self.app_settings.FILE_ALLOWED_TYPES:
             return False, ResponseSignal.FILE_TYPE_NOT_SUPPORTED.value
 
-        if file.size > self.app_settings.FILE_MAX_SIZE * self.size_scale:
+        # the declared size may be missing, the written bytes are checked too
+        if file_size is not None and self.is_size_exceeded(file_size):
             return False, ResponseSignal.FILE_SIZE_EXCEEDED.value
 
         return True, ResponseSignal.FILE_VALIDATED_SUCCESS.value
 
+    def is_size_exceeded(self, file_size: int):
+        return file_size > self.app_settings.FILE_MAX_SIZE * self.size_scale
+
     def generate_unique_filepath(self, orig_file_name: str, project_id: str):
 
         # random_key = self.generate_random_string()
@@ -44,7 +54,7 @@ class DataController(BaseController):
             new_file_path = f"{name}_{counter}{ext}"
             counter += 1
 
-        return new_file_path, cleaned_file_name
+        return new_file_path, os.path.basename(new_file_path)
 
     def get_clean_file_name(self, orig_file_name: str):
 
@@ -3,7 +3,6 @@ import tempfile
 from typing import Dict, List, Any
 from fastapi import UploadFile, HTTPException
 from fastapi.responses import JSONResponse
-from helpers.excel_parser import ExcelMaturityParser
 from stores.llm.LLMProviderFactory import LLMProviderFactory
 from stores.llm.LLMEnums import LLMEnums
 from helpers.config import get_settings
@@ -38,7 +37,8 @@ class MaturityController:
                 tmp_file_path = tmp_file.name
             
             try:
-                # Parser le fichier Excel
+                # Parser le fichier Excel (pandas n'est importé qu'ici)
+                from helpers.excel_parser import ExcelMaturityParser
                 parser = ExcelMaturityParser(tmp_file_path)
                 # Selon le besoin, on peut soit garder l'ancien modèle d'axes,
                 # soit retourner un DataFrame normalisé depuis le CSV.
@@ -1,9 +1,12 @@
 from .BaseController import BaseController
 from models.db_schemes import Project, DataChunk
 from stores.llm.LLMEnums import DocumentTypeEnum
-from typing import List
+from helpers.indexing_pipeline import IndexingPipeline, PipelineStats
+from helpers.stream_bridge import iterate_in_thread, StreamExecutor
+from helpers.embedding_models import get_hugging_face_embedding_model
+from typing import List, AsyncIterator
+import asyncio
 import json
-from sentence_transformers import SentenceTransformer
 
 class NLPController(BaseController):
 
@@ -23,6 +26,23 @@ class NLPController(BaseController):
         collection_name = self.create_collection_name(project_id=project.project_id)
         return await self.vectordb_client.delete_collection(collection_name=collection_name)
     
+    async def delete_asset_vectors(self, project: Project, asset_id: int, chunk_model=None):
+        """
+        Deletes the vectors of an asset. With `chunk_model`, when nothing
+        matched the asset the vectors are deleted by chunk id instead: points
+        indexed before they carried an `asset_id` payload are only found that way.
+        """
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        deleted_count = await self.vectordb_client.delete_by_asset(collection_name=collection_name,
+                                                                   asset_id=asset_id)
+        if deleted_count or chunk_model is None:
+            return deleted_count
+
+        async for chunk_ids in chunk_model.iter_asset_chunk_ids(asset_id=asset_id):
+            deleted_count += await self.vectordb_client.delete_by_chunk_ids(collection_name=collection_name,
+                                                                            chunk_ids=chunk_ids)
+        return deleted_count
+
     async def get_vector_db_collection_info(self, project: Project):
         collection_name = self.create_collection_name(project_id=project.project_id)
         collection_info = await self.vectordb_client.get_collection_info(collection_name=collection_name)
@@ -31,6 +51,79 @@ class NLPController(BaseController):
             json.dumps(collection_info, default=lambda x: x.__dict__)
         )
     
+    def embed_chunks(self, chunks: List[DataChunk]):
+
+        texts = [ c.chunk_text for c in chunks ]
+
+        # Vérification du provider d'embedding
+        if self.embedding_client.embedding_model_id == "hugging_face" :
+            # Utiliser sentence-transformers pour Hugging Face
+            model = get_hugging_face_embedding_model()
+            return model.encode(texts).tolist()
+
+        # Code normal pour OpenAI/Cohere
+        return self.embedding_client.embed_text(text=texts, 
+                                                document_type=DocumentTypeEnum.DOCUMENT.value)
+
+    async def aembed_chunks(self, chunks: List[DataChunk]):
+        # embedding clients are blocking, keep them off the event loop
+        return await asyncio.to_thread(self.embed_chunks, chunks)
+
+    async def insert_chunks_vectors(self, project: Project, chunks: List[DataChunk], vectors: list):
+
+        collection_name = self.create_collection_name(project_id=project.project_id)
+
+        return await self.vectordb_client.insert_many(
+            collection_name=collection_name,
+            texts=[ c.chunk_text for c in chunks ],
+            metadata=[ c.chunk_metadata for c in chunks ],
+            vectors=vectors,
+            record_ids=[ c.chunk_id for c in chunks ],
+            asset_ids=[ c.chunk_asset_id for c in chunks ],
+        )
+
+    async def copy_chunk_vectors(self, source_project_id: int, project: Project, asset_id: int,
+                                 chunk_id_pairs: list, batch_size: int = 500) -> int:
+        """
+        Reuses the stored vectors of cloned chunks: the records of the source
+        chunk ids are read from the source project collection and written
+        under the new chunk ids, without calling the embedding model.
+        Returns the number of vectors copied.
+        """
+        source_collection = self.create_collection_name(project_id=source_project_id)
+        collection_name = self.create_collection_name(project_id=project.project_id)
+
+        copied = 0
+        for i in range(0, len(chunk_id_pairs), batch_size):
+            new_chunk_ids = dict(chunk_id_pairs[i:i + batch_size])
+            records = await self.vectordb_client.get_records_by_chunk_ids(
+                collection_name=source_collection, chunk_ids=list(new_chunk_ids)
+            )
+            if not records:
+                continue
+
+            if copied == 0:
+                _ = await self.vectordb_client.create_collection(
+                    collection_name=collection_name,
+                    embedding_size=len(records[0]["vector"]),
+                    do_reset=False,
+                )
+
+            is_inserted = await self.vectordb_client.insert_many(
+                collection_name=collection_name,
+                texts=[ r["text"] for r in records ],
+                vectors=[ r["vector"] for r in records ],
+                metadata=[ {**(r["metadata"] or {}), "source_chunk_id": r["id"]} for r in records ],
+                record_ids=[ new_chunk_ids[r["id"]] for r in records ],
+                asset_ids=[ asset_id ] * len(records),
+                batch_size=batch_size,
+            )
+            if not is_inserted:
+                raise RuntimeError(f"Failed to copy vectors into {collection_name}")
+            copied += len(records)
+
+        return copied
+
     async def index_into_vector_db(self, project: Project, chunks: List[DataChunk],
                                    chunks_ids: List[int], 
                                    do_reset: bool = False):
@@ -41,16 +134,7 @@ class NLPController(BaseController):
         # step2: manage items
         texts = [ c.chunk_text for c in chunks ]
         metadata = [ c.chunk_metadata for c in  chunks]
-        
-        # Vérification du provider d'embedding
-        if self.embedding_client.embedding_model_id == "hugging_face" :
-            # Utiliser sentence-transformers pour Hugging Face
-            model = SentenceTransformer("sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
-            vectors = model.encode(texts)
-        else:
-            # Code normal pour OpenAI/Cohere
-            vectors = self.embedding_client.embed_text(text=texts, 
-                                                      document_type=DocumentTypeEnum.DOCUMENT.value)
+        vectors = await self.aembed_chunks(chunks)
 
         # step3: create collection if not exists
         _ = await self.vectordb_client.create_collection(
@@ -66,10 +150,31 @@ class NLPController(BaseController):
             metadata=metadata,
             vectors=vectors,
             record_ids=chunks_ids,
+            asset_ids=[ c.chunk_asset_id for c in chunks ],
         )
 
         return True
 
+    async def index_project_chunks(self, project: Project, chunks_pages: AsyncIterator[List[DataChunk]],
+                                   on_batch_done=None) -> PipelineStats:
+        """
+        Index pages of chunks through the fetch -> embed -> insert pipeline.
+        The collection must already exist.
+        """
+
+        pipeline = IndexingPipeline(
+            source=chunks_pages,
+            embed_fn=self.aembed_chunks,
+            insert_fn=lambda chunks, vectors: self.insert_chunks_vectors(
+                project=project, chunks=chunks, vectors=vectors
+            ),
+            embed_workers=self.app_settings.INDEXING_EMBED_WORKERS,
+            queue_size=self.app_settings.INDEXING_QUEUE_SIZE,
+            on_batch_done=on_batch_done,
+        )
+
+        return await pipeline.run()
+
     async def search_vector_db_collection(self, project: Project, text: str, limit: int = 10):
 
         # step1: get collection name
@@ -101,9 +206,12 @@ class NLPController(BaseController):
 
         return results
     
-    async def answer_rag_question(self, project: Project, query: str, limit: int = 10):
-        
-        answer, full_prompt, chat_history = None, None, None
+    async def build_rag_prompt(self, project: Project, query: str, limit: int = 10):
+        """
+        Retrieves the documents related to `query` and builds the generation
+        prompt. Returns (retrieved_documents, full_prompt, chat_history), all
+        None when nothing was retrieved.
+        """
 
         # step1: retrieve related documents
         retrieved_documents = await self.search_vector_db_collection(
@@ -113,7 +221,7 @@ class NLPController(BaseController):
         )
 
         if not retrieved_documents or len(retrieved_documents) == 0:
-            return answer, full_prompt, chat_history
+            return None, None, None
         
         # step2: Construct LLM prompt
         system_prompt = self.template_parser.get("rag", "system_prompt")
@@ -141,6 +249,19 @@ class NLPController(BaseController):
 
         full_prompt = "\n\n".join([ documents_prompts,  footer_prompt])
 
+        return retrieved_documents, full_prompt, chat_history
+
+    async def answer_rag_question(self, project: Project, query: str, limit: int = 10):
+        
+        answer = None
+
+        retrieved_documents, full_prompt, chat_history = await self.build_rag_prompt(
+            project=project, query=query, limit=limit
+        )
+
+        if not retrieved_documents:
+            return answer, full_prompt, chat_history
+
         # step4: Retrieve the Answer
         answer = self.generation_client.generate_text(
             prompt=full_prompt,
@@ -149,3 +270,14 @@ class NLPController(BaseController):
 
         return answer, full_prompt, chat_history
 
+    def stream_rag_answer(self, full_prompt: str, chat_history: list,
+                          stream_executor: StreamExecutor = None) -> AsyncIterator[str]:
+        """
+        Async iterator over the pieces of the generated answer. The blocking
+        provider stream runs in a thread of `stream_executor`, it is closed as
+        soon as the iteration stops.
+        """
+        return iterate_in_thread(lambda: self.generation_client.generate_text_stream(
+            prompt=full_prompt,
+            chat_history=chat_history
+        ), executor=stream_executor)
@@ -1,13 +1,19 @@
 from .BaseController import BaseController
 from .ProjectController import ProjectController
 import os
-from langchain_community.document_loaders import TextLoader
-from langchain_community.document_loaders import PyMuPDFLoader
+import itertools
+import hashlib
+import json
+import tempfile
+import logging
+import fitz
 from models import ProcessingEnum
-from typing import List
+from typing import Iterable, Iterator
 from dataclasses import dataclass
-from Extractore.pptx2 import PPTSummarizer
-from langchain_core.documents import Document
+from Extractore.pptx2 import PPTSummarizer, SUMMARIZE_PROMPT
+from helpers.text_splitter import TokenTextSplitter, get_tokenizer_spans
+
+logger = logging.getLogger("uvicorn")
 
 @dataclass
 class Document:
@@ -21,38 +27,38 @@ class ProcessController(BaseController):
 
         self.project_id = project_id
         self.project_path = ProjectController().get_project_path(project_id=project_id)
+        self.pptx_loaders = {}
 
     def get_file_extension(self, file_id: str):
         return os.path.splitext(file_id)[-1]
 
-    def get_file_loader(self, file_id: str):
-
-        file_ext = self.get_file_extension(file_id=file_id)
-        file_path = os.path.join(
+    def get_file_path(self, file_id: str):
+        return os.path.join(
             self.project_path,
             file_id
         )
 
-        if not os.path.exists(file_path):
-            return None
+    def iter_file_content(self, file_id: str) -> Iterator[Document]:
+        """
+        Yields the content of a file one page at a time (PDF page, PPTX slide
+        or block of text lines), so it can be chunked while it is being read.
+        Yields nothing for a missing or unsupported file.
+        """
+        file_ext = self.get_file_extension(file_id=file_id)
+        file_path = self.get_file_path(file_id=file_id)
 
-        if file_ext == ProcessingEnum.TXT.value:
-            return TextLoader(file_path, encoding="utf-8")
+        if not os.path.exists(file_path):
+            return
 
         if file_ext == ProcessingEnum.PDF.value:
-            return PyMuPDFLoader(file_path)
-        if file_ext == ProcessingEnum.PPTX.value:
-            return PPTSummarizer(file_path)
-        
-        return None
+            yield from self.iter_pdf_pages(file_path)
 
-    def get_file_content(self, file_id: str):
+        elif file_ext == ProcessingEnum.TXT.value:
+            yield from self.iter_text_blocks(file_path)
 
-        loader = self.get_file_loader(file_id=file_id)
-        if isinstance(loader, PPTSummarizer):
-            documents = []
+        elif file_ext == ProcessingEnum.PPTX.value:
+            loader = self.get_pptx_loader(file_path)
             for slide in loader.slides:
-                print("Slide number:", slide.slide_number)
                 try:
                     doc = Document(
                         page_content=slide.slide_text,
@@ -63,76 +69,235 @@ class ProcessController(BaseController):
                             "format": "powerpoint"
                         }
                     )
-                    documents.append(doc)
                 except Exception as e:
                     print(f"❌ Erreur sur slide {slide.slide_number} : {e}")
-            return documents
-        else:
-            print("FICHIER NON PPTX BRO -------------------------------")
-            if loader:
-                return loader.load()
+                    continue
+                yield doc
+
+    def get_image_cache_path(self):
+        if not self.app_settings.IMAGE_CACHE_ENABLED:
             return None
+        return os.path.join(self.get_database_path("image_cache"), "image_results.sqlite")
 
-    def process_file_content(self, file_content: list, file_id: str,
-                            chunk_size: int=100, overlap_size: int=20):
-        
-        print(file_content[0].metadata)
-        chunks = []
-        if file_content[0].metadata["format"] == "powerpoint":
-            for doc in file_content:
-                chunks.append(doc)
-        else:
-            file_content_texts = [
-                rec.page_content
-                for rec in file_content
-            ]
-
-            file_content_metadata = [
-                rec.metadata
-                for rec in file_content
-            ]
-
-            # chunks = text_splitter.create_documents(
-            #     file_content_texts,
-            #     metadatas=file_content_metadata
-            # )
-
-            chunks = self.process_simpler_splitter(
-                texts=file_content_texts,
-                metadatas=file_content_metadata,
-                chunk_size=chunk_size,
+    def get_pptx_loader(self, file_path: str) -> PPTSummarizer:
+        # a deck is extracted once, then its slides and summaries share the extraction
+        if file_path not in self.pptx_loaders:
+            self.pptx_loaders[file_path] = PPTSummarizer(
+                file_path,
+                chart_model_name=self.app_settings.IMAGE_CHART_MODEL_ID,
+                inference_workers=self.app_settings.IMAGE_INFERENCE_WORKERS,
+                torch_threads=self.app_settings.IMAGE_TORCH_THREADS,
+                inference_batch_size=self.app_settings.IMAGE_INFERENCE_BATCH_SIZE,
+                image_cache_path=self.get_image_cache_path(),
+                min_image_pixels=self.app_settings.IMAGE_MIN_PIXELS,
+                min_image_area_ratio=self.app_settings.IMAGE_MIN_AREA_RATIO,
+                slide_workers=self.app_settings.PPTX_SLIDE_WORKERS,
+                ollama_base_url=self.app_settings.OLLAMA_BASE_URL or None,
+                summary_cache_path=self.get_summary_cache_path(),
+                summary_concurrency=self.app_settings.SUMMARY_CONCURRENCY,
             )
+        return self.pptx_loaders[file_path]
+
+    def get_summary_cache_path(self):
+        if not self.app_settings.SUMMARY_CACHE_ENABLED:
+            return None
+        return os.path.join(self.get_database_path("summary_cache"), "summaries.sqlite")
+
+    def iter_file_summaries(self, file_id: str) -> Iterator[Document]:
+        """
+        Yields one summary Document per slide of a PPTX file, in slide order.
+        Yields nothing for other files.
+        """
+        file_path = self.get_file_path(file_id=file_id)
+        if self.get_file_extension(file_id=file_id) != ProcessingEnum.PPTX.value or not os.path.exists(file_path):
+            return
+
+        loader = self.get_pptx_loader(file_path)
+        for summary in loader.summarize_stream(summarize_model=self.app_settings.SUMMARY_MODEL_ID,
+                                               system_prompt=SUMMARIZE_PROMPT):
+            yield Document(
+                page_content=summary["Summary"],
+                metadata={
+                    "source": loader.file_path,
+                    "slide_title": summary["Title"],
+                    "page": summary["Slide Number"],
+                    "format": "powerpoint",
+                    "chunk_type": "summary",
+                    "asset_name": file_id,
+                }
+            )
+
+    def iter_pdf_pages(self, file_path: str) -> Iterator[Document]:
+        # only the current page is held in memory
+        with fitz.open(file_path) as pdf_document:
+            total_pages = pdf_document.page_count
+            for page in pdf_document:
+                yield Document(
+                    page_content=page.get_text(),
+                    metadata={
+                        "source": file_path,
+                        "page": page.number,
+                        "total_pages": total_pages,
+                        "format": "pdf"
+                    }
+                )
 
-        return chunks
+    def iter_text_blocks(self, file_path: str, block_lines: int = 1000) -> Iterator[Document]:
+        with open(file_path, "r", encoding="utf-8") as f:
+            lines, first_line = [], 1
+            for line_number, line in enumerate(f, start=1):
+                lines.append(line)
+                if len(lines) == block_lines:
+                    yield Document(
+                        page_content="".join(lines),
+                        metadata={"source": file_path, "line": first_line, "format": "text"}
+                    )
+                    lines, first_line = [], line_number + 1
+            if lines:
+                yield Document(
+                    page_content="".join(lines),
+                    metadata={"source": file_path, "line": first_line, "format": "text"}
+                )
+
+    def get_max_chunk_tokens(self) -> int:
+        """
+        Longest chunk, in splitter tokens, the embedding model reads without
+        truncating it. Without a tokenizer words are counted, and a word is
+        usually several tokens of the model.
+        """
+        if self.app_settings.CHUNK_TOKENIZER:
+            return self.app_settings.CHUNK_MAX_TOKENS
+        return max(int(self.app_settings.CHUNK_MAX_TOKENS / self.app_settings.CHUNK_TOKENS_PER_WORD), 1)
+
+    def get_text_splitter(self, chunk_size: int, overlap_size: int) -> TokenTextSplitter:
+        # never above what the embedding model reads, longer chunks get truncated
+        return TokenTextSplitter(
+            chunk_size=min(chunk_size, self.get_max_chunk_tokens()),
+            overlap_size=overlap_size,
+            token_spans=get_tokenizer_spans(self.app_settings.CHUNK_TOKENIZER or None),
+        )
+
+    def get_chunker_fingerprint(self, chunk_size: int, overlap_size: int, with_summaries: bool = False) -> str:
+        """Digest of every setting that changes the chunks made from a file."""
+        chunker_config = {
+            "summary_model": self.app_settings.SUMMARY_MODEL_ID if with_summaries else "",
+            "chunk_size": min(chunk_size, self.get_max_chunk_tokens()),
+            "overlap_size": overlap_size,
+            "tokenizer": self.app_settings.CHUNK_TOKENIZER or "",
+            "dedup_scope": self.app_settings.CHUNK_DEDUP_SCOPE,
+            "dedup_threshold": self.app_settings.CHUNK_DEDUP_THRESHOLD,
+            "dedup_num_perm": self.app_settings.CHUNK_DEDUP_NUM_PERM,
+        }
+        return hashlib.sha256(json.dumps(chunker_config, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def process_file_content(self, file_content: Iterable[Document], file_id: str,
+                            chunk_size: int=100, overlap_size: int=20) -> Iterator[Document]:
+        """
+        Chunks pages as they arrive into chunks of `chunk_size` tokens sharing
+        `overlap_size` tokens. A chunk never runs over two PowerPoint slides.
+        """
+
+        pages = iter(file_content)
+        first_page = next(pages, None)
+        if first_page is None:
+            return
 
-    def process_simpler_splitter(self, texts: List[str], metadatas: List[dict], chunk_size: int, splitter_tag: str="\n"):
-        
-        full_text = " ".join(texts)
+        pages = itertools.chain([first_page], pages)
+        if first_page.metadata.get("format") == "powerpoint":
+            yield from self.split_each_document(pages, file_id=file_id, chunk_size=chunk_size,
+                                                overlap_size=overlap_size)
+            return
 
-        # split by splitter_tag
-        lines = [ doc.strip() for doc in full_text.split(splitter_tag) if len(doc.strip()) > 1 ]
+        text_splitter = self.get_text_splitter(chunk_size=chunk_size, overlap_size=overlap_size)
+        for page_content, metadata in text_splitter.split_pages(
+            pages=( (page.page_content, page.metadata) for page in pages ),
+            extra_metadata={"asset_name": file_id},
+        ):
+            yield Document(page_content=page_content, metadata=metadata)
 
-        chunks = []
-        current_chunk = ""
+    def split_each_document(self, documents: Iterable[Document], file_id: str,
+                            chunk_size: int=100, overlap_size: int=20) -> Iterator[Document]:
+        """Chunks each document on its own, e.g. one slide or one slide summary."""
+        text_splitter = self.get_text_splitter(chunk_size=chunk_size, overlap_size=overlap_size)
+        for document in documents:
+            for page_content, metadata in text_splitter.split_pages(
+                pages=[ (document.page_content, document.metadata) ],
+                extra_metadata={"asset_name": file_id},
+            ):
+                yield Document(page_content=page_content, metadata=metadata)
 
-        for line in lines:
-            current_chunk += line + splitter_tag
-            if len(current_chunk) >= chunk_size:
-                chunks.append(Document(
-                    page_content=current_chunk.strip(),
-                    metadata={}
-                ))
 
-                current_chunk = ""
+def extract_file_chunks(project_id: str, file_id: str, chunk_size: int, overlap_size: int,
+                        with_summaries: bool = False):
+    """
+    Extract and chunk one project file. Runs inside a worker process of the
+    processing pool, so it only takes and returns picklable values.
+    The chunks are not returned but written, one (page_content, metadata)
+    JSON line each, to a spool file read back with iter_spooled_chunks, so
+    a large file is never held in memory as a whole.
+    Returns a (spool_path, chunks_count, summary_error) tuple, spool_path
+    being None if the file can not be loaded; the caller removes the spool.
+    With `with_summaries`, the slide summaries of a PPTX file are added as
+    chunks, all of them or none: when summarizing fails the chunks come
+    without summaries and summary_error holds the reason.
+    """
+    process_controller = ProcessController(project_id=project_id)
+
+    if not os.path.exists(process_controller.get_file_path(file_id=file_id)):
+        return None, 0, None
+
+    # pages are read lazily and chunked as they are extracted
+    file_chunks = process_controller.process_file_content(
+        file_content=process_controller.iter_file_content(file_id=file_id),
+        file_id=file_id,
+        chunk_size=chunk_size,
+        overlap_size=overlap_size
+    )
+
+    spool_fd, spool_path = tempfile.mkstemp(prefix="chunks-", suffix=".jsonl")
+    try:
+        with os.fdopen(spool_fd, "w", encoding="utf-8") as spool:
+            chunks_count = write_spooled_chunks(
+                spool, ( (chunk.page_content, chunk.metadata) for chunk in file_chunks )
+            )
+
+            summary_error = None
+            if with_summaries:
+                # the slides are stored even when the summarization server is down
+                try:
+                    summaries = [
+                        (summary.page_content, summary.metadata)
+                        for summary in process_controller.split_each_document(
+                            process_controller.iter_file_summaries(file_id=file_id),
+                            file_id=file_id, chunk_size=chunk_size, overlap_size=overlap_size,
+                        )
+                    ]
+                    chunks_count += write_spooled_chunks(spool, summaries)
+                except Exception as e:
+                    # the only log of this failure, the caller just reports summary_error
+                    logger.warning(f"Error while summarizing file: {file_id} {e}")
+                    summary_error = str(e)
+    except BaseException:
+        os.remove(spool_path)
+        raise
 
-        if len(current_chunk) >= 0:
-            chunks.append(Document(
-                page_content=current_chunk.strip(),
-                metadata={}
-            ))
+    return spool_path, chunks_count, summary_error
 
-        return chunks
 
+def write_spooled_chunks(spool, chunks: Iterable[tuple]) -> int:
+    chunks_count = 0
+    for page_content, metadata in chunks:
+        spool.write(json.dumps([page_content, metadata], ensure_ascii=False, default=str))
+        spool.write("\n")
+        chunks_count += 1
+    return chunks_count
 
-    
 
+def iter_spooled_chunks(spool_path: str, page_size: int = 1000) -> Iterator[list]:
+    """Pages of at most `page_size` (page_content, metadata) tuples of a spool file."""
+    with open(spool_path, "r", encoding="utf-8") as spool:
+        while True:
+            page = [ tuple(json.loads(line)) for line in itertools.islice(spool, page_size) ]
+            if not page:
+                return
+            yield page
@@ -0,0 +1,218 @@
+from .BaseController import BaseController
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from functools import lru_cache
+
+logger = logging.getLogger("uvicorn")
+
+CHECKSUM_MOD = 2 ** 64
+# float error of one provider normalising vectors again, per sqrt(record)
+VECTOR_CHECKSUM_TOLERANCE = 1e-5
+
+
+def record_checksum(record: dict) -> int:
+    """
+    Order independent digest of one record: summed modulo 2**64 over a
+    collection it gives the same value whatever the scan order is.
+    The vector only counts for its dimension here, see record_vector_checksum.
+    """
+    payload = json.dumps(
+        [record["id"], record["text"], record["metadata"] or {}, len(record["vector"])],
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return int.from_bytes(hashlib.sha256(payload.encode("utf-8")).digest()[:8], "big")
+
+
+@lru_cache(maxsize=8)
+def get_probe_vector(dimension: int) -> tuple:
+    return tuple( math.sin(i + 1) for i in range(dimension) )
+
+
+def record_vector_checksum(record: dict) -> float:
+    """
+    Digest of the vector of one record, summed over a collection: the
+    L2-normalised vector projected on a fixed probe, weighted by the record
+    id so vectors moved to other records are caught too.
+
+    Qdrant normalises the vectors of cosine collections in float32 on write,
+    so the sums are compared with a tolerance rather than hashed: rounding
+    the vectors before hashing still flips digits close to a rounding boundary.
+    """
+    vector = record["vector"]
+    norm = math.sqrt(sum( x * x for x in vector )) or 1.0
+    projection = sum( x * p for x, p in zip(vector, get_probe_vector(len(vector))) ) / norm
+
+    id_hash = hashlib.sha256(str(record["id"]).encode("utf-8")).digest()
+    weight = 1.0 + int.from_bytes(id_hash[:2], "big") / 65536
+    return weight * projection
+
+
+def is_vector_checksum_equal(checksum: float, other_checksum: float, count: int) -> bool:
+    return abs(checksum - other_checksum) <= VECTOR_CHECKSUM_TOLERANCE * math.sqrt(max(count, 1))
+
+
+class VectorMigrationController(BaseController):
+    """
+    Streams every record of a collection from one VectorDBInterface provider
+    into another, in bounded batches and without re-embedding. Progress is
+    checkpointed after each batch so an interrupted migration can resume.
+    """
+
+    def __init__(self, source_client, destination_client):
+        super().__init__()
+
+        self.source_client = source_client
+        self.destination_client = destination_client
+        self.migrations_dir = self.get_database_path(db_name="migrations")
+
+    def get_collection_name(self, vectordb_client, project_id: int):
+        from .NLPController import NLPController
+        return NLPController(
+            vectordb_client=vectordb_client,
+            generation_client=None,
+            embedding_client=None,
+            template_parser=None,
+        ).create_collection_name(project_id=project_id)
+
+    def get_checkpoint_path(self, source_collection: str, destination_collection: str):
+        return os.path.join(
+            self.migrations_dir,
+            f"{source_collection}__{destination_collection}.json"
+        )
+
+    def load_checkpoint(self, checkpoint_path: str):
+        if not os.path.exists(checkpoint_path):
+            return None
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_checkpoint(self, checkpoint_path: str, checkpoint: dict):
+        tmp_path = checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, checkpoint_path)
+
+    async def collection_digest(self, client, collection_name: str, batch_size: int):
+        count, checksum, vector_checksum = 0, 0, 0.0
+        async for records, _ in client.iter_records(collection_name=collection_name, batch_size=batch_size):
+            count += len(records)
+            for record in records:
+                checksum = (checksum + record_checksum(record)) % CHECKSUM_MOD
+                vector_checksum += record_vector_checksum(record)
+        return count, checksum, vector_checksum
+
+    async def migrate(self, source_collection: str, destination_collection: str,
+                      batch_size: int = 500, resume: bool = True, on_progress=None) -> dict:
+
+        checkpoint_path = self.get_checkpoint_path(source_collection, destination_collection)
+        checkpoint = self.load_checkpoint(checkpoint_path) if resume else None
+
+        # checkpoints written before vectors were checksummed can not be resumed
+        if checkpoint is None or checkpoint.get("status") == "completed" or "vector_checksum" not in checkpoint:
+            checkpoint = {
+                "source_collection": source_collection,
+                "destination_collection": destination_collection,
+                "offset": None,
+                "migrated": 0,
+                "checksum": 0,
+                "vector_checksum": 0.0,
+                "status": "running",
+            }
+            is_resumed = False
+        else:
+            is_resumed = True
+
+        started = time.perf_counter()
+        is_collection_ready = is_resumed
+
+        # every record was copied already: only the verification is left
+        is_scan_complete = checkpoint["status"] in ("scan_complete", "verification_failed")
+        if not is_scan_complete:
+            async for records, next_offset in self.source_client.iter_records(
+                collection_name=source_collection,
+                batch_size=batch_size,
+                offset=checkpoint["offset"],
+            ):
+                if not is_collection_ready:
+                    # fresh run: start from an empty destination collection
+                    _ = await self.destination_client.create_collection(
+                        collection_name=destination_collection,
+                        embedding_size=len(records[0]["vector"]),
+                        do_reset=True,
+                    )
+                    is_collection_ready = True
+
+                record_ids = [ r["id"] for r in records ]
+
+                # a batch may have been written right before a crash, keep it idempotent
+                if is_resumed:
+                    _ = await self.destination_client.delete_by_chunk_ids(
+                        collection_name=destination_collection, chunk_ids=record_ids
+                    )
+
+                is_inserted = await self.destination_client.insert_many(
+                    collection_name=destination_collection,
+                    texts=[ r["text"] for r in records ],
+                    vectors=[ r["vector"] for r in records ],
+                    metadata=[ r["metadata"] for r in records ],
+                    record_ids=record_ids,
+                    asset_ids=[ r["asset_id"] for r in records ],
+                    batch_size=batch_size,
+                )
+                if not is_inserted:
+                    checkpoint["status"] = "failed"
+                    self.save_checkpoint(checkpoint_path, checkpoint)
+                    raise RuntimeError(f"Failed to insert a batch into {destination_collection}")
+
+                for record in records:
+                    checkpoint["checksum"] = (checkpoint["checksum"] + record_checksum(record)) % CHECKSUM_MOD
+                    checkpoint["vector_checksum"] += record_vector_checksum(record)
+                checkpoint["migrated"] += len(records)
+                if next_offset is None:
+                    # no offset to resume from: a restart must not scan the source again
+                    checkpoint["status"] = "scan_complete"
+                else:
+                    checkpoint["offset"] = next_offset
+                self.save_checkpoint(checkpoint_path, checkpoint)
+
+                if on_progress:
+                    on_progress(checkpoint["migrated"])
+
+            checkpoint["status"] = "scan_complete"
+            self.save_checkpoint(checkpoint_path, checkpoint)
+
+        destination_count, destination_checksum, destination_vector_checksum = await self.collection_digest(
+            client=self.destination_client,
+            collection_name=destination_collection,
+            batch_size=batch_size,
+        )
+
+        is_verified = (
+            destination_count == checkpoint["migrated"]
+            and destination_checksum == checkpoint["checksum"]
+            and is_vector_checksum_equal(destination_vector_checksum, checkpoint["vector_checksum"],
+                                         count=destination_count)
+        )
+        checkpoint["status"] = "completed" if is_verified else "verification_failed"
+        self.save_checkpoint(checkpoint_path, checkpoint)
+
+        report = {
+            "source_collection": source_collection,
+            "destination_collection": destination_collection,
+            "resumed": is_resumed,
+            "migrated": checkpoint["migrated"],
+            "destination_count": destination_count,
+            "checksum": format(checkpoint["checksum"], "016x"),
+            "destination_checksum": format(destination_checksum, "016x"),
+            "vector_checksum": round(checkpoint["vector_checksum"], 6),
+            "destination_vector_checksum": round(destination_vector_checksum, 6),
+            "verified": is_verified,
+            "wall_seconds": round(time.perf_counter() - started, 3),
+        }
+        logger.info(f"Vector migration finished: {report}")
+
+        return report
@@ -0,0 +1,155 @@
+import hashlib
+import itertools
+import re
+from collections import defaultdict
+
+import numpy as np
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+EXACT_HASH_SIZE = 20
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+NUMBER_PATTERN = re.compile(r"\d+")
+
+
+def normalize_text(text: str) -> str:
+    # numbers are folded so "Page 3 of 40" footers compare equal
+    return " ".join(WORD_PATTERN.findall(NUMBER_PATTERN.sub("0", text.lower())))
+
+
+def optimal_bands(num_perm: int, threshold: float) -> tuple[int, int]:
+    """(bands, rows) of the LSH index whose S-curve threshold is closest to `threshold`."""
+    candidates = [ (bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0 ]
+    return min(candidates, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class ChunkDeduplicator:
+    """
+    Detects exact and near duplicate chunk texts within one scope (a file or
+    a whole project). Exact duplicates are found through a hash of the
+    normalised text; near duplicates through MinHash signatures of word
+    shingles, bucketed by LSH bands and confirmed when the estimated Jaccard
+    similarity reaches `threshold`.
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = optimal_bands(num_perm, threshold)
+
+        generator = np.random.RandomState(seed)
+        self.perm_a = generator.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.perm_b = generator.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+        # exact hash -> owner, and the owner of every signature
+        self.exact_hashes = {}
+        self.signatures = []
+        self.signature_owners = []
+        self.buckets = [ defaultdict(list) for _ in range(self.bands) ]
+
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+        self.matched_owners = set()
+
+    @property
+    def collapsed(self) -> int:
+        return self.exact_duplicates + self.near_duplicates
+
+    def minhash(self, words: list) -> np.ndarray:
+        size = min(self.shingle_size, len(words))
+        shingles = { " ".join(words[i:i + size]) for i in range(len(words) - size + 1) }
+        hashes = np.array(
+            [ int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles ],
+            dtype=np.uint64,
+        )
+        # universal hashing a*x+b mod p of every shingle, min over shingles
+        permuted = np.bitwise_and((np.outer(hashes, self.perm_a) + self.perm_b) % MERSENNE_PRIME, MAX_HASH)
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray):
+        return [ signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands) ]
+
+    def fingerprint(self, text: str) -> bytes:
+        """
+        Storable form of what the deduplicator keeps of a text: the SHA-1 of
+        the normalised text followed by its MinHash signature (uint32 values),
+        without signature when the text has no words.
+        """
+        normalized = normalize_text(text)
+        exact_hash = hashlib.sha1(normalized.encode("utf-8")).digest()
+        words = normalized.split()
+        if not words:
+            return exact_hash
+        return exact_hash + self.minhash(words).astype(np.uint32).tobytes()
+
+    def fingerprint_sizes(self) -> tuple[int, int]:
+        """Byte sizes of the fingerprints of this deduplicator (without, with a signature)."""
+        return EXACT_HASH_SIZE, EXACT_HASH_SIZE + 4 * self.num_perm
+
+    def check_and_add(self, text: str, owner=None):
+        """
+        Returns "exact" or "near" when `text` duplicates a text seen before,
+        otherwise None and remembers the text as belonging to `owner`.
+        The owners of the texts matched so far are collected in `matched_owners`.
+        """
+        return self.check_and_add_fingerprint(self.fingerprint(text), owner=owner)
+
+    def check_and_add_fingerprint(self, fingerprint: bytes, owner=None):
+        """check_and_add of a text given by its fingerprint."""
+        exact_hash = fingerprint[:EXACT_HASH_SIZE]
+
+        if exact_hash in self.exact_hashes:
+            self.exact_duplicates += 1
+            self._match(self.exact_hashes[exact_hash])
+            return "exact"
+
+        if len(fingerprint) == EXACT_HASH_SIZE:
+            self.exact_hashes[exact_hash] = owner
+            return None
+
+        signature = np.frombuffer(fingerprint, dtype=np.uint32, offset=EXACT_HASH_SIZE).astype(np.uint64)
+        band_keys = self._band_keys(signature)
+
+        candidates = set()
+        for bucket, key in zip(self.buckets, band_keys):
+            candidates.update(bucket.get(key, ()))
+
+        for candidate in candidates:
+            if np.mean(self.signatures[candidate] == signature) >= self.threshold:
+                self.near_duplicates += 1
+                self._match(self.signature_owners[candidate])
+                return "near"
+
+        self.exact_hashes[exact_hash] = owner
+        index = len(self.signatures)
+        self.signatures.append(signature)
+        self.signature_owners.append(owner)
+        for bucket, key in zip(self.buckets, band_keys):
+            bucket[key].append(index)
+
+        return None
+
+    def _match(self, owner):
+        if owner is not None:
+            self.matched_owners.add(owner)
+
+    def seed(self, texts, owners=None):
+        """Register texts that are already stored without counting them."""
+        self.seed_fingerprints([ self.fingerprint(text) for text in texts ], owners=owners)
+
+    def seed_fingerprints(self, fingerprints, owners=None):
+        """Register stored fingerprints without counting them, see fingerprint()."""
+        exact, near = self.exact_duplicates, self.near_duplicates
+        matched_owners = set(self.matched_owners)
+        for fingerprint, owner in zip(fingerprints, owners if owners is not None else itertools.repeat(None)):
+            self.check_and_add_fingerprint(fingerprint, owner=owner)
+        self.exact_duplicates, self.near_duplicates = exact, near
+        self.matched_owners = matched_owners
+
+    def get_stats(self) -> dict:
+        return {
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicates": self.near_duplicates,
+            "collapsed_chunks": self.collapsed,
+        }
@@ -10,6 +10,9 @@ class Settings(BaseSettings):
     FILE_ALLOWED_TYPES: list
     FILE_MAX_SIZE: int
     FILE_DEFAULT_CHUNK_SIZE: int
+    UPLOAD_SESSION_TTL_SECONDS: int = 86400
+    FILE_UPLOAD_CONCURRENCY: int = 4
+    FILE_BATCH_MAX_FILES: int = 200
 
     POSTGRES_USERNAME: str
     POSTGRES_PASSWORD: str
@@ -31,6 +34,7 @@ class Settings(BaseSettings):
     INPUT_DAFAULT_MAX_CHARACTERS: int = None
     GENERATION_DAFAULT_MAX_TOKENS: int = None
     GENERATION_DAFAULT_TEMPERATURE: float = None
+    GENERATION_STREAM_WORKERS: int = 16
 
     VECTOR_DB_BACKEND_LITERAL: List[str] = None
     VECTOR_DB_BACKEND : str
@@ -38,6 +42,50 @@ class Settings(BaseSettings):
     VECTOR_DB_DISTANCE_METHOD: str = None
     VECTOR_DB_PGVEC_INDEX_THRESHOLD: int = 100
 
+    PROCESSING_POOL_WORKERS: int = 2
+    PROCESSING_CHUNK_PAGE_SIZE: int = 1000
+    CHUNK_TOKENIZER: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    CHUNK_MAX_TOKENS: int = 126
+    CHUNK_TOKENS_PER_WORD: float = 2.0
+    CHUNK_DEDUP_SCOPE: str = "asset"
+    CHUNK_DEDUP_THRESHOLD: float = 0.9
+    CHUNK_DEDUP_NUM_PERM: int = 64
+
+    IMAGE_CHART_MODEL_ID: str = "google/pix2struct-base"
+    IMAGE_INFERENCE_WORKERS: int = 1
+    IMAGE_TORCH_THREADS: int = 0
+    IMAGE_INFERENCE_BATCH_SIZE: int = 8
+    IMAGE_CACHE_ENABLED: bool = True
+    IMAGE_MIN_PIXELS: int = 64
+    IMAGE_MIN_AREA_RATIO: float = 0.01
+    PPTX_SLIDE_WORKERS: int = 4
+
+    OLLAMA_BASE_URL: str = ""
+    SUMMARY_MODEL_ID: str = "mistral-small:22b-instruct-2409-q5_K_M"
+    SUMMARY_CONCURRENCY: int = 4
+    SUMMARY_CACHE_ENABLED: bool = True
+
+    INDEXING_BATCH_SIZE: int = 50
+    INDEXING_EMBED_WORKERS: int = 2
+    INDEXING_QUEUE_SIZE: int = 4
+
+    VECTOR_DB_MAINTENANCE_ENABLED: bool = True
+    VECTOR_DB_MAINTENANCE_INTERVAL: int = 3600
+    VECTOR_DB_MAINTENANCE_DEAD_RATIO: float = 0.2
+    VECTOR_DB_MAINTENANCE_MIN_DEAD_ROWS: int = 1000
+    VECTOR_DB_MAINTENANCE_INDEX_BLOAT: float = 0.5
+
+    JOBS_BACKEND: str = "memory"
+    TASK_WORKER_CONCURRENCY: int = 1
+    TASK_WORKER_POLL_INTERVAL: float = 2.0
+    TASK_HEARTBEAT_INTERVAL: float = 15.0
+    TASK_STALE_SECONDS: int = 120
+    TASK_MAX_ATTEMPTS: int = 3
+    TASK_DEDUPE_SECONDS: int = 300
+    TASK_RETENTION_SECONDS: int = 86400
+    TASK_CLEANUP_BATCH_SIZE: int = 1000
+    TASK_EVENTS_POLL_INTERVAL: float = 2.0
+
     PRIMARY_LANG: str = "en"
     DEFAULT_LANG: str = "en"
 
@@ -0,0 +1,10 @@
+from functools import lru_cache
+
+HUGGING_FACE_EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+
+@lru_cache(maxsize=1)
+def get_hugging_face_embedding_model():
+    # imported and loaded once per process, on first use, and shared by every caller
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(HUGGING_FACE_EMBEDDING_MODEL)
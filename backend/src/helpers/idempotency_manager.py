@@ -1,10 +1,20 @@
 import hashlib
 import json
-from datetime import datetime, timedelta, timezone
-from sqlalchemy import select, delete
+from datetime import timedelta
+from sqlalchemy import select, delete, update, func, or_, and_, case, null
+from sqlalchemy.dialects.postgresql import insert
 from models.db_schemes.minirag.schemes.celery_task_execution import CeleryTaskExecution
+from models.enums.TaskStatusEnum import TaskStatusEnum
+
+FINISHED_TASK_STATUSES = [TaskStatusEnum.SUCCESS.value, TaskStatusEnum.FAILURE.value, TaskStatusEnum.CANCELLED.value]
 
 class IdempotencyManager:
+    """
+    Durable task queue on the `celery_task_executions` table. A task is
+    identified by the hash of its name and arguments: enqueueing is an atomic
+    claim on that hash, workers dequeue with FOR UPDATE SKIP LOCKED so any
+    number of them can poll the same table.
+    """
 
     def __init__(self, db_client, db_engine):
         self.db_client = db_client
@@ -17,108 +27,265 @@ class IdempotencyManager:
         }
         json_string = json.dumps(combined_data, sort_keys=True, default=str)
         return hashlib.sha256(json_string.encode()).hexdigest()
-    
-    async def create_task_record(self, task_name: str, task_args: dict, celery_task_id: str = None) -> CeleryTaskExecution:
-        """Create new task execution record."""
+
+    async def claim_task(self, task_name: str, task_args: dict, celery_task_id: str = None,
+                         dedupe_seconds: int = 300) -> tuple[bool, CeleryTaskExecution]:
+        """
+        Enqueue a task unless the same one is pending, running, or succeeded
+        less than `dedupe_seconds` ago. A failed, cancelled or expired
+        execution row is reset in place by the same statement.
+        Returns (is_claimed, task_record).
+        """
         args_hash = self.create_args_hash(task_name, task_args)
-        
-        task_record = CeleryTaskExecution(
+        pending_values = {
+            "status": TaskStatusEnum.PENDING.value,
+            "task_args": task_args,
+            "celery_task_id": celery_task_id,
+            "attempts": 0,
+            "worker_id": None,
+            "heartbeat_at": None,
+            "cancel_requested_at": None,
+            "progress": null(),
+            "result": null(),
+            "error": None,
+            "started_at": None,
+            "completed_at": None,
+        }
+
+        stmt = insert(CeleryTaskExecution).values(
             task_name=task_name,
             task_args_hash=args_hash,
-            task_args=task_args,
-            celery_task_id=celery_task_id,
-            status='PENDING',
-            started_at=datetime.utcnow()
+            **pending_values,
         )
-        
-        session = self.db_client()
-        try:
-            session.add(task_record)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CeleryTaskExecution.task_args_hash],
+            set_={**pending_values, "created_at": func.now()},
+            where=or_(
+                CeleryTaskExecution.status.in_([TaskStatusEnum.FAILURE.value, TaskStatusEnum.CANCELLED.value]),
+                and_(
+                    CeleryTaskExecution.status == TaskStatusEnum.SUCCESS.value,
+                    CeleryTaskExecution.completed_at < func.now() - timedelta(seconds=dedupe_seconds),
+                ),
+            ),
+        ).returning(CeleryTaskExecution)
+
+        async with self.db_client() as session:
+            result = await session.execute(
+                select(CeleryTaskExecution).from_statement(stmt).execution_options(populate_existing=True)
+            )
+            task_record = result.scalar_one_or_none()
             await session.commit()
-            await session.refresh(task_record)
-            return task_record
-        finally:
-            await session.close()
-
-    async def update_task_status(self, execution_id: int, status: str, result: dict = None):
-        """Update task status and result."""
-        session = self.db_client()
-        try:
-            task_record = await session.get(CeleryTaskExecution, execution_id)
-            if task_record:
-                task_record.status = status
-                if result:
-                    task_record.result = result
-                if status in ['SUCCESS', 'FAILURE']:
-                    task_record.completed_at = datetime.utcnow()
-                await session.commit()
-        finally:
-            await session.close()
 
-    async def get_existing_task(self, task_name: str, 
-                                task_args: dict, celery_task_id: str) -> CeleryTaskExecution:
-        """Check if task with same name and args already exists."""
-        args_hash = self.create_args_hash(task_name, task_args)
-        
-        session = self.db_client()
-        try:
-            stmt = select(CeleryTaskExecution).where(
-                CeleryTaskExecution.celery_task_id == celery_task_id,
-                CeleryTaskExecution.task_name == task_name,
-                CeleryTaskExecution.task_args_hash == args_hash
+            if task_record is not None:
+                return True, task_record
+
+            result = await session.execute(
+                select(CeleryTaskExecution).where(CeleryTaskExecution.task_args_hash == args_hash)
             )
-            result = await session.execute(stmt)
-            return result.scalar_one_or_none()
-        finally:
-            await session.close()
+            return False, result.scalar_one()
 
     async def should_execute_task(self, task_name: str, task_args: dict,
-                                  celery_task_id: str, 
+                                  celery_task_id: str = None,
                                   task_time_limit: int = 600) -> tuple[bool, CeleryTaskExecution]:
         """
-        Check if task should be executed or return existing result.
-        Args:
-            task_time_limit: Time limit in seconds after which a stuck task can be re-executed
-        Returns (should_execute, existing_task_or_none)
+        Returns (should_execute, task_record). Stuck executions are no longer
+        detected here from `started_at`, workers requeue them through
+        `requeue_stuck_tasks` based on their heartbeat.
         """
-        existing_task = await self.get_existing_task(task_name, task_args, celery_task_id)
-        
-        if not existing_task:
-            return True, None
-            
-        # Don't execute if task is already completed successfully
-        if existing_task.status == 'SUCCESS':
-            return False, existing_task
-            
-        # Check if task is stuck (running longer than time limit + 60 seconds)
-        if existing_task.status in ['PENDING', 'STARTED', 'RETRY']:
-            if existing_task.started_at:
-                time_elapsed = (datetime.utcnow() - existing_task.started_at).total_seconds()
-                time_gap = 60  # 60 seconds grace period
-                if time_elapsed > (task_time_limit + time_gap):
-                    return True, existing_task  # Task is stuck, allow re-execution
-            return False, existing_task  # Task is still running within time limit
-            
-        # Re-execute if previous task failed
-        return True, existing_task
-    
-    async def cleanup_old_tasks(self, time_retention: int = 86400) -> int:
+        return await self.claim_task(task_name, task_args, celery_task_id=celery_task_id)
+
+    async def dequeue_task(self, worker_id: str, task_names: list = None) -> CeleryTaskExecution:
+        """Atomically move the oldest pending task to STARTED for this worker."""
+        next_task = select(CeleryTaskExecution.execution_id).where(
+            CeleryTaskExecution.status == TaskStatusEnum.PENDING.value
+        )
+        if task_names:
+            next_task = next_task.where(CeleryTaskExecution.task_name.in_(task_names))
+        next_task = next_task.order_by(CeleryTaskExecution.execution_id).limit(1) \
+                             .with_for_update(skip_locked=True).scalar_subquery()
+
+        stmt = update(CeleryTaskExecution).where(
+            CeleryTaskExecution.execution_id == next_task
+        ).values(
+            status=TaskStatusEnum.STARTED.value,
+            worker_id=worker_id,
+            attempts=CeleryTaskExecution.attempts + 1,
+            started_at=func.now(),
+            heartbeat_at=func.now(),
+        ).returning(CeleryTaskExecution)
+
+        async with self.db_client() as session:
+            result = await session.execute(
+                select(CeleryTaskExecution).from_statement(stmt).execution_options(populate_existing=True)
+            )
+            task_record = result.scalar_one_or_none()
+            await session.commit()
+            return task_record
+
+    async def heartbeat(self, execution_id: int, worker_id: str, progress: dict = None) -> tuple[bool, bool]:
         """
-        Delete old task records older than time_retention seconds.
-        Args:
-            time_retention: Time in seconds to retain tasks (default: 86400 = 24 hours)
-        Returns:
-            Number of deleted records
+        Refresh the lease of a running task. Returns (is_owner, is_cancel_requested):
+        not owning the task means it was requeued or finished by someone else,
+        in both cases the worker should stop working on it.
         """
-        cutoff_time = datetime.now(timezone.utc) - timedelta(seconds=time_retention)
-        
-        session = self.db_client()
-        try:
-            stmt = delete(CeleryTaskExecution).where(
-                CeleryTaskExecution.created_at < cutoff_time
+        values = {"heartbeat_at": func.now()}
+        if progress is not None:
+            values["progress"] = progress
+
+        async with self.db_client() as session:
+            result = await session.execute(
+                update(CeleryTaskExecution).where(
+                    CeleryTaskExecution.execution_id == execution_id,
+                    CeleryTaskExecution.worker_id == worker_id,
+                    CeleryTaskExecution.status == TaskStatusEnum.STARTED.value,
+                ).values(**values).returning(CeleryTaskExecution.cancel_requested_at)
             )
+            row = result.one_or_none()
+            await session.commit()
+            if row is None:
+                return False, False
+            return True, row.cancel_requested_at is not None
+
+    async def request_cancel(self, execution_id: int) -> CeleryTaskExecution:
+        """
+        Cancel a task: a pending one is cancelled right away, a started one is
+        flagged for its worker. Returns the updated record, or None when the
+        task does not exist or already finished.
+        """
+        cancel_pending = update(CeleryTaskExecution).where(
+            CeleryTaskExecution.execution_id == execution_id,
+            CeleryTaskExecution.status == TaskStatusEnum.PENDING.value,
+        ).values(
+            status=TaskStatusEnum.CANCELLED.value,
+            cancel_requested_at=func.now(),
+            completed_at=func.now(),
+        ).returning(CeleryTaskExecution)
+
+        flag_started = update(CeleryTaskExecution).where(
+            CeleryTaskExecution.execution_id == execution_id,
+            CeleryTaskExecution.status == TaskStatusEnum.STARTED.value,
+        ).values(
+            cancel_requested_at=func.coalesce(CeleryTaskExecution.cancel_requested_at, func.now()),
+        ).returning(CeleryTaskExecution)
+
+        async with self.db_client() as session:
+            for stmt in (cancel_pending, flag_started):
+                result = await session.execute(
+                    select(CeleryTaskExecution).from_statement(stmt).execution_options(populate_existing=True)
+                )
+                task_record = result.scalar_one_or_none()
+                if task_record is not None:
+                    await session.commit()
+                    return task_record
+            return None
+
+    async def update_task_status(self, execution_id: int, status: str, result: dict = None,
+                                 error: str = None, worker_id: str = None, progress: dict = None) -> bool:
+        """Update task status and result, only for the owning worker when given."""
+        values = {"status": status}
+        if result is not None:
+            values["result"] = result
+        if error is not None:
+            values["error"] = error
+        if progress is not None:
+            values["progress"] = progress
+        if status in FINISHED_TASK_STATUSES:
+            values["completed_at"] = func.now()
+
+        stmt = update(CeleryTaskExecution).where(CeleryTaskExecution.execution_id == execution_id)
+        if worker_id is not None:
+            stmt = stmt.where(CeleryTaskExecution.worker_id == worker_id)
+
+        async with self.db_client() as session:
+            updated = await session.execute(stmt.values(**values))
+            await session.commit()
+            return updated.rowcount == 1
+
+    async def release_task(self, execution_id: int, worker_id: str) -> bool:
+        """
+        Hand a started task back to the queue when its worker stops before
+        finishing it: back to PENDING with the attempt given back, or to
+        CANCELLED when a cancel was requested meanwhile.
+        """
+        is_cancelled = CeleryTaskExecution.cancel_requested_at.is_not(None)
+
+        stmt = update(CeleryTaskExecution).where(
+            CeleryTaskExecution.execution_id == execution_id,
+            CeleryTaskExecution.worker_id == worker_id,
+            CeleryTaskExecution.status == TaskStatusEnum.STARTED.value,
+        ).values(
+            status=case((is_cancelled, TaskStatusEnum.CANCELLED.value), else_=TaskStatusEnum.PENDING.value),
+            attempts=case((is_cancelled, CeleryTaskExecution.attempts), else_=CeleryTaskExecution.attempts - 1),
+            completed_at=case((is_cancelled, func.now()), else_=None),
+            worker_id=None,
+            heartbeat_at=None,
+        )
+
+        async with self.db_client() as session:
+            result = await session.execute(stmt)
+            await session.commit()
+            return result.rowcount == 1
+
+    async def get_task(self, execution_id: int) -> CeleryTaskExecution:
+        async with self.db_client() as session:
+            return await session.get(CeleryTaskExecution, execution_id)
+
+    async def requeue_stuck_tasks(self, stale_seconds: int = 120, max_attempts: int = 3) -> int:
+        """
+        Tasks whose worker stopped heartbeating go back to PENDING, to
+        FAILURE once they used up `max_attempts`, or to CANCELLED when a
+        cancel was requested.
+        Returns the number of tasks reclaimed.
+        """
+        is_exhausted = CeleryTaskExecution.attempts >= max_attempts
+        is_cancelled = CeleryTaskExecution.cancel_requested_at.is_not(None)
+
+        stmt = update(CeleryTaskExecution).where(
+            CeleryTaskExecution.status == TaskStatusEnum.STARTED.value,
+            CeleryTaskExecution.heartbeat_at < func.now() - timedelta(seconds=stale_seconds),
+        ).values(
+            status=case(
+                (is_cancelled, TaskStatusEnum.CANCELLED.value),
+                (is_exhausted, TaskStatusEnum.FAILURE.value),
+                else_=TaskStatusEnum.PENDING.value,
+            ),
+            error=case(
+                (is_cancelled, CeleryTaskExecution.error),
+                (is_exhausted, "worker heartbeat lost"),
+                else_=CeleryTaskExecution.error,
+            ),
+            completed_at=case((or_(is_cancelled, is_exhausted), func.now()), else_=None),
+            worker_id=None,
+        )
+
+        async with self.db_client() as session:
             result = await session.execute(stmt)
             await session.commit()
             return result.rowcount
-        finally:
-            await session.close()
\ No newline at end of file
+
+    async def cleanup_old_tasks(self, time_retention: int = 86400, batch_size: int = 1000) -> int:
+        """
+        Delete finished task records older than time_retention seconds, in
+        batches of `batch_size` rows so no single transaction holds many locks.
+        Args:
+            time_retention: Time in seconds to retain tasks (default: 86400 = 24 hours)
+        Returns:
+            Number of deleted records
+        """
+        deleted = 0
+
+        while True:
+            old_tasks = select(CeleryTaskExecution.execution_id).where(
+                CeleryTaskExecution.status.in_(FINISHED_TASK_STATUSES),
+                CeleryTaskExecution.created_at < func.now() - timedelta(seconds=time_retention),
+            ).limit(batch_size).with_for_update(skip_locked=True)
+
+            async with self.db_client() as session:
+                result = await session.execute(
+                    delete(CeleryTaskExecution).where(CeleryTaskExecution.execution_id.in_(old_tasks))
+                )
+                await session.commit()
+
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
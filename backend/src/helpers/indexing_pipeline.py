@@ -0,0 +1,227 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field, asdict
+from typing import AsyncIterator, Awaitable, Callable, List, Any
+
+logger = logging.getLogger("uvicorn")
+
+_STOP = object()
+
+
+@dataclass
+class StageStats:
+    name: str
+    workers: int = 1
+    batches: int = 0
+    items: int = 0
+    busy_seconds: float = 0.0
+    wait_seconds: float = 0.0
+
+    def to_dict(self):
+        data = asdict(self)
+        data["busy_seconds"] = round(self.busy_seconds, 4)
+        data["wait_seconds"] = round(self.wait_seconds, 4)
+        return data
+
+
+@dataclass
+class PipelineStats:
+    fetch: StageStats = field(default_factory=lambda: StageStats(name="fetch"))
+    embed: StageStats = field(default_factory=lambda: StageStats(name="embed"))
+    insert: StageStats = field(default_factory=lambda: StageStats(name="insert"))
+    wall_seconds: float = 0.0
+
+    def to_dict(self):
+        return {
+            "fetch": self.fetch.to_dict(),
+            "embed": self.embed.to_dict(),
+            "insert": self.insert.to_dict(),
+            "wall_seconds": round(self.wall_seconds, 4),
+        }
+
+
+@dataclass
+class IndexedChunk:
+    """A stored chunk as the embed / insert stages read it, without an ORM object."""
+    chunk_id: int
+    chunk_text: str
+    chunk_metadata: dict
+    chunk_asset_id: int
+
+
+class BatchFeed:
+    """
+    Pipeline source fed while the pipeline runs: a producer `put`s batches
+    and `close`s the feed when it is done. At most `max_batches` wait in
+    the feed, `put` blocks the producer beyond that. When the pipeline
+    stops early it closes its source, then `put` raises instead of blocking
+    forever.
+    """
+
+    def __init__(self, max_batches: int = 4):
+        self._queue = asyncio.Queue(maxsize=max(1, max_batches))
+        self._is_stopped = False
+
+    @property
+    def is_stopped(self) -> bool:
+        return self._is_stopped
+
+    async def put(self, batch: List[Any]):
+        if self._is_stopped:
+            raise RuntimeError("The pipeline reading this feed has stopped")
+        await self._queue.put(batch)
+        if self._is_stopped:
+            raise RuntimeError("The pipeline reading this feed has stopped")
+
+    async def close(self):
+        if not self._is_stopped:
+            await self._queue.put(_STOP)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        batch = await self._queue.get()
+        if batch is _STOP:
+            raise StopAsyncIteration
+        return batch
+
+    async def aclose(self):
+        # wakes up a producer blocked on a full feed
+        self._is_stopped = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+
+class IndexingPipeline:
+    """
+    Staged fetch -> embed -> insert pipeline.
+
+    Batches produced by `source` flow through two bounded queues. The embed
+    stage runs `embed_workers` concurrent workers and the insert stage a single
+    one, so database reads, provider calls and vector inserts overlap. A full
+    queue blocks the stage feeding it, which keeps at most `queue_size` batches
+    in flight between two stages.
+
+    Args:
+        source: async iterator yielding lists of items (e.g. DataChunk pages).
+        embed_fn: async callable taking a batch and returning its vectors.
+        insert_fn: async callable taking (batch, vectors); returning False aborts the run.
+        on_batch_done: optional callable invoked with the batch once it is inserted.
+    """
+
+    def __init__(self, source: AsyncIterator[List[Any]],
+                       embed_fn: Callable[[List[Any]], Awaitable[list]],
+                       insert_fn: Callable[[List[Any], list], Awaitable[bool]],
+                       embed_workers: int = 2, queue_size: int = 4,
+                       on_batch_done: Callable[[List[Any]], Any] = None):
+
+        self.source = source
+        self.embed_fn = embed_fn
+        self.insert_fn = insert_fn
+        self.embed_workers = max(1, embed_workers)
+        self.queue_size = max(1, queue_size)
+        self.on_batch_done = on_batch_done
+
+        self.stats = PipelineStats()
+        self.stats.embed.workers = self.embed_workers
+
+    async def _fetch(self, embed_queue: asyncio.Queue):
+        stage = self.stats.fetch
+        while True:
+            started = time.perf_counter()
+            try:
+                batch = await self.source.__anext__()
+            except StopAsyncIteration:
+                break
+            stage.busy_seconds += time.perf_counter() - started
+
+            started = time.perf_counter()
+            await embed_queue.put(batch)
+            stage.wait_seconds += time.perf_counter() - started
+
+            stage.batches += 1
+            stage.items += len(batch)
+
+        for _ in range(self.embed_workers):
+            await embed_queue.put(_STOP)
+
+    async def _embed(self, embed_queue: asyncio.Queue, insert_queue: asyncio.Queue):
+        stage = self.stats.embed
+        while True:
+            started = time.perf_counter()
+            batch = await embed_queue.get()
+            stage.wait_seconds += time.perf_counter() - started
+            if batch is _STOP:
+                break
+
+            started = time.perf_counter()
+            vectors = await self.embed_fn(batch)
+            stage.busy_seconds += time.perf_counter() - started
+
+            if vectors is None or len(vectors) != len(batch):
+                raise RuntimeError("Embedding stage returned an invalid number of vectors")
+
+            started = time.perf_counter()
+            await insert_queue.put((batch, vectors))
+            stage.wait_seconds += time.perf_counter() - started
+
+            stage.batches += 1
+            stage.items += len(batch)
+
+    async def _insert(self, insert_queue: asyncio.Queue):
+        stage = self.stats.insert
+        while True:
+            started = time.perf_counter()
+            item = await insert_queue.get()
+            stage.wait_seconds += time.perf_counter() - started
+            if item is _STOP:
+                break
+
+            batch, vectors = item
+            started = time.perf_counter()
+            is_inserted = await self.insert_fn(batch, vectors)
+            stage.busy_seconds += time.perf_counter() - started
+
+            if is_inserted is False:
+                raise RuntimeError("Insert stage failed to write a batch")
+
+            stage.batches += 1
+            stage.items += len(batch)
+
+            if self.on_batch_done:
+                self.on_batch_done(batch)
+
+    async def _embed_all(self, embed_queue: asyncio.Queue, insert_queue: asyncio.Queue):
+        await asyncio.gather(*[
+            self._embed(embed_queue, insert_queue)
+            for _ in range(self.embed_workers)
+        ])
+        await insert_queue.put(_STOP)
+
+    async def run(self) -> PipelineStats:
+        embed_queue = asyncio.Queue(maxsize=self.queue_size)
+        insert_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(self._fetch(embed_queue)),
+            asyncio.create_task(self._embed_all(embed_queue, insert_queue)),
+            asyncio.create_task(self._insert(insert_queue)),
+        ]
+
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            self.stats.wall_seconds = time.perf_counter() - started
+            if hasattr(self.source, "aclose"):
+                await self.source.aclose()
+
+        logger.info(f"Indexing pipeline finished: {self.stats.to_dict()}")
+        return self.stats
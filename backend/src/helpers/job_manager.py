@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Awaitable, Callable
+
+logger = logging.getLogger("uvicorn")
+
+
+class JobStatusEnum(Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = (
+    JobStatusEnum.COMPLETED.value,
+    JobStatusEnum.FAILED.value,
+    JobStatusEnum.CANCELLED.value,
+)
+
+
+class JobFailedError(Exception):
+    """Raised by a work function to fail its job while keeping a result."""
+
+    def __init__(self, message: str, result: dict = None):
+        super().__init__(message)
+        self.result = result
+
+
+async def job_response(response: Awaitable[tuple]) -> dict:
+    """
+    Adapts a route-style (status_code, content) coroutine to a job work
+    result: error responses fail the job, their content is kept as result.
+    """
+    status_code, content = await response
+    if status_code >= 400:
+        raise JobFailedError(content.get("signal", "job_failed"), result=content)
+    return content
+
+
+class Job:
+    """
+    In-memory state of one background ingestion job. Work functions report
+    progress through `update`, which also wakes up every progress watcher.
+    """
+
+    def __init__(self, job_type: str, project_id: int):
+        self.job_id = str(uuid.uuid4())
+        self.job_type = job_type
+        self.project_id = project_id
+        self.status = JobStatusEnum.PENDING.value
+
+        self.total_files = 0
+        self.processed_files = 0
+        self.total_chunks = 0
+        self.processed_chunks = 0
+
+        self.result = None
+        self.error = None
+
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at = None
+        self.finished_at = None
+        self._started_clock = None
+
+        self.task = None
+        self._changed = asyncio.Event()
+        self._pool_futures = set()
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def update(self, **counters):
+        for name, value in counters.items():
+            setattr(self, name, value)
+        self._notify()
+
+    def advance(self, files: int = 0, chunks: int = 0):
+        self.processed_files += files
+        self.processed_chunks += chunks
+        self._notify()
+
+    def run_in_pool(self, executor, func, *args) -> asyncio.Future:
+        """
+        loop.run_in_executor for the work of this job: the call is kept so
+        cancel_pool_work can drop it while it still waits for a pool worker.
+        """
+        future = asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        self._pool_futures.add(future)
+        future.add_done_callback(self._pool_futures.discard)
+        return future
+
+    def cancel_pool_work(self):
+        # cancelling the asyncio future cancels the pool future, a no-op once it runs
+        for future in list(self._pool_futures):
+            future.cancel()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for_change(self, timeout: float = None) -> bool:
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def to_dict(self) -> dict:
+        elapsed = None
+        throughput = None
+        eta_seconds = None
+
+        if self._started_clock is not None:
+            elapsed = time.perf_counter() - self._started_clock if not self.is_finished else \
+                (self.finished_at - self.started_at).total_seconds()
+
+        # throughput / ETA follow whichever unit the job reports a total for
+        done, total = self.processed_chunks, self.total_chunks
+        if not total:
+            done, total = self.processed_files, self.total_files
+
+        if elapsed and done:
+            throughput = done / elapsed
+            if total and not self.is_finished:
+                eta_seconds = max(0.0, (total - done) / throughput)
+
+        return {
+            "job_id": self.job_id,
+            "job_type": self.job_type,
+            "project_id": self.project_id,
+            "status": self.status,
+            "total_files": self.total_files,
+            "processed_files": self.processed_files,
+            "total_chunks": self.total_chunks,
+            "processed_chunks": self.processed_chunks,
+            "elapsed_seconds": round(elapsed, 3) if elapsed is not None else None,
+            "throughput_per_second": round(throughput, 3) if throughput is not None else None,
+            "eta_seconds": round(eta_seconds, 1) if eta_seconds is not None else None,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Runs ingestion work as asyncio tasks of the API process and keeps the
+    state of the last `max_finished_jobs` finished jobs for polling.
+    """
+
+    def __init__(self, max_finished_jobs: int = 200):
+        self.jobs = OrderedDict()
+        self.max_finished_jobs = max_finished_jobs
+
+    def submit(self, job_type: str, project_id: int,
+               work: Callable[[Job], Awaitable[dict]]) -> Job:
+        job = Job(job_type=job_type, project_id=project_id)
+        self.jobs[job.job_id] = job
+        job.task = asyncio.create_task(self._run(job, work))
+        self._prune()
+        return job
+
+    async def _run(self, job: Job, work: Callable[[Job], Awaitable[dict]]):
+        job.status = JobStatusEnum.RUNNING.value
+        job.started_at = datetime.now(timezone.utc)
+        job._started_clock = time.perf_counter()
+        job._notify()
+
+        try:
+            job.result = await work(job)
+            job.status = JobStatusEnum.COMPLETED.value
+        except asyncio.CancelledError:
+            job.cancel_pool_work()
+            job.status = JobStatusEnum.CANCELLED.value
+        except JobFailedError as e:
+            job.status = JobStatusEnum.FAILED.value
+            job.result = e.result
+            job.error = str(e)
+        except Exception as e:
+            logger.error(f"Job {job.job_id} ({job.job_type}) failed: {e}")
+            job.status = JobStatusEnum.FAILED.value
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            job._notify()
+
+    def get(self, job_id: str) -> Job:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None or job.is_finished:
+            return False
+        job.cancel_pool_work()
+        job.task.cancel()
+        return True
+
+    async def shutdown(self):
+        running = [ job.task for job in self.jobs.values() if not job.is_finished ]
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+    def _prune(self):
+        finished = [ job_id for job_id, job in self.jobs.items() if job.is_finished ]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job_id]
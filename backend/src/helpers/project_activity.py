@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from sqlalchemy import text
+
+logger = logging.getLogger("uvicorn")
+
+# first key of the (namespace, project_id) Postgres advisory locks
+ADVISORY_LOCK_NAMESPACE = 7301
+
+
+class ProjectActivityRegistry:
+    """
+    Registry of what is currently running against each project.
+
+    Ingestion (processing / indexing) and vector store maintenance must never
+    overlap on the same project: maintenance is skipped while an ingestion is
+    running, and a new ingestion waits for a running maintenance to finish.
+
+    In-process state covers the API alone. With a `db_engine`, every process
+    (the API and the Postgres queue workers, on any node) also takes a
+    per-project advisory lock: shared for the length of an ingestion,
+    exclusive for maintenance, so the check holds across processes.
+    """
+
+    def __init__(self, db_engine=None):
+        self.db_engine = db_engine
+        self._ingestions = defaultdict(int)
+        self._maintenance = {}
+        self._maintenance_connections = {}
+
+    @asynccontextmanager
+    async def ingestion(self, project_id: int):
+        while project_id in self._maintenance:
+            await self._maintenance[project_id].wait()
+
+        self._ingestions[project_id] += 1
+        try:
+            if self.db_engine is None:
+                yield
+            else:
+                async with self._shared_project_lock(project_id):
+                    yield
+        finally:
+            self._ingestions[project_id] -= 1
+            if self._ingestions[project_id] <= 0:
+                del self._ingestions[project_id]
+
+    @asynccontextmanager
+    async def _shared_project_lock(self, project_id: int):
+        # session level lock: held by a dedicated connection, released explicitly
+        async with self.db_engine.connect() as connection:
+            await connection.execute(
+                text("SELECT pg_advisory_lock_shared(:namespace, :project_id)"),
+                {"namespace": ADVISORY_LOCK_NAMESPACE, "project_id": project_id},
+            )
+            await connection.commit()
+            try:
+                yield
+            finally:
+                await self._unlock(connection, "pg_advisory_unlock_shared", project_id)
+
+    async def _unlock(self, connection, unlock_function: str, project_id: int):
+        try:
+            await connection.execute(
+                text(f"SELECT {unlock_function}(:namespace, :project_id)"),
+                {"namespace": ADVISORY_LOCK_NAMESPACE, "project_id": project_id},
+            )
+            await connection.commit()
+        except Exception as e:
+            # a pooled connection must not keep the lock, dropping it releases the lock
+            logger.error(f"Failed to release the activity lock of project {project_id}: {e}")
+            await connection.invalidate()
+
+    def is_ingesting(self, project_id: int) -> bool:
+        return self._ingestions.get(project_id, 0) > 0
+
+    async def try_begin_maintenance(self, project_id: int) -> bool:
+        if self.is_ingesting(project_id) or project_id in self._maintenance:
+            return False
+
+        self._maintenance[project_id] = asyncio.Event()
+        if self.db_engine is None:
+            return True
+
+        # fails while any process holds the shared ingestion lock of the project
+        connection = None
+        try:
+            connection = await self.db_engine.connect()
+            result = await connection.execute(
+                text("SELECT pg_try_advisory_lock(:namespace, :project_id)"),
+                {"namespace": ADVISORY_LOCK_NAMESPACE, "project_id": project_id},
+            )
+            is_locked = bool(result.scalar())
+            await connection.commit()
+        except BaseException:
+            if connection is not None:
+                await connection.invalidate()
+            self._maintenance.pop(project_id).set()
+            raise
+
+        if not is_locked:
+            await connection.close()
+            self._maintenance.pop(project_id).set()
+            return False
+
+        self._maintenance_connections[project_id] = connection
+        return True
+
+    async def end_maintenance(self, project_id: int):
+        connection = self._maintenance_connections.pop(project_id, None)
+        if connection is not None:
+            try:
+                await self._unlock(connection, "pg_advisory_unlock", project_id)
+            finally:
+                await connection.close()
+
+        event = self._maintenance.pop(project_id, None)
+        if event is not None:
+            event.set()
+
+    def snapshot(self) -> dict:
+        return {
+            "ingesting": dict(self._ingestions),
+            "maintenance": list(self._maintenance.keys()),
+        }
@@ -0,0 +1,16 @@
+import json
+
+
+def format_sse(data, event: str = None) -> str:
+    """Format one Server-Sent Events message; `data` is sent as JSON."""
+    message = ""
+    if event:
+        message += f"event: {event}\n"
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    for line in payload.splitlines() or [""]:
+        message += f"data: {line}\n"
+    return message + "\n"
+
+
+def sse_comment(text: str = "keep-alive") -> str:
+    return f": {text}\n\n"
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterable
+
+_DONE = object()
+
+
+class StreamCapacityError(Exception):
+    """Every thread of the StreamExecutor already runs a stream."""
+
+
+class StreamExecutor:
+    """
+    Dedicated threads for blocking provider streams. A stream keeps its
+    thread for the whole generation, so streams do not run on the default
+    executor that asyncio.to_thread relies on. Past `max_streams` open
+    streams, new ones are refused instead of queued.
+    """
+
+    def __init__(self, max_streams: int = 16):
+        self.max_streams = max(max_streams, 1)
+        self.pool = ThreadPoolExecutor(max_workers=self.max_streams, thread_name_prefix="llm-stream")
+        self._active = 0
+        self._lock = threading.Lock()
+
+    @property
+    def is_saturated(self) -> bool:
+        return self._active >= self.max_streams
+
+    def try_reserve(self) -> bool:
+        with self._lock:
+            if self._active >= self.max_streams:
+                return False
+            self._active += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._active -= 1
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def iterate_in_thread(make_iterable: Callable[[], Iterable[Any]],
+                            executor: StreamExecutor = None) -> AsyncIterator[Any]:
+    """
+    Runs a blocking iterator (e.g. a provider's streaming completion) in a
+    worker thread and yields its items on the event loop as they arrive.
+    With `executor`, the thread is one of its threads and StreamCapacityError
+    is raised when all of them are busy; otherwise the default executor is used.
+
+    When the consumer stops early, because the client went away and the
+    response was cancelled, the worker stops at the next item and closes
+    the iterator, so the provider request is aborted instead of running to
+    the end in the background.
+    """
+    if executor is not None and not executor.try_reserve():
+        raise StreamCapacityError(f"{executor.max_streams} streams are already open")
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stopped = threading.Event()
+
+    def emit(item, error=None):
+        if stopped.is_set():
+            return
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+        except RuntimeError:
+            # the event loop is already closed
+            stopped.set()
+
+    def produce():
+        iterator = None
+        try:
+            iterator = iter(make_iterable())
+            for item in iterator:
+                if stopped.is_set():
+                    break
+                emit(item)
+        except Exception as e:
+            emit(_DONE, e)
+            return
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            if executor is not None:
+                executor.release()
+        emit(_DONE)
+
+    try:
+        _ = loop.run_in_executor(executor.pool if executor is not None else None, produce)
+    except BaseException:
+        if executor is not None:
+            executor.release()
+        raise
+
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stopped.set()
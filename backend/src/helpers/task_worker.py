@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable
+
+from helpers.job_manager import Job, JobFailedError
+from models.enums.TaskStatusEnum import TaskStatusEnum
+
+logger = logging.getLogger("uvicorn")
+
+# why the heartbeat loop stopped the work of a task
+LEASE_LOST = "lease_lost"
+CANCEL_REQUESTED = "cancel_requested"
+
+
+class TaskWorker:
+    """
+    Polls the Postgres task queue and runs claimed tasks with the registered
+    handlers. Several workers, on one or many nodes, can share the queue:
+    each claims with SKIP LOCKED, keeps its lease alive with heartbeats and
+    periodically requeues the tasks of dead workers and prunes old rows.
+
+    A handler is `async handler(task_args: dict, job: Job) -> dict`; the Job
+    collects progress counters that are persisted with every heartbeat. A
+    cancel request stored on the task is seen by the next heartbeat, which
+    cancels the handler.
+    """
+
+    def __init__(self, idempotency_manager, handlers: dict[str, Callable[[dict, Job], Awaitable[dict]]],
+                 worker_id: str = None, concurrency: int = 1, poll_interval: float = 2.0,
+                 heartbeat_interval: float = 15.0, stale_seconds: int = 120, max_attempts: int = 3,
+                 retention_seconds: int = 86400, cleanup_batch_size: int = 1000,
+                 housekeeping_interval: float = 60.0):
+
+        self.idempotency_manager = idempotency_manager
+        self.handlers = handlers
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_seconds = stale_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self.cleanup_batch_size = cleanup_batch_size
+        self.housekeeping_interval = housekeeping_interval
+
+        self._stopping = asyncio.Event()
+        self._last_housekeeping = None
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run(self):
+        logger.info(f"Task worker {self.worker_id} started for {list(self.handlers)}")
+        slots = [ asyncio.create_task(self._slot_loop()) for _ in range(self.concurrency) ]
+        try:
+            await asyncio.gather(*slots)
+        finally:
+            for slot in slots:
+                slot.cancel()
+            # let the cancelled slots hand their running tasks back to the queue
+            await asyncio.gather(*slots, return_exceptions=True)
+            logger.info(f"Task worker {self.worker_id} stopped")
+
+    async def _slot_loop(self):
+        while not self._stopping.is_set():
+            try:
+                await self.housekeeping()
+                task_record = await self.idempotency_manager.dequeue_task(
+                    worker_id=self.worker_id, task_names=list(self.handlers)
+                )
+            except Exception as e:
+                logger.error(f"Task worker {self.worker_id} polling failed: {e}")
+                task_record = None
+
+            if task_record is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.execute(task_record)
+
+    async def housekeeping(self):
+        now = time.monotonic()
+        if self._last_housekeeping is not None and now - self._last_housekeeping < self.housekeeping_interval:
+            return
+        self._last_housekeeping = now
+
+        requeued = await self.idempotency_manager.requeue_stuck_tasks(
+            stale_seconds=self.stale_seconds, max_attempts=self.max_attempts
+        )
+        deleted = await self.idempotency_manager.cleanup_old_tasks(
+            time_retention=self.retention_seconds, batch_size=self.cleanup_batch_size
+        )
+        if requeued or deleted:
+            logger.info(f"Task queue housekeeping: {requeued} stuck tasks reclaimed, {deleted} old tasks deleted")
+
+    async def execute(self, task_record):
+        execution_id = task_record.execution_id
+        job = Job(job_type=task_record.task_name, project_id=(task_record.task_args or {}).get("project_id"))
+        handler = self.handlers[task_record.task_name]
+
+        work = asyncio.create_task(handler(task_record.task_args or {}, job))
+        heartbeat = asyncio.create_task(self._heartbeat_loop(execution_id, job, work))
+
+        status, result, error = TaskStatusEnum.SUCCESS.value, None, None
+        try:
+            result = await work
+        except asyncio.CancelledError:
+            job.cancel_pool_work()
+            stop_reason = heartbeat.result() if heartbeat.done() and not heartbeat.cancelled() else None
+            if stop_reason == CANCEL_REQUESTED:
+                logger.info(f"Task {execution_id} was cancelled on request")
+                status = TaskStatusEnum.CANCELLED.value
+            elif stop_reason == LEASE_LOST:
+                # another worker owns the task now, do not report
+                logger.warning(f"Task {execution_id} was reclaimed from worker {self.worker_id}")
+                return
+            else:
+                # this worker is being stopped: the task goes back to the queue
+                heartbeat.cancel()
+                await self._release(execution_id)
+                raise
+        except JobFailedError as e:
+            status, result, error = TaskStatusEnum.FAILURE.value, e.result, str(e)
+        except Exception as e:
+            logger.error(f"Task {execution_id} ({task_record.task_name}) failed: {e}")
+            status, error = TaskStatusEnum.FAILURE.value, str(e)
+        finally:
+            heartbeat.cancel()
+
+        await self.idempotency_manager.update_task_status(
+            execution_id=execution_id,
+            status=status,
+            result=result,
+            error=error,
+            worker_id=self.worker_id,
+            progress=self._progress(job),
+        )
+
+    async def _release(self, execution_id: int):
+        try:
+            is_released = await self.idempotency_manager.release_task(
+                execution_id=execution_id, worker_id=self.worker_id
+            )
+        except Exception as e:
+            # requeue_stuck_tasks reclaims it once the lease expires
+            logger.error(f"Releasing task {execution_id} failed: {e}")
+            return
+        if is_released:
+            logger.warning(f"Task {execution_id} was handed back to the queue by worker {self.worker_id}")
+
+    async def _heartbeat_loop(self, execution_id: int, job: Job, work: asyncio.Task):
+        """Keeps the lease of a task; returns why it cancelled `work`, if it did."""
+        while not work.done():
+            await job.wait_for_change(timeout=self.heartbeat_interval)
+            try:
+                is_owner, is_cancel_requested = await self.idempotency_manager.heartbeat(
+                    execution_id=execution_id, worker_id=self.worker_id, progress=self._progress(job)
+                )
+            except Exception as e:
+                logger.error(f"Heartbeat of task {execution_id} failed: {e}")
+                continue
+            if not is_owner or is_cancel_requested:
+                work.cancel()
+                return LEASE_LOST if not is_owner else CANCEL_REQUESTED
+            # progress events can be frequent, heartbeat at most once per second
+            await asyncio.sleep(1)
+
+    def _progress(self, job: Job) -> dict:
+        state = job.to_dict()
+        return {
+            key: state[key]
+            for key in ("total_files", "processed_files", "total_chunks", "processed_chunks")
+        }
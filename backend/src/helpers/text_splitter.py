@@ -0,0 +1,129 @@
+import re
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+# words, numbers and single punctuation marks
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+SENTENCE_END_CHARACTERS = ".!?;:"
+
+TokenSpans = List[Tuple[int, int]]
+
+
+def regex_token_spans(text: str) -> TokenSpans:
+    return [ match.span() for match in TOKEN_PATTERN.finditer(text) ]
+
+
+@lru_cache(maxsize=4)
+def get_tokenizer_spans(tokenizer_name: str = None) -> Callable[[str], TokenSpans]:
+    """
+    Token span function for `TokenTextSplitter`. Without a name words and
+    punctuation are the tokens; with a Hugging Face tokenizer name the
+    chunks are measured with the tokenizer of the embedding model.
+    """
+    if not tokenizer_name:
+        return regex_token_spans
+
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+
+    def tokenizer_spans(text: str) -> TokenSpans:
+        encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+        return [ (start, end) for start, end in encoding["offset_mapping"] if end > start ]
+
+    return tokenizer_spans
+
+
+class TokenTextSplitter:
+    """
+    Splits a stream of (text, metadata) pages into chunks of at most
+    `chunk_size` tokens, consecutive chunks sharing `overlap_size` tokens.
+
+    Pages are tokenized once into character spans and chunks are cut by
+    slicing the page texts, so the work is linear in the input size. A chunk
+    end is moved back to a line break or a sentence end when one is found in
+    the last quarter of the window. Each chunk carries the metadata of the
+    page it starts on, plus `end_page` when it runs over several pages.
+    """
+
+    def __init__(self, chunk_size: int = 100, overlap_size: int = 20,
+                 token_spans: Callable[[str], TokenSpans] = regex_token_spans):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        self.chunk_size = chunk_size
+        self.overlap_size = min(max(overlap_size, 0), chunk_size - 1)
+        self.token_spans = token_spans
+
+    def split_text(self, text: str, metadata: dict = None) -> List[Tuple[str, dict]]:
+        return list(self.split_pages([(text, metadata or {})]))
+
+    def split_pages(self, pages: Iterable[Tuple[str, dict]],
+                    extra_metadata: dict = None) -> Iterator[Tuple[str, dict]]:
+        texts = {}
+        metadatas = {}
+        tokens = []          # (page_index, start, end) of every pending token
+        first = 0            # window start in `tokens`
+        emitted_until = 0    # end (exclusive, in `tokens`) of the last emitted chunk
+
+        for page_index, (text, metadata) in enumerate(pages):
+            texts[page_index] = text
+            metadatas[page_index] = metadata or {}
+            tokens.extend( (page_index, start, end) for start, end in self.token_spans(text) )
+
+            # only cut a full window once a token after it is known
+            while len(tokens) - first > self.chunk_size:
+                cut = first + self._find_cut(texts, tokens, first)
+                yield self._make_chunk(texts, metadatas, tokens, first, cut, extra_metadata)
+                emitted_until = cut
+                first = max(first + 1, cut - self.overlap_size)
+
+            # drop consumed tokens and pages from time to time
+            if first > 4096:
+                del tokens[:first]
+                emitted_until -= first
+                first = 0
+                oldest_page = tokens[0][0] if tokens else page_index
+                for stale_page in [ p for p in texts if p < oldest_page ]:
+                    del texts[stale_page]
+                    del metadatas[stale_page]
+
+        if len(tokens) > emitted_until:
+            yield self._make_chunk(texts, metadatas, tokens, first, len(tokens), extra_metadata)
+
+    def _find_cut(self, texts: dict, tokens: list, first: int) -> int:
+        """Window length to use, preferring a line break then a sentence end."""
+        lookback = self.chunk_size // 4
+        lowest = max(self.chunk_size - lookback, self.overlap_size + 1)
+
+        for length in range(self.chunk_size, lowest - 1, -1):
+            page_index, _, end = tokens[first + length - 1]
+            next_page_index, next_start, _ = tokens[first + length]
+            if next_page_index != page_index or "\n" in texts[page_index][end:next_start]:
+                return length
+
+        for length in range(self.chunk_size, lowest - 1, -1):
+            page_index, start, end = tokens[first + length - 1]
+            if texts[page_index][end - 1] in SENTENCE_END_CHARACTERS:
+                return length
+
+        return self.chunk_size
+
+    def _make_chunk(self, texts: dict, metadatas: dict, tokens: list,
+                    first: int, cut: int, extra_metadata: dict = None) -> Tuple[str, dict]:
+        segments = []
+        segment_page, segment_start, segment_end = tokens[first]
+
+        for page_index, start, end in tokens[first + 1:cut]:
+            if page_index != segment_page:
+                segments.append(texts[segment_page][segment_start:segment_end])
+                segment_page, segment_start = page_index, start
+            segment_end = end
+        segments.append(texts[segment_page][segment_start:segment_end])
+
+        start_page, end_page = tokens[first][0], tokens[cut - 1][0]
+        metadata = {**(extra_metadata or {}), **metadatas[start_page]}
+        if end_page != start_page and "page" in metadatas[end_page]:
+            metadata["end_page"] = metadatas[end_page]["page"]
+        metadata["chunk_tokens"] = cut - first
+
+        return "\n".join(segments), metadata
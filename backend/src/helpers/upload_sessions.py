@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+
+import aiofiles
+
+UPLOADS_DIR_NAME = ".uploads"
+UPLOAD_ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class UploadSizeExceededError(Exception):
+    """The bytes sent go past the length declared when the upload was created."""
+
+
+class UploadOffsetMismatchError(Exception):
+    """A chunk does not start where the upload stopped."""
+
+    def __init__(self, offset: int):
+        super().__init__(f"upload is at offset {offset}")
+        self.offset = offset
+
+
+class UploadSession:
+    """
+    One resumable upload. Chunks are appended to a part file inside the
+    project directory and hashed as they arrive, so finalizing is a rename
+    and the digest is ready without reading the file again.
+    """
+
+    def __init__(self, upload_id: str, project_id: int, file_name: str, content_type: str,
+                 upload_length: int, part_path: str, offset: int = 0):
+        self.upload_id = upload_id
+        self.project_id = project_id
+        self.file_name = file_name
+        self.content_type = content_type
+        self.upload_length = upload_length
+        self.part_path = part_path
+        self.offset = offset
+
+        self.lock = asyncio.Lock()
+        self._hasher = None
+        self._hashed_offset = 0
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.splitext(self.part_path)[0] + ".json"
+
+    @property
+    def is_complete(self) -> bool:
+        return self.offset == self.upload_length
+
+    def to_dict(self) -> dict:
+        return {
+            "upload_id": self.upload_id,
+            "project_id": self.project_id,
+            "file_name": self.file_name,
+            "content_type": self.content_type,
+            "upload_length": self.upload_length,
+        }
+
+    def _ensure_hasher(self):
+        # only after a restart: the digest of the bytes already received is rebuilt once
+        if self._hasher is not None and self._hashed_offset == self.offset:
+            return
+
+        hasher = hashlib.sha256()
+        remaining = self.offset
+        with open(self.part_path, "rb") as f:
+            while remaining > 0:
+                block = f.read(min(HASH_BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                hasher.update(block)
+                remaining -= len(block)
+
+        self._hasher = hasher
+        self._hashed_offset = self.offset
+
+    async def append(self, stream, offset: int) -> int:
+        """
+        Appends the async byte `stream` at `offset`, returns the new offset.
+        On error the bytes received before the failing block are kept, so
+        the client resumes from the returned / HEAD offset.
+        """
+        if offset != self.offset:
+            raise UploadOffsetMismatchError(self.offset)
+
+        await asyncio.to_thread(self._ensure_hasher)
+
+        try:
+            async with aiofiles.open(self.part_path, "ab") as f:
+                async for block in stream:
+                    if not block:
+                        continue
+                    if self.offset + len(block) > self.upload_length:
+                        raise UploadSizeExceededError(
+                            f"{self.offset + len(block)} bytes sent, {self.upload_length} declared"
+                        )
+                    await f.write(block)
+                    self._hasher.update(block)
+                    self.offset += len(block)
+                    self._hashed_offset = self.offset
+        finally:
+            # a block that was only partly written is dropped
+            if os.path.getsize(self.part_path) != self.offset:
+                os.truncate(self.part_path, self.offset)
+
+        return self.offset
+
+    async def hexdigest(self) -> str:
+        await asyncio.to_thread(self._ensure_hasher)
+        return self._hasher.hexdigest()
+
+
+class UploadSessionRegistry:
+    """
+    In-process index of the resumable uploads. Each upload also has a
+    metadata file next to its part file: after a restart the session is
+    loaded back from disk and resumes at the size of its part file.
+    Uploads without any activity for `ttl_seconds` are removed.
+    """
+
+    def __init__(self, ttl_seconds: int = 86400):
+        self.ttl_seconds = ttl_seconds
+        self._sessions = {}
+
+    def get_uploads_dir(self, project_dir: str) -> str:
+        uploads_dir = os.path.join(project_dir, UPLOADS_DIR_NAME)
+        os.makedirs(uploads_dir, exist_ok=True)
+        return uploads_dir
+
+    def create(self, project_dir: str, project_id: int, file_name: str, content_type: str,
+               upload_length: int) -> UploadSession:
+        self.expire_stale(project_dir)
+
+        upload_id = uuid.uuid4().hex
+        session = UploadSession(
+            upload_id=upload_id,
+            project_id=project_id,
+            file_name=file_name,
+            content_type=content_type,
+            upload_length=upload_length,
+            part_path=os.path.join(self.get_uploads_dir(project_dir), f"{upload_id}.part"),
+        )
+
+        open(session.part_path, "wb").close()
+        with open(session.meta_path, "w") as f:
+            json.dump(session.to_dict(), f)
+
+        self._sessions[upload_id] = session
+        return session
+
+    def get(self, project_dir: str, project_id: int, upload_id: str):
+        """The session of `upload_id` in this project, or None."""
+        if not UPLOAD_ID_PATTERN.fullmatch(upload_id or ""):
+            return None
+
+        session = self._sessions.get(upload_id)
+        if session is None:
+            session = self._load(project_dir, upload_id)
+            if session is None:
+                return None
+            self._sessions[upload_id] = session
+
+        if session.project_id != project_id:
+            return None
+
+        return session
+
+    def _load(self, project_dir: str, upload_id: str):
+        part_path = os.path.join(project_dir, UPLOADS_DIR_NAME, f"{upload_id}.part")
+        meta_path = os.path.splitext(part_path)[0] + ".json"
+        if not (os.path.exists(part_path) and os.path.exists(meta_path)):
+            return None
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        return UploadSession(
+            part_path=part_path,
+            offset=min(os.path.getsize(part_path), meta["upload_length"]),
+            **meta,
+        )
+
+    def complete(self, session: UploadSession, file_path: str):
+        """Moves the finished upload to `file_path`, a rename within the project directory."""
+        os.replace(session.part_path, file_path)
+        self._forget(session)
+
+    def discard(self, session: UploadSession):
+        if os.path.exists(session.part_path):
+            os.remove(session.part_path)
+        self._forget(session)
+
+    def _forget(self, session: UploadSession):
+        if os.path.exists(session.meta_path):
+            os.remove(session.meta_path)
+        self._sessions.pop(session.upload_id, None)
+
+    def expire_stale(self, project_dir: str) -> int:
+        """Removes the uploads of the project idle for more than `ttl_seconds`."""
+        uploads_dir = os.path.join(project_dir, UPLOADS_DIR_NAME)
+        if not os.path.isdir(uploads_dir):
+            return 0
+
+        expired = 0
+        deadline = time.time() - self.ttl_seconds
+        for entry in os.scandir(uploads_dir):
+            upload_id, ext = os.path.splitext(entry.name)
+            if ext != ".part" or entry.stat().st_mtime >= deadline:
+                continue
+
+            session = self._sessions.get(upload_id)
+            if session is not None and session.lock.locked():
+                continue
+
+            os.remove(entry.path)
+            meta_path = os.path.join(uploads_dir, f"{upload_id}.json")
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            self._sessions.pop(upload_id, None)
+            expired += 1
+
+        return expired
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Callable
+
+from .project_activity import ProjectActivityRegistry
+
+logger = logging.getLogger("uvicorn")
+
+
+class VectorMaintenanceScheduler:
+    """
+    Background maintenance of the per-project vector collections.
+
+    Every `interval_seconds` the scheduler collects dead tuple and index size
+    statistics for each project collection and, when the configured thresholds
+    are crossed, runs `VACUUM (ANALYZE)` / `REINDEX CONCURRENTLY` (PGVector).
+    Collections whose backend has no maintenance to run (embedded Qdrant) are
+    reported as not supported. A project that is being ingested is skipped
+    and retried on the next round.
+
+    Index bloat is measured against the index bytes per live row observed right
+    after the last reindex (or the first time the collection was seen).
+    """
+
+    def __init__(self, vectordb_client, list_project_ids: Callable,
+                       collection_name_fn: Callable[[int], str],
+                       activity: ProjectActivityRegistry,
+                       interval_seconds: int = 3600,
+                       dead_ratio_threshold: float = 0.2,
+                       min_dead_rows: int = 1000,
+                       index_bloat_threshold: float = 0.5):
+
+        self.vectordb_client = vectordb_client
+        self.list_project_ids = list_project_ids
+        self.collection_name_fn = collection_name_fn
+        self.activity = activity
+
+        self.interval_seconds = interval_seconds
+        self.dead_ratio_threshold = dead_ratio_threshold
+        self.min_dead_rows = min_dead_rows
+        self.index_bloat_threshold = index_bloat_threshold
+
+        self.collections = {}
+        self.last_round_at = None
+        self.is_running = False
+        self._task = None
+        self._round_lock = asyncio.Lock()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Vector maintenance round failed: {e}")
+
+    def _index_bloat(self, status: dict, stats: dict):
+        bytes_per_row = stats.get("index_bytes_per_row")
+        if not bytes_per_row:
+            return None
+
+        baseline = status.get("baseline_index_bytes_per_row")
+        if not baseline:
+            status["baseline_index_bytes_per_row"] = bytes_per_row
+            return 0.0
+
+        return max(0.0, bytes_per_row / baseline - 1.0)
+
+    def plan(self, status: dict, stats: dict, force: bool = False) -> dict:
+        dead_ratio = stats.get("dead_ratio")
+        dead_rows = stats.get("dead_rows") or 0
+        index_bloat = self._index_bloat(status, stats)
+        status["index_bloat"] = index_bloat
+
+        vacuum = force or stats.get("needs_optimization", False) or (
+            dead_ratio is not None
+            and dead_rows >= self.min_dead_rows
+            and dead_ratio >= self.dead_ratio_threshold
+        )
+        reindex = force or (
+            index_bloat is not None and index_bloat >= self.index_bloat_threshold
+        )
+
+        return {"vacuum": vacuum, "reindex": reindex}
+
+    async def maintain_project(self, project_id: int, force: bool = False) -> dict:
+        collection_name = self.collection_name_fn(project_id)
+        status = self.collections.setdefault(collection_name, {
+            "project_id": project_id,
+            "collection_name": collection_name,
+            "runs": 0,
+            "skipped_busy": 0,
+        })
+
+        stats = await self.vectordb_client.get_maintenance_stats(collection_name=collection_name)
+        status["last_checked_at"] = datetime.now(timezone.utc).isoformat()
+        if stats is None:
+            self.collections.pop(collection_name, None)
+            return None
+
+        status["stats"] = stats
+        if not stats.get("maintenance_supported", True):
+            status["last_action"] = "not_supported"
+            return status
+
+        plan = self.plan(status, stats, force=force)
+        if not plan["vacuum"] and not plan["reindex"]:
+            status["last_action"] = None
+            return status
+
+        if not await self.activity.try_begin_maintenance(project_id):
+            status["skipped_busy"] += 1
+            status["last_action"] = "skipped_busy"
+            return status
+
+        try:
+            result = await self.vectordb_client.run_maintenance(
+                collection_name=collection_name,
+                vacuum=plan["vacuum"],
+                reindex=plan["reindex"],
+            )
+            status["runs"] += 1
+            status["last_action"] = result.get("actions")
+            status["last_run_at"] = datetime.now(timezone.utc).isoformat()
+            status["last_error"] = None
+
+            if "reindex" in result.get("actions", []):
+                refreshed = await self.vectordb_client.get_maintenance_stats(collection_name=collection_name)
+                if refreshed:
+                    status["stats"] = refreshed
+                    status["baseline_index_bytes_per_row"] = refreshed.get("index_bytes_per_row")
+                    status["index_bloat"] = 0.0
+        except Exception as e:
+            logger.error(f"Maintenance failed for collection {collection_name}: {e}")
+            status["last_error"] = str(e)
+        finally:
+            await self.activity.end_maintenance(project_id)
+
+        return status
+
+    async def run_once(self, project_id: int = None, force: bool = False) -> dict:
+        # rounds never overlap, whether started by the timer or by an admin
+        async with self._round_lock:
+            self.is_running = True
+            try:
+                project_ids = [project_id] if project_id is not None else await self.list_project_ids()
+                for pid in project_ids:
+                    try:
+                        await self.maintain_project(project_id=pid, force=force)
+                    except Exception as e:
+                        logger.error(f"Maintenance check failed for project {pid}: {e}")
+                self.last_round_at = datetime.now(timezone.utc).isoformat()
+            finally:
+                self.is_running = False
+
+        return self.get_status()
+
+    def get_status(self) -> dict:
+        return {
+            "enabled": self._task is not None,
+            "is_running": self.is_running,
+            "interval_seconds": self.interval_seconds,
+            "last_round_at": self.last_round_at,
+            "thresholds": {
+                "dead_ratio": self.dead_ratio_threshold,
+                "min_dead_rows": self.min_dead_rows,
+                "index_bloat": self.index_bloat_threshold,
+            },
+            "activity": self.activity.snapshot(),
+            "collections": list(self.collections.values()),
+        }
@@ -1,6 +1,8 @@
 from fastapi import FastAPI
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 from fastapi.middleware.cors import CORSMiddleware
-from routes import base, data, nlp, user, conversation, message, personal_projects, auth, project_admin, maturity
+from routes import base, data, nlp, user, conversation, message, personal_projects, auth, project_admin, maturity, vectordb_admin, jobs
 from helpers.config import get_settings
 from stores.llm.LLMProviderFactory import LLMProviderFactory
 from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
@@ -10,7 +12,15 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.future import select
 
 from helpers.metrics import setup_metrics
+from helpers.project_activity import ProjectActivityRegistry
+from helpers.job_manager import JobManager
+from helpers.idempotency_manager import IdempotencyManager
+from helpers.vector_maintenance import VectorMaintenanceScheduler
+from helpers.upload_sessions import UploadSessionRegistry
+from helpers.stream_bridge import StreamExecutor
+from controllers import NLPController
 from models.UserModel import UserModel
+from models.ProjectModel import ProjectModel
 from models.db_schemes import User, UserRole
 from helpers.security import hash_password
 
@@ -29,7 +39,7 @@ async def startup_span():
     )
 
     llm_provider_factory = LLMProviderFactory(settings)
-    vectordb_provider_factory = VectorDBProviderFactory(config=settings, db_client=app.db_client)
+    vectordb_provider_factory = VectorDBProviderFactory(config=settings, db_client=app.db_client, db_engine=app.db_engine)
 
     # generation client
     app.generation_client = llm_provider_factory.create(provider=settings.GENERATION_BACKEND)
@@ -51,12 +61,59 @@ async def startup_span():
         language=settings.PRIMARY_LANG,
         default_language=settings.DEFAULT_LANG,
     )
+
+    # vector store maintenance, never overlapping with a project ingestion
+    app.project_activity = ProjectActivityRegistry(db_engine=app.db_engine)
+    project_model = await ProjectModel.create_instance(db_client=app.db_client)
+    nlp_controller = NLPController(
+        vectordb_client=app.vectordb_client,
+        generation_client=app.generation_client,
+        embedding_client=app.embedding_client,
+        template_parser=app.template_parser,
+    )
+    app.vector_maintenance = VectorMaintenanceScheduler(
+        vectordb_client=app.vectordb_client,
+        list_project_ids=project_model.get_all_project_ids,
+        collection_name_fn=nlp_controller.create_collection_name,
+        activity=app.project_activity,
+        interval_seconds=settings.VECTOR_DB_MAINTENANCE_INTERVAL,
+        dead_ratio_threshold=settings.VECTOR_DB_MAINTENANCE_DEAD_RATIO,
+        min_dead_rows=settings.VECTOR_DB_MAINTENANCE_MIN_DEAD_ROWS,
+        index_bloat_threshold=settings.VECTOR_DB_MAINTENANCE_INDEX_BLOAT,
+    )
+    if settings.VECTOR_DB_MAINTENANCE_ENABLED:
+        app.vector_maintenance.start()
+
+    app.vector_migrations = {}
+
+    # background process / index jobs, polled through /api/v1/jobs
+    app.job_manager = JobManager()
+    app.idempotency_manager = IdempotencyManager(db_client=app.db_client, db_engine=app.db_engine)
+
+    # threads of the streamed RAG answers, kept apart from the default executor
+    app.stream_executor = StreamExecutor(max_streams=settings.GENERATION_STREAM_WORKERS)
+
+    # resumable chunked uploads, see /api/v1/data/uploads
+    app.upload_sessions = UploadSessionRegistry(ttl_seconds=settings.UPLOAD_SESSION_TTL_SECONDS)
+
+    # file extraction / chunking pool, spawned so workers do not inherit the event loop
+    app.process_pool = None
+    if settings.PROCESSING_POOL_WORKERS > 0:
+        app.process_pool = ProcessPoolExecutor(
+            max_workers=settings.PROCESSING_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
     
     # Créer un admin par défaut s'il n'existe pas
     await create_default_admin(app.db_client)
 
 
 async def shutdown_span():
+    await app.job_manager.shutdown()
+    await app.vector_maintenance.stop()
+    if app.process_pool is not None:
+        app.process_pool.shutdown(wait=False, cancel_futures=True)
+    app.stream_executor.shutdown()
     app.db_engine.dispose()
     await app.vectordb_client.disconnect()
 
@@ -137,3 +194,5 @@ app.include_router(personal_projects.personal_projects_router)
 app.include_router(auth.auth_router)
 app.include_router(project_admin.projects_admin_router)
 app.include_router(maturity.maturity_router)
+app.include_router(vectordb_admin.vectordb_admin_router)
+app.include_router(jobs.jobs_router)
@@ -0,0 +1,84 @@
+"""
+Stream a vector collection from one backend into another without re-embedding.
+
+Usage (from backend/src):
+    python migrate_vectors.py --source QDRANT --destination PGVECTOR --project-id 3
+    python migrate_vectors.py --source PGVECTOR --destination PGVECTOR \
+        --source-collection collection_384_3 --destination-collection collection_384_3_v2
+
+The migration is checkpointed after every batch under assets/database/migrations
+and resumes from there unless --no-resume is given.
+"""
+import argparse
+import asyncio
+import json
+
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from helpers.config import get_settings
+from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
+from controllers.VectorMigrationController import VectorMigrationController
+
+
+async def main(args):
+    settings = get_settings()
+
+    postgres_conn = f"postgresql+asyncpg://{settings.POSTGRES_USERNAME}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_MAIN_DATABASE}"
+    db_engine = create_async_engine(postgres_conn)
+    db_client = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+    factory = VectorDBProviderFactory(config=settings, db_client=db_client, db_engine=db_engine)
+    source_client = factory.create(provider=args.source)
+    # two local Qdrant clients can not share the same storage path
+    destination_client = source_client if args.destination == args.source else factory.create(provider=args.destination)
+
+    if source_client is None or destination_client is None:
+        raise SystemExit("Unknown vector db backend")
+
+    await source_client.connect()
+    if destination_client is not source_client:
+        await destination_client.connect()
+
+    try:
+        migration_controller = VectorMigrationController(
+            source_client=source_client,
+            destination_client=destination_client,
+        )
+
+        source_collection = args.source_collection or migration_controller.get_collection_name(source_client, args.project_id)
+        destination_collection = args.destination_collection or migration_controller.get_collection_name(destination_client, args.project_id)
+
+        if source_collection == destination_collection and args.destination == args.source:
+            raise SystemExit("Source and destination collections are the same")
+
+        report = await migration_controller.migrate(
+            source_collection=source_collection,
+            destination_collection=destination_collection,
+            batch_size=args.batch_size,
+            resume=not args.no_resume,
+            on_progress=lambda migrated: print(f"migrated {migrated} records", flush=True),
+        )
+        print(json.dumps(report, indent=2))
+    finally:
+        await source_client.disconnect()
+        if destination_client is not source_client:
+            await destination_client.disconnect()
+        await db_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate vectors between vector db backends")
+    parser.add_argument("--source", required=True, help="QDRANT or PGVECTOR")
+    parser.add_argument("--destination", required=True, help="QDRANT or PGVECTOR")
+    parser.add_argument("--project-id", type=int, default=None)
+    parser.add_argument("--source-collection", default=None)
+    parser.add_argument("--destination-collection", default=None)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--no-resume", action="store_true")
+    args = parser.parse_args()
+
+    if args.project_id is None and not (args.source_collection and args.destination_collection):
+        parser.error("either --project-id or both collection names are required")
+
+    asyncio.run(main(args))
@@ -1,8 +1,11 @@
 from .BaseDataModel import BaseDataModel
 from .db_schemes import Asset
 from .enums.DataBaseEnum import DataBaseEnum
+from .enums.AssetStatusEnum import AssetStatusEnum
 from bson import ObjectId
 from sqlalchemy.future import select
+from sqlalchemy import update, insert, func, tuple_
+from .db_schemes import DataChunk
 
 class AssetModel(BaseDataModel):
 
@@ -24,6 +27,22 @@ class AssetModel(BaseDataModel):
             await session.refresh(asset)
         return asset
 
+    async def create_assets(self, assets: list):
+        """
+        Inserts the asset rows (dicts of column values) with one multi-row
+        INSERT ... RETURNING, returns the records in the order of `assets`.
+        """
+        if not assets:
+            return []
+
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.scalars(
+                    insert(Asset).returning(Asset, sort_by_parameter_order=True), assets
+                )
+                records = result.all()
+        return records
+
     async def get_all_assets(self):
         
         async with self.db_client() as session:
@@ -54,5 +73,116 @@ class AssetModel(BaseDataModel):
             record = result.scalar_one_or_none()
         return record
 
+    async def get_asset_by_hash(self, asset_hash: str, asset_project_id: int = None,
+                                exclude_asset_id: int = None, with_chunks: bool = False):
+        """
+        Oldest asset holding the same bytes, optionally within one project,
+        and optionally only among assets whose processing finished
+        (CHUNKED or INDEXED) and left chunks behind.
+        """
+        async with self.db_client() as session:
+            stmt = select(Asset).where(Asset.asset_hash == asset_hash)
+            if asset_project_id is not None:
+                stmt = stmt.where(Asset.asset_project_id == asset_project_id)
+            if exclude_asset_id is not None:
+                stmt = stmt.where(Asset.asset_id != exclude_asset_id)
+            if with_chunks:
+                stmt = stmt.where(*self.processed_asset_filters())
+            result = await session.execute(stmt.order_by(Asset.asset_id).limit(1))
+            record = result.scalar_one_or_none()
+        return record
+
+    async def get_assets_by_hashes(self, asset_hashes: list, asset_project_id: int = None,
+                                   with_chunks: bool = False):
+        """{asset_hash: oldest asset holding those bytes}, see get_asset_by_hash."""
+        if not asset_hashes:
+            return {}
+
+        async with self.db_client() as session:
+            stmt = select(Asset).where(Asset.asset_hash.in_(asset_hashes))
+            if asset_project_id is not None:
+                stmt = stmt.where(Asset.asset_project_id == asset_project_id)
+            if with_chunks:
+                stmt = stmt.where(*self.processed_asset_filters())
+            result = await session.execute(stmt.order_by(Asset.asset_id))
+            records = result.scalars().all()
+
+        assets_by_hash = {}
+        for record in records:
+            assets_by_hash.setdefault(record.asset_hash, record)
+        return assets_by_hash
 
-    
+    async def update_asset_config(self, asset_id: int, asset_config: dict):
+        async with self.db_client() as session:
+            async with session.begin():
+                asset = await session.get(Asset, asset_id)
+                if asset is None:
+                    return None
+                asset.asset_config = {**(asset.asset_config or {}), **asset_config}
+        return asset
+
+    async def get_dedup_dependent_asset_ids(self, asset_project_id: int, asset_id: int) -> list:
+        """Assets of the project whose chunks were collapsed against chunks of `asset_id`."""
+        async with self.db_client() as session:
+            stmt = select(Asset.asset_id).where(
+                Asset.asset_project_id == asset_project_id,
+                Asset.asset_config["dedup_reference_asset_ids"].contains([asset_id])
+            ).order_by(Asset.asset_id)
+            result = await session.execute(stmt)
+            asset_ids = result.scalars().all()
+        return list(asset_ids)
+
+    async def get_project_asset_versions(self, asset_project_id: int, asset_statuses: list) -> dict:
+        """
+        {asset_id: version} of the project assets in `asset_statuses`, the
+        version being the time of the last change of the asset row.
+        """
+        async with self.db_client() as session:
+            stmt = select(Asset.asset_id, self.asset_version()).where(
+                Asset.asset_project_id == asset_project_id,
+                Asset.asset_status.in_(asset_statuses)
+            ).order_by(Asset.asset_id)
+            result = await session.execute(stmt)
+            asset_versions = { asset_id: version for asset_id, version in result.all() }
+        return asset_versions
+
+    @staticmethod
+    def processed_asset_filters():
+        return (
+            Asset.asset_status.in_([AssetStatusEnum.CHUNKED.value, AssetStatusEnum.INDEXED.value]),
+            select(DataChunk.chunk_id).where(DataChunk.chunk_asset_id == Asset.asset_id).exists(),
+        )
+
+    @staticmethod
+    def asset_version():
+        return func.coalesce(Asset.updated_at, Asset.created_at)
+
+    async def update_assets_status(self, asset_status: str, asset_ids: list = None,
+                                   asset_project_id: int = None, chunker_fingerprint: str = None,
+                                   asset_versions: dict = None, from_statuses: list = None):
+        """
+        Moves the given assets, or every asset of a project, to `asset_status`.
+        The chunker fingerprint is only written when one is given.
+        With `asset_versions` ({asset_id: version}) and `from_statuses`, only
+        the assets not changed since these versions were read are moved.
+        """
+        values = {"asset_status": asset_status}
+        if chunker_fingerprint is not None:
+            values["asset_chunker_fingerprint"] = chunker_fingerprint
+
+        stmt = update(Asset).values(**values)
+        if asset_ids is not None:
+            stmt = stmt.where(Asset.asset_id.in_(asset_ids))
+        if asset_project_id is not None:
+            stmt = stmt.where(Asset.asset_project_id == asset_project_id)
+        if asset_versions is not None:
+            if not asset_versions:
+                return 0
+            stmt = stmt.where(tuple_(Asset.asset_id, self.asset_version()).in_(list(asset_versions.items())))
+        if from_statuses is not None:
+            stmt = stmt.where(Asset.asset_status.in_(from_statuses))
+
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(stmt)
+        return result.rowcount
@@ -4,7 +4,8 @@ from .enums.DataBaseEnum import DataBaseEnum
 from bson.objectid import ObjectId
 from pymongo import InsertOne
 from sqlalchemy.future import select
-from sqlalchemy import func, delete
+from sqlalchemy import func, delete, insert, literal, cast, case, Integer, Text
+from sqlalchemy.dialects.postgresql import JSONB
 
 class ChunkModel(BaseDataModel):
 
@@ -33,15 +34,42 @@ class ChunkModel(BaseDataModel):
             chunk = result.scalar_one_or_none()
         return chunk
 
-    async def insert_many_chunks(self, chunks: list, batch_size: int=100):
+    async def insert_many_chunks(self, chunks: list, batch_size: int=1000):
+
+        chunk_rows = [
+            {
+                "chunk_text": chunk.chunk_text,
+                "chunk_metadata": chunk.chunk_metadata,
+                "chunk_order": chunk.chunk_order,
+                "chunk_project_id": chunk.chunk_project_id,
+                "chunk_asset_id": chunk.chunk_asset_id,
+            }
+            for chunk in chunks
+        ]
+        chunk_ids = await self.insert_chunk_rows(chunk_rows=chunk_rows, batch_size=batch_size)
+        return len(chunk_ids)
+
+    async def insert_chunk_rows(self, chunk_rows: list, batch_size: int=1000):
+        """
+        Bulk inserts chunks given as dicts of column values, without building
+        ORM objects: multi-row INSERT ... RETURNING statements of `batch_size`
+        rows, all in one transaction. Returns the new chunk ids in the order
+        of `chunk_rows`.
+        """
+        if not chunk_rows:
+            return []
+
+        chunks_table = DataChunk.__table__
+        stmt = insert(chunks_table).returning(chunks_table.c.chunk_id, sort_by_parameter_order=True)
 
         async with self.db_client() as session:
             async with session.begin():
-                for i in range(0, len(chunks), batch_size):
-                    batch = chunks[i:i+batch_size]
-                    session.add_all(batch)
-            await session.commit()
-        return len(chunks)
+                connection = await session.connection(
+                    execution_options={"insertmanyvalues_page_size": batch_size}
+                )
+                result = await connection.execute(stmt, chunk_rows)
+                chunk_ids = result.scalars().all()
+        return list(chunk_ids)
 
     async def delete_chunks_by_project_id(self, project_id: ObjectId):
         async with self.db_client() as session:
@@ -52,15 +80,163 @@ class ChunkModel(BaseDataModel):
     
     async def get_poject_chunks(self, project_id: ObjectId, page_no: int=1, page_size: int=50):
         async with self.db_client() as session:
-            stmt = select(DataChunk).where(DataChunk.chunk_project_id == project_id).offset((page_no - 1) * page_size).limit(page_size)
+            stmt = select(DataChunk).where(DataChunk.chunk_project_id == project_id).order_by(DataChunk.chunk_id).offset((page_no - 1) * page_size).limit(page_size)
+            result = await session.execute(stmt)
+            records = result.scalars().all()
+        return records
+
+    def _filter_assets(self, stmt, asset_ids: list = None, exclude_asset_ids: list = None):
+        if asset_ids is not None:
+            stmt = stmt.where(DataChunk.chunk_asset_id.in_(asset_ids))
+        if exclude_asset_ids:
+            stmt = stmt.where(DataChunk.chunk_asset_id.not_in(exclude_asset_ids))
+        return stmt
+
+    async def delete_chunks_by_asset_id(self, asset_id: int):
+        async with self.db_client() as session:
+            stmt = delete(DataChunk).where(DataChunk.chunk_asset_id == asset_id)
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
+
+    async def get_project_chunks_after(self, project_id: ObjectId, last_chunk_id: int=0, page_size: int=50,
+                                       asset_ids: list = None, exclude_asset_ids: list = None):
+        async with self.db_client() as session:
+            stmt = select(DataChunk).where(
+                DataChunk.chunk_project_id == project_id,
+                DataChunk.chunk_id > last_chunk_id
+            )
+            stmt = self._filter_assets(stmt, asset_ids, exclude_asset_ids)
+            stmt = stmt.order_by(DataChunk.chunk_id).limit(page_size)
             result = await session.execute(stmt)
             records = result.scalars().all()
         return records
+
+    async def iter_project_chunks(self, project_id: ObjectId, page_size: int=50,
+                                  asset_ids: list = None, exclude_asset_ids: list = None):
+        """
+        Keyset scan over all the chunks of a project, ordered by chunk_id,
+        optionally restricted to (or excluding) some assets.
+        Each page is served by the (chunk_project_id, chunk_id) index, so the
+        cost of a page does not grow with its position in the scan.
+        """
+        last_chunk_id = 0
+        while True:
+            page_chunks = await self.get_project_chunks_after(
+                project_id=project_id,
+                last_chunk_id=last_chunk_id,
+                page_size=page_size,
+                asset_ids=asset_ids,
+                exclude_asset_ids=exclude_asset_ids,
+            )
+            if not page_chunks:
+                break
+
+            yield page_chunks
+
+            if len(page_chunks) < page_size:
+                break
+            last_chunk_id = page_chunks[-1].chunk_id
     
-    async def get_total_chunks_count(self, project_id: ObjectId):
+    async def iter_asset_chunk_ids(self, asset_id: int, page_size: int=1000):
+        """Keyset scan over the chunk ids of an asset, `page_size` ids at a time."""
+        last_chunk_id = 0
+        while True:
+            async with self.db_client() as session:
+                result = await session.execute(
+                    select(DataChunk.chunk_id).where(
+                        DataChunk.chunk_asset_id == asset_id,
+                        DataChunk.chunk_id > last_chunk_id,
+                    ).order_by(DataChunk.chunk_id).limit(page_size)
+                )
+                chunk_ids = result.scalars().all()
+            if not chunk_ids:
+                break
+
+            yield list(chunk_ids)
+
+            if len(chunk_ids) < page_size:
+                break
+            last_chunk_id = chunk_ids[-1]
+
+    async def iter_project_dedup_signatures(self, project_id: int, signature_sizes: tuple,
+                                            page_size: int=1000, exclude_asset_ids: list = None):
+        """
+        Keyset scan yielding pages of (chunk_asset_id, chunk_dedup_signature,
+        chunk_text) of a project. The text is only read for the chunks whose
+        stored signature is missing or not of one of `signature_sizes`.
+        """
+        has_signature = func.coalesce(
+            func.octet_length(DataChunk.chunk_dedup_signature).in_(list(signature_sizes)), False
+        )
+        last_chunk_id = 0
+        while True:
+            async with self.db_client() as session:
+                stmt = select(
+                    DataChunk.chunk_id,
+                    DataChunk.chunk_asset_id,
+                    case((has_signature, DataChunk.chunk_dedup_signature), else_=None),
+                    case((has_signature, None), else_=DataChunk.chunk_text),
+                ).where(
+                    DataChunk.chunk_project_id == project_id,
+                    DataChunk.chunk_id > last_chunk_id
+                )
+                stmt = self._filter_assets(stmt, exclude_asset_ids=exclude_asset_ids)
+                result = await session.execute(stmt.order_by(DataChunk.chunk_id).limit(page_size))
+                rows = result.all()
+            if not rows:
+                break
+
+            yield [ (asset_id, signature, text) for _, asset_id, signature, text in rows ]
+
+            if len(rows) < page_size:
+                break
+            last_chunk_id = rows[-1][0]
+
+    async def clone_asset_chunks(self, source_asset_id: int, project_id: int, asset_id: int):
+        """
+        Copies every chunk of an asset to another asset in one INSERT ... SELECT.
+        The copies keep a `source_chunk_id` metadata key; returns the list of
+        (source_chunk_id, new_chunk_id) pairs.
+        """
+        source_chunk_id = DataChunk.chunk_metadata["source_chunk_id"].astext
+
+        copied_chunks = select(
+            func.gen_random_uuid(),
+            DataChunk.chunk_text,
+            func.coalesce(DataChunk.chunk_metadata, cast(literal("{}"), JSONB)).op("||")(
+                func.jsonb_build_object(cast(literal("source_chunk_id"), Text), DataChunk.chunk_id)
+            ),
+            DataChunk.chunk_order,
+            DataChunk.chunk_dedup_signature,
+            cast(literal(project_id), Integer),
+            cast(literal(asset_id), Integer),
+        ).where(DataChunk.chunk_asset_id == source_asset_id).order_by(DataChunk.chunk_id)
+
+        stmt = insert(DataChunk).from_select(
+            ["chunk_uuid", "chunk_text", "chunk_metadata", "chunk_order", "chunk_dedup_signature",
+             "chunk_project_id", "chunk_asset_id"],
+            copied_chunks,
+        ).returning(cast(source_chunk_id, Integer), DataChunk.chunk_id)
+
+        async with self.db_client() as session:
+            async with session.begin():
+                result = await session.execute(stmt)
+                pairs = [ (row[0], row[1]) for row in result.fetchall() ]
+        return pairs
+
+    async def get_asset_chunks_count(self, asset_id: int):
+        async with self.db_client() as session:
+            result = await session.execute(
+                select(func.count(DataChunk.chunk_id)).where(DataChunk.chunk_asset_id == asset_id)
+            )
+        return result.scalar()
+
+    async def get_total_chunks_count(self, project_id: ObjectId, asset_ids: list = None):
         total_count = 0
         async with self.db_client() as session:
             count_sql = select(func.count(DataChunk.chunk_id)).where(DataChunk.chunk_project_id == project_id)
+            count_sql = self._filter_assets(count_sql, asset_ids)
             records_count = await session.execute(count_sql)
             total_count = records_count.scalar()
         
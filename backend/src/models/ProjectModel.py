@@ -59,6 +59,11 @@ class ProjectModel(BaseDataModel):
 
                 return projects, total_pages
 
+    async def get_all_project_ids(self):
+        async with self.db_client() as session:
+            result = await session.execute(select(Project.project_id).order_by(Project.project_id))
+            return result.scalars().all()
+
     async def create_project_with_details(self, nom_projet: str, description_projet: str = None, user_id: int = None, visibility: str = 'private'):
         """Créer un nouveau projet avec nom et description"""
         async with self.db_client() as session:
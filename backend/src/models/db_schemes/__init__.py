@@ -1 +1 @@
-from models.db_schemes.minirag.schemes import Project, DataChunk, Asset, RetrievedDocument, User, UserRole, Conversation, Message
+from models.db_schemes.minirag.schemes import Project, DataChunk, Asset, RetrievedDocument, User, UserRole, Conversation, Message, CeleryTaskExecution
@@ -0,0 +1,28 @@
+"""chunk project keyset index
+
+Revision ID: 4b1e7d2a9c31
+Revises: c8f54b2d8b6d
+Create Date: 2026-10-19 09:12:44.318201
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b1e7d2a9c31'
+down_revision: Union[str, None] = 'c8f54b2d8b6d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_chunk_project_id_chunk_id', 'chunks', ['chunk_project_id', 'chunk_id'], unique=False)
+    op.drop_index('ix_chunk_project_id', table_name='chunks')
+
+
+def downgrade() -> None:
+    op.create_index('ix_chunk_project_id', 'chunks', ['chunk_project_id'], unique=False)
+    op.drop_index('ix_chunk_project_id_chunk_id', table_name='chunks')
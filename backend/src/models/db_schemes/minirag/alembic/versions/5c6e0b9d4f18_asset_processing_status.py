@@ -0,0 +1,38 @@
+"""asset processing status
+
+Revision ID: 5c6e0b9d4f18
+Revises: e2a7c4f91b05
+Create Date: 2026-10-19 16:02:37.419205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c6e0b9d4f18'
+down_revision: Union[str, None] = 'e2a7c4f91b05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('assets', sa.Column('asset_status', sa.String(), server_default='uploaded', nullable=False))
+    op.add_column('assets', sa.Column('asset_chunker_fingerprint', sa.String(length=64), nullable=True))
+    op.create_index('ix_asset_project_id_status', 'assets', ['asset_project_id', 'asset_status'], unique=False)
+
+    # assets chunked before this revision are only known to be chunked: their
+    # vectors may be missing and, without a chunker fingerprint, the next
+    # /process re-processes them anyway
+    op.execute(
+        "UPDATE assets SET asset_status = 'chunked' "
+        "WHERE EXISTS (SELECT 1 FROM chunks WHERE chunks.chunk_asset_id = assets.asset_id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_asset_project_id_status', table_name='assets')
+    op.drop_column('assets', 'asset_chunker_fingerprint')
+    op.drop_column('assets', 'asset_status')
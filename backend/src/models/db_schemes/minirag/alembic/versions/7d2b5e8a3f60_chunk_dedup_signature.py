@@ -0,0 +1,26 @@
+"""chunk dedup signature
+
+Revision ID: 7d2b5e8a3f60
+Revises: 5c6e0b9d4f18
+Create Date: 2026-10-19 18:41:05.627390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2b5e8a3f60'
+down_revision: Union[str, None] = '5c6e0b9d4f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('chunks', sa.Column('chunk_dedup_signature', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('chunks', 'chunk_dedup_signature')
@@ -0,0 +1,50 @@
+"""celery task executions queue
+
+Revision ID: 9d3f6a1c2e47
+Revises: 4b1e7d2a9c31
+Create Date: 2026-10-19 11:02:17.540932
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3f6a1c2e47'
+down_revision: Union[str, None] = '4b1e7d2a9c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('celery_task_executions',
+    sa.Column('execution_id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('task_name', sa.String(length=255), nullable=False),
+    sa.Column('task_args_hash', sa.String(length=64), nullable=False),
+    sa.Column('task_args', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('celery_task_id', sa.UUID(), nullable=True),
+    sa.Column('status', sa.String(length=20), server_default='PENDING', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('worker_id', sa.String(length=255), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('progress', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('execution_id')
+    )
+    op.create_index('ix_task_args_hash', 'celery_task_executions', ['task_args_hash'], unique=True)
+    op.create_index('ix_task_status_execution_id', 'celery_task_executions', ['status', 'execution_id'], unique=False)
+    op.create_index('ix_task_created_at', 'celery_task_executions', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_created_at', table_name='celery_task_executions')
+    op.drop_index('ix_task_status_execution_id', table_name='celery_task_executions')
+    op.drop_index('ix_task_args_hash', table_name='celery_task_executions')
+    op.drop_table('celery_task_executions')
@@ -0,0 +1,26 @@
+"""task cancel request
+
+Revision ID: a4c8f1e6d952
+Revises: 7d2b5e8a3f60
+Create Date: 2026-10-19 19:27:51.804116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8f1e6d952'
+down_revision: Union[str, None] = '7d2b5e8a3f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('celery_task_executions', sa.Column('cancel_requested_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('celery_task_executions', 'cancel_requested_at')
@@ -0,0 +1,28 @@
+"""asset content hash
+
+Revision ID: e2a7c4f91b05
+Revises: 9d3f6a1c2e47
+Create Date: 2026-10-19 14:26:51.083417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c4f91b05'
+down_revision: Union[str, None] = '9d3f6a1c2e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('assets', sa.Column('asset_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_asset_hash', 'assets', ['asset_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_asset_hash', table_name='assets')
+    op.drop_column('assets', 'asset_hash')
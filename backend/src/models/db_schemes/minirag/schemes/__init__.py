@@ -5,3 +5,4 @@ from .datachunk import DataChunk, RetrievedDocument
 from .user import User, UserRole
 from .conversation import Conversation
 from .message import Message
+from .celery_task_execution import CeleryTaskExecution
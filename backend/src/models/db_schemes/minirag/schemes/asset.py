@@ -16,6 +16,9 @@ class Asset(SQLAlchemyBase):
     asset_name = Column(String, nullable=False)
     asset_size = Column(Integer, nullable=False)
     asset_config = Column(JSONB, nullable=True)
+    asset_hash = Column(String(64), nullable=True)
+    asset_status = Column(String, nullable=False, default="uploaded", server_default="uploaded")
+    asset_chunker_fingerprint = Column(String(64), nullable=True)
 
     asset_project_id = Column(Integer, ForeignKey("projects.project_id"), nullable=False)
 
@@ -28,5 +31,7 @@ class Asset(SQLAlchemyBase):
     __table_args__ = (
         Index('ix_asset_project_id', asset_project_id),
         Index('ix_asset_type', asset_type),
+        Index('ix_asset_hash', asset_hash),
+        Index('ix_asset_project_id_status', asset_project_id, asset_status),
     )
 
@@ -0,0 +1,38 @@
+from .minirag_base import SQLAlchemyBase
+from sqlalchemy import Column, Integer, DateTime, func, String, Text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Index
+
+class CeleryTaskExecution(SQLAlchemyBase):
+
+    __tablename__ = "celery_task_executions"
+
+    execution_id = Column(Integer, primary_key=True, autoincrement=True)
+
+    task_name = Column(String(255), nullable=False)
+    task_args_hash = Column(String(64), nullable=False)
+    task_args = Column(JSONB, nullable=True)
+    celery_task_id = Column(UUID(as_uuid=True), nullable=True)
+
+    status = Column(String(20), nullable=False, default='PENDING', server_default='PENDING')
+    attempts = Column(Integer, nullable=False, default=0, server_default='0')
+    worker_id = Column(String(255), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    # set by a cancel request, the worker running the task sees it on its next heartbeat
+    cancel_requested_at = Column(DateTime(timezone=True), nullable=True)
+
+    progress = Column(JSONB, nullable=True)
+    result = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+
+    __table_args__ = (
+        Index('ix_task_args_hash', task_args_hash, unique=True),
+        # dequeue scans PENDING rows in id order
+        Index('ix_task_status_execution_id', status, execution_id),
+        Index('ix_task_created_at', created_at),
+    )
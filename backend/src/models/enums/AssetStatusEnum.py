@@ -0,0 +1,9 @@
+from enum import Enum
+
+class AssetStatusEnum(Enum):
+
+    UPLOADED = "uploaded"
+    EXTRACTED = "extracted"
+    CHUNKED = "chunked"
+    INDEXED = "indexed"
+    FAILED = "failed"
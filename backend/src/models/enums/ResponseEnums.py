@@ -19,4 +19,16 @@ class ResponseSignal(Enum):
     VECTORDB_SEARCH_SUCCESS = "vectordb_search_success"
     RAG_ANSWER_ERROR = "rag_answer_error"
     RAG_ANSWER_SUCCESS = "rag_answer_success"
-    
\ No newline at end of file
+    RAG_STREAM_BUSY = "rag_stream_busy"
+    JOB_ENQUEUED = "job_enqueued"
+    JOB_NOT_FOUND = "job_not_found"
+    JOB_STATUS = "job_status"
+    JOB_CANCELLED = "job_cancelled"
+    JOB_NOT_CANCELLABLE = "job_not_cancellable"
+    UPLOAD_SESSION_CREATED = "upload_session_created"
+    UPLOAD_STATUS = "upload_status"
+    UPLOAD_CHUNK_SUCCESS = "upload_chunk_success"
+    UPLOAD_NOT_FOUND = "upload_not_found"
+    UPLOAD_OFFSET_MISMATCH = "upload_offset_mismatch"
+    UPLOAD_INCOMPLETE = "upload_incomplete"
+    FILE_BATCH_TOO_LARGE = "file_batch_too_large"
@@ -0,0 +1,6 @@
+from enum import Enum
+
+class TaskNameEnum(Enum):
+
+    PROCESS_PROJECT = "process_project"
+    INDEX_PROJECT = "index_project"
@@ -0,0 +1,9 @@
+from enum import Enum
+
+class TaskStatusEnum(Enum):
+
+    PENDING = "PENDING"
+    STARTED = "STARTED"
+    SUCCESS = "SUCCESS"
+    FAILURE = "FAILURE"
+    CANCELLED = "CANCELLED"
@@ -1,21 +1,36 @@
 from time import process_time
-from fastapi import FastAPI, APIRouter, Depends, UploadFile, status, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, Depends, UploadFile, status, Request, Header, File, Form
+from fastapi.responses import JSONResponse, Response
+from starlette.requests import ClientDisconnect
 import os
 from helpers.config import get_settings, Settings
 from controllers import DataController, ProjectController, ProcessController
 import aiofiles
 from models import ResponseSignal
 import logging
-from .schemes.data import ProcessRequest
+from .schemes.data import ProcessRequest, UploadCreateRequest
 from models.ProjectModel import ProjectModel
 from models.ChunkModel import ChunkModel
 from models.AssetModel import AssetModel
 from models.db_schemes import DataChunk, Asset
 from models.enums.AssetTypeEnum import AssetTypeEnum
+from models.enums.AssetStatusEnum import AssetStatusEnum
 from controllers import NLPController
+from controllers.ProcessController import extract_file_chunks, iter_spooled_chunks
+from helpers.job_manager import job_response
+from helpers.chunk_dedup import ChunkDeduplicator
+from helpers.indexing_pipeline import BatchFeed, IndexedChunk
+from helpers.upload_sessions import UploadOffsetMismatchError, UploadSizeExceededError
+from models.enums.TaskNameEnum import TaskNameEnum
+from .jobs import enqueue_job
 from sqlalchemy import delete
-from sqlalchemy.sql import text as sql_text
+import asyncio
+import contextlib
+import hashlib
+import itertools
+import json
+from collections import defaultdict
+from typing import List
 
 logger = logging.getLogger('uvicorn.error')
 
@@ -49,6 +64,7 @@ async def list_assets_endpoint(request: Request, project_id: int):
             "asset_id": record.asset_id,
             "asset_name": record.asset_name,
             "asset_size": record.asset_size,
+            "asset_status": record.asset_status,
             "created_at": str(record.created_at) if getattr(record, "created_at", None) else None,
         }
         for record in project_files
@@ -94,49 +110,531 @@ async def upload_data(request: Request, project_id: int, file: UploadFile,
         project_id=project_id
     )
 
+    asset_hash, file_size, error_signal = await save_uploaded_file(
+        file, file_path, data_controller, chunk_size=app_settings.FILE_DEFAULT_CHUNK_SIZE
+    )
+
+    if error_signal is not None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": error_signal
+            }
+        )
+
+    content = await register_uploaded_file(
+        request.app, project, file_path, file_id,
+        asset_hash=asset_hash, asset_size=file_size,
+    )
+
+    return JSONResponse(content=content)
+
+
+async def save_uploaded_file(file: UploadFile, file_path: str, data_controller: DataController, chunk_size: int):
+    """
+    Streams `file` to `file_path`. The content digest is computed and the
+    size limit enforced on the way, the file is read once. Returns
+    (asset_hash, file_size, error signal or None); on error nothing is
+    left on disk.
+    """
+    file_hasher = hashlib.sha256()
+    file_size = 0
     try:
         async with aiofiles.open(file_path, "wb") as f:
-            while chunk := await file.read(app_settings.FILE_DEFAULT_CHUNK_SIZE):
+            while chunk := await file.read(chunk_size):
+                file_size += len(chunk)
+                if data_controller.is_size_exceeded(file_size):
+                    break
+                file_hasher.update(chunk)
                 await f.write(chunk)
     except Exception as e:
-
         logger.error(f"Error while uploading file: {e}")
+        error_signal = ResponseSignal.FILE_UPLOAD_FAILED.value
+    else:
+        error_signal = None
+        if data_controller.is_size_exceeded(file_size):
+            error_signal = ResponseSignal.FILE_SIZE_EXCEEDED.value
+
+    if error_signal is not None:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        return None, file_size, error_signal
+
+    return file_hasher.hexdigest(), file_size, None
+
+
+async def register_uploaded_file(app, project, file_path: str, file_id: str, asset_hash: str, asset_size: int):
+    """
+    Creates the asset of a file written to the project directory and reuses
+    the chunks of a processed copy. When the project already has the same
+    bytes, the new file is removed and the existing asset is returned.
+    """
+    asset_model = await AssetModel.create_instance(
+        db_client=app.db_client
+    )
+
+    # the same bytes were already uploaded to this project
+    existing_asset = await asset_model.get_asset_by_hash(
+        asset_hash=asset_hash, asset_project_id=project.project_id
+    )
+    if existing_asset is not None:
+        os.remove(file_path)
+        return {
+            "signal": ResponseSignal.FILE_UPLOAD_SUCCESS.value,
+            "file_id": str(existing_asset.asset_id),
+            "asset_name": existing_asset.asset_name,
+            "is_duplicate": True,
+        }
 
+    asset_resource = Asset(
+        asset_project_id=project.project_id,
+        asset_type=AssetTypeEnum.FILE.value,
+        asset_name=file_id,
+        asset_size=asset_size,
+        asset_hash=asset_hash,
+    )
+
+    asset_record = await asset_model.create_asset(asset=asset_resource)
+
+    try:
+        reused = await reuse_processed_asset(app, project, asset_record)
+    except Exception as e:
+        logger.error(f"Error while reusing the chunks of asset {asset_record.asset_name}: {e}")
+        reused = None
+
+    return {
+        "signal": ResponseSignal.FILE_UPLOAD_SUCCESS.value,
+        "file_id": str(asset_record.asset_id),
+        "asset_name": asset_record.asset_name,
+        "reused": reused,
+    }
+
+
+@data_router.post("/upload/batch/{project_id}")
+async def upload_batch_endpoint(request: Request, project_id: int, files: List[UploadFile] = File(...),
+                                process: bool = Form(False), chunk_size: int = Form(100),
+                                overlap_size: int = Form(20), with_summaries: bool = Form(False),
+                                with_indexing: bool = Form(False), run_async: bool = Form(True),
+                                app_settings: Settings = Depends(get_settings)):
+    """
+    Uploads many files in one request. Up to FILE_UPLOAD_CONCURRENCY files
+    are written at the same time and their assets are created by a single
+    bulk insert. With `process`, the new assets are then chunked, and also
+    indexed in the same pass with `with_indexing`, as a background job
+    unless `run_async` is false.
+    """
+    if len(files) > app_settings.FILE_BATCH_MAX_FILES:
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={
-                "signal": ResponseSignal.FILE_UPLOAD_FAILED.value
+                "signal": ResponseSignal.FILE_BATCH_TOO_LARGE.value,
+                "max_files": app_settings.FILE_BATCH_MAX_FILES,
             }
         )
 
-    # store the assets into the database
-    asset_model = await AssetModel.create_instance(
+    project_model = await ProjectModel.create_instance(
         db_client=request.app.db_client
     )
 
-    asset_resource = Asset(
+    project = await project_model.get_project_or_create_one(
+        project_id=project_id
+    )
+
+    data_controller = DataController()
+    files_results = [ {"file_name": file.filename} for file in files ]
+
+    valid_files = []
+    for index, file in enumerate(files):
+        is_valid, result_signal = data_controller.validate_uploaded_file(file=file)
+        if not is_valid:
+            files_results[index]["signal"] = result_signal
+            continue
+        valid_files.append((index, file))
+
+    # the names are reserved off the event loop, before the concurrent writes
+    reserved_paths = await asyncio.to_thread(
+        reserve_upload_paths, data_controller, project_id, [ file.filename for _, file in valid_files ]
+    )
+    pending_files = [
+        (index, file, file_path, file_id)
+        for (index, file), (file_path, file_id) in zip(valid_files, reserved_paths)
+    ]
+
+    semaphore = asyncio.Semaphore(max(app_settings.FILE_UPLOAD_CONCURRENCY, 1))
+
+    async def save_file(file, file_path):
+        async with semaphore:
+            return await save_uploaded_file(
+                file, file_path, data_controller, chunk_size=app_settings.FILE_DEFAULT_CHUNK_SIZE
+            )
+
+    try:
+        saved_files = await asyncio.gather(*[
+            save_file(file, file_path) for _, file, file_path, _ in pending_files
+        ])
+
+        uploaded_files = []
+        for (index, _, file_path, file_id), (asset_hash, file_size, error_signal) in zip(pending_files, saved_files):
+            if error_signal is not None:
+                files_results[index]["signal"] = error_signal
+                continue
+            uploaded_files.append((index, file_path, file_id, asset_hash, file_size))
+
+        asset_records = await register_uploaded_files(request.app, project, uploaded_files, files_results)
+    except Exception as e:
+        # no asset was created, none of the written files is kept
+        logger.error(f"Error while registering uploaded files: {e}")
+        await asyncio.to_thread(remove_files, [ file_path for file_path, _ in reserved_paths ])
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={
+                "signal": ResponseSignal.FILE_UPLOAD_FAILED.value,
+            }
+        )
+
+    content = {
+        "signal": ResponseSignal.FILE_UPLOAD_SUCCESS.value,
+        "uploaded_files": len(asset_records),
+        "failed_files": sum(
+            1 for result in files_results if result["signal"] != ResponseSignal.FILE_UPLOAD_SUCCESS.value
+        ),
+        "files": files_results,
+    }
+
+    if not process or not asset_records:
+        return JSONResponse(content=content)
+
+    process_request = ProcessRequest(
+        chunk_size=chunk_size, overlap_size=overlap_size,
+        with_summaries=with_summaries, with_indexing=with_indexing, run_async=run_async,
+    )
+    project_files_ids, _, _ = await get_project_files_ids(request.app, project, process_request)
+
+    # reused assets are usually up to date already
+    batch_asset_ids = { record.asset_id for record in asset_records }
+    project_files_ids = {
+        asset_id: file_id for asset_id, file_id in project_files_ids.items()
+        if asset_id in batch_asset_ids
+    }
+
+    if not project_files_ids:
+        content["process"] = {
+            "signal": ResponseSignal.PROCESSING_SUCCESS.value,
+            "inserted_chunks": 0,
+            "processed_files": 0,
+        }
+        return JSONResponse(content=content)
+
+    if run_async:
+        job_response_content = await enqueue_job(
+            request.app,
+            job_type="process",
+            task_name=TaskNameEnum.PROCESS_PROJECT.value,
+            task_args=get_process_task_args(project, project_files_ids, process_request),
+            work=lambda job: job_response(run_process_assets(
+                request.app, project, project_files_ids, process_request, job=job
+            )),
+        )
+        content["process"] = json.loads(job_response_content.body)
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=content)
+
+    status_code, content["process"] = await run_process_assets(
+        request.app, project, project_files_ids, process_request
+    )
+    return JSONResponse(status_code=status_code, content=content)
+
+
+def reserve_upload_paths(data_controller: DataController, project_id: int, file_names: list) -> list:
+    """
+    [(file_path, file_id)] of new empty files for `file_names`. Each file is
+    created exclusively, so no other upload can pick the same path.
+    """
+    reserved_paths = []
+    for file_name in file_names:
+        while True:
+            file_path, file_id = data_controller.generate_unique_filepath(
+                orig_file_name=file_name,
+                project_id=project_id
+            )
+            try:
+                open(file_path, "xb").close()
+            except FileExistsError:
+                continue
+            reserved_paths.append((file_path, file_id))
+            break
+    return reserved_paths
+
+
+def remove_files(file_paths: list):
+    for file_path in file_paths:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+async def register_uploaded_files(app, project, uploaded_files: list, files_results: list):
+    """
+    Batch version of register_uploaded_file. `uploaded_files` holds
+    (index in files_results, file_path, file_id, asset_hash, asset_size).
+    Duplicates are looked up with one query, the new assets are inserted
+    with one statement, and each file's entry of `files_results` is
+    completed. Returns the created asset records.
+    """
+    if not uploaded_files:
+        return []
+
+    asset_model = await AssetModel.create_instance(
+        db_client=app.db_client
+    )
+
+    existing_assets = await asset_model.get_assets_by_hashes(
+        asset_hashes=list({ asset_hash for _, _, _, asset_hash, _ in uploaded_files }),
         asset_project_id=project.project_id,
-        asset_type=AssetTypeEnum.FILE.value,
-        asset_name=file_id,
-        asset_size=os.path.getsize(file_path)
     )
 
-    asset_record = await asset_model.create_asset(asset=asset_resource)
+    asset_rows = []
+    new_file_indexes = []
+    first_index_by_hash = {}
+    batch_duplicates = []
+    for index, file_path, file_id, asset_hash, asset_size in uploaded_files:
+        existing_asset = existing_assets.get(asset_hash)
+        if existing_asset is not None or asset_hash in first_index_by_hash:
+            # the same bytes are already in the project, or earlier in this batch
+            os.remove(file_path)
+            files_results[index].update({
+                "signal": ResponseSignal.FILE_UPLOAD_SUCCESS.value,
+                "is_duplicate": True,
+            })
+            if existing_asset is not None:
+                files_results[index].update({
+                    "file_id": str(existing_asset.asset_id),
+                    "asset_name": existing_asset.asset_name,
+                })
+            else:
+                batch_duplicates.append((index, first_index_by_hash[asset_hash]))
+            continue
+
+        first_index_by_hash[asset_hash] = index
+        new_file_indexes.append(index)
+        asset_rows.append({
+            "asset_project_id": project.project_id,
+            "asset_type": AssetTypeEnum.FILE.value,
+            "asset_name": file_id,
+            "asset_size": asset_size,
+            "asset_hash": asset_hash,
+        })
+
+    asset_records = await asset_model.create_assets(asset_rows)
+
+    # the assets exist from here on, reusing processed copies is optional
+    try:
+        processed_sources = await asset_model.get_assets_by_hashes(
+            asset_hashes=[ record.asset_hash for record in asset_records ], with_chunks=True,
+        )
+    except Exception as e:
+        logger.error(f"Error while looking up processed copies of the uploaded files: {e}")
+        processed_sources = {}
+
+    for index, asset_record in zip(new_file_indexes, asset_records):
+        reused = None
+        source_asset = processed_sources.get(asset_record.asset_hash)
+        if source_asset is not None and source_asset.asset_id != asset_record.asset_id:
+            try:
+                reused = await reuse_processed_asset(app, project, asset_record)
+            except Exception as e:
+                logger.error(f"Error while reusing the chunks of asset {asset_record.asset_name}: {e}")
+
+        files_results[index].update({
+            "signal": ResponseSignal.FILE_UPLOAD_SUCCESS.value,
+            "file_id": str(asset_record.asset_id),
+            "asset_name": asset_record.asset_name,
+            "reused": reused,
+        })
+
+    for index, first_index in batch_duplicates:
+        files_results[index].update({
+            "file_id": files_results[first_index]["file_id"],
+            "asset_name": files_results[first_index]["asset_name"],
+        })
+
+    return asset_records
+
 
+def get_upload_session(app, project_id: int, upload_id: str):
+    project_dir_path = ProjectController().get_project_path(project_id=project_id)
+    return app.upload_sessions.get(project_dir_path, project_id, upload_id)
+
+
+def upload_headers(upload_session):
+    return {
+        "Upload-Offset": str(upload_session.offset),
+        "Upload-Length": str(upload_session.upload_length),
+        "Cache-Control": "no-store",
+    }
+
+
+def upload_not_found_response():
     return JSONResponse(
+        status_code=status.HTTP_404_NOT_FOUND,
+        content={
+            "signal": ResponseSignal.UPLOAD_NOT_FOUND.value
+        }
+    )
+
+
+@data_router.post("/uploads/{project_id}")
+async def create_upload_endpoint(request: Request, project_id: int, upload_request: UploadCreateRequest):
+    """
+    Starts a resumable upload: the file is then sent in ranges with
+    PATCH /uploads/{project_id}/{upload_id} and turned into an asset by
+    POST /uploads/{project_id}/{upload_id}/finalize.
+    """
+    is_valid, result_signal = DataController().validate_file_properties(
+        content_type=upload_request.content_type, file_size=upload_request.file_size
+    )
+
+    if not is_valid or upload_request.file_size <= 0:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
             content={
-                "signal": ResponseSignal.FILE_UPLOAD_SUCCESS.value,
-                "file_id": str(asset_record.asset_id),
-                "asset_name": asset_record.asset_name,
+                "signal": result_signal if not is_valid else ResponseSignal.FILE_UPLOAD_FAILED.value
             }
         )
 
-@data_router.post("/process/{project_id}")
-async def process_endpoint(request: Request, project_id: int, process_request: ProcessRequest):
+    project_dir_path = ProjectController().get_project_path(project_id=project_id)
+    upload_session = request.app.upload_sessions.create(
+        project_dir=project_dir_path,
+        project_id=project_id,
+        file_name=upload_request.file_name,
+        content_type=upload_request.content_type,
+        upload_length=upload_request.file_size,
+    )
 
-    chunk_size = process_request.chunk_size
-    overlap_size = process_request.overlap_size
-    do_reset = process_request.do_reset
+    return JSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        headers={
+            **upload_headers(upload_session),
+            "Location": str(request.url_for(
+                "upload_status_endpoint", project_id=project_id, upload_id=upload_session.upload_id
+            )),
+        },
+        content={
+            "signal": ResponseSignal.UPLOAD_SESSION_CREATED.value,
+            "upload_id": upload_session.upload_id,
+            "upload_offset": upload_session.offset,
+            "upload_length": upload_session.upload_length,
+        }
+    )
+
+
+@data_router.head("/uploads/{project_id}/{upload_id}")
+async def upload_offset_endpoint(request: Request, project_id: int, upload_id: str):
+
+    upload_session = get_upload_session(request.app, project_id, upload_id)
+    if upload_session is None:
+        return Response(status_code=status.HTTP_404_NOT_FOUND)
+
+    return Response(headers=upload_headers(upload_session))
+
+
+@data_router.get("/uploads/{project_id}/{upload_id}")
+async def upload_status_endpoint(request: Request, project_id: int, upload_id: str):
+
+    upload_session = get_upload_session(request.app, project_id, upload_id)
+    if upload_session is None:
+        return upload_not_found_response()
+
+    return JSONResponse(
+        headers=upload_headers(upload_session),
+        content={
+            "signal": ResponseSignal.UPLOAD_STATUS.value,
+            "upload_id": upload_session.upload_id,
+            "file_name": upload_session.file_name,
+            "upload_offset": upload_session.offset,
+            "upload_length": upload_session.upload_length,
+        }
+    )
+
+
+@data_router.patch("/uploads/{project_id}/{upload_id}")
+async def upload_chunk_endpoint(request: Request, project_id: int, upload_id: str,
+                                upload_offset: int = Header(..., alias="Upload-Offset")):
+    """
+    Appends the request body at `Upload-Offset`. The body is streamed to
+    the part file and hashed on the way, nothing is spooled. After a
+    dropped connection, the client asks the offset with HEAD and resumes.
+    """
+    upload_session = get_upload_session(request.app, project_id, upload_id)
+    if upload_session is None:
+        return upload_not_found_response()
+
+    # rejected before reading the body when the client announces too much
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and upload_offset + int(content_length) > upload_session.upload_length:
+        return JSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            headers=upload_headers(upload_session),
+            content={
+                "signal": ResponseSignal.FILE_SIZE_EXCEEDED.value
+            }
+        )
+
+    async with upload_session.lock:
+        try:
+            await upload_session.append(request.stream(), offset=upload_offset)
+        except UploadOffsetMismatchError:
+            return JSONResponse(
+                status_code=status.HTTP_409_CONFLICT,
+                headers=upload_headers(upload_session),
+                content={
+                    "signal": ResponseSignal.UPLOAD_OFFSET_MISMATCH.value,
+                    "upload_offset": upload_session.offset,
+                }
+            )
+        except UploadSizeExceededError:
+            return JSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                headers=upload_headers(upload_session),
+                content={
+                    "signal": ResponseSignal.FILE_SIZE_EXCEEDED.value,
+                    "upload_offset": upload_session.offset,
+                }
+            )
+        except ClientDisconnect:
+            logger.info(f"Upload {upload_id} interrupted at offset {upload_session.offset}")
+            return Response(status_code=status.HTTP_400_BAD_REQUEST, headers=upload_headers(upload_session))
+
+    return JSONResponse(
+        headers=upload_headers(upload_session),
+        content={
+            "signal": ResponseSignal.UPLOAD_CHUNK_SUCCESS.value,
+            "upload_offset": upload_session.offset,
+            "upload_length": upload_session.upload_length,
+        }
+    )
+
+
+@data_router.delete("/uploads/{project_id}/{upload_id}")
+async def cancel_upload_endpoint(request: Request, project_id: int, upload_id: str):
+
+    upload_session = get_upload_session(request.app, project_id, upload_id)
+    if upload_session is None:
+        return upload_not_found_response()
+
+    async with upload_session.lock:
+        request.app.upload_sessions.discard(upload_session)
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@data_router.post("/uploads/{project_id}/{upload_id}/finalize")
+async def finalize_upload_endpoint(request: Request, project_id: int, upload_id: str):
+    """
+    Moves a complete upload into the project files (a rename, the bytes
+    are not copied) and creates its asset like /upload does.
+    """
+    upload_session = get_upload_session(request.app, project_id, upload_id)
+    if upload_session is None:
+        return upload_not_found_response()
 
     project_model = await ProjectModel.create_instance(
         db_client=request.app.db_client
@@ -146,121 +644,596 @@ async def process_endpoint(request: Request, project_id: int, process_request: P
         project_id=project_id
     )
 
+    async with upload_session.lock:
+        if not upload_session.is_complete:
+            return JSONResponse(
+                status_code=status.HTTP_409_CONFLICT,
+                headers=upload_headers(upload_session),
+                content={
+                    "signal": ResponseSignal.UPLOAD_INCOMPLETE.value,
+                    "upload_offset": upload_session.offset,
+                    "upload_length": upload_session.upload_length,
+                }
+            )
+
+        asset_hash = await upload_session.hexdigest()
+        file_path, file_id = DataController().generate_unique_filepath(
+            orig_file_name=upload_session.file_name,
+            project_id=project_id
+        )
+        request.app.upload_sessions.complete(upload_session, file_path)
+
+    content = await register_uploaded_file(
+        request.app, project, file_path, file_id,
+        asset_hash=asset_hash, asset_size=upload_session.upload_length,
+    )
+
+    return JSONResponse(content=content)
+
+
+async def reuse_processed_asset(app, project, asset_record):
+    """
+    Links a new asset to the chunks and vectors of an already processed
+    (CHUNKED or INDEXED) asset with the same content hash, in any project.
+    Returns what was reused, or None when no processed copy exists.
+    """
+    asset_model = await AssetModel.create_instance(db_client=app.db_client)
+    source_asset = await asset_model.get_asset_by_hash(
+        asset_hash=asset_record.asset_hash,
+        exclude_asset_id=asset_record.asset_id,
+        with_chunks=True,
+    )
+    if source_asset is None:
+        return None
+
+    chunk_model = await ChunkModel.create_instance(db_client=app.db_client)
     nlp_controller = NLPController(
-        vectordb_client=request.app.vectordb_client,
-        generation_client=request.app.generation_client,
-        embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser,
+        vectordb_client=app.vectordb_client,
+        generation_client=app.generation_client,
+        embedding_client=app.embedding_client,
+        template_parser=app.template_parser,
+    )
+
+    async with contextlib.AsyncExitStack() as project_locks:
+        # the source project must not be compacted or migrated while we read it
+        await project_locks.enter_async_context(app.project_activity.ingestion(source_asset.asset_project_id))
+        if source_asset.asset_project_id != project.project_id:
+            await project_locks.enter_async_context(app.project_activity.ingestion(project.project_id))
+
+        chunk_id_pairs = await chunk_model.clone_asset_chunks(
+            source_asset_id=source_asset.asset_id,
+            project_id=project.project_id,
+            asset_id=asset_record.asset_id,
+        )
+
+        # a reprocessing of the source that started meanwhile bumps its version,
+        # the copy may then mix old and new chunks: drop it
+        current_source = await asset_model.get_asset_by_hash(
+            asset_hash=asset_record.asset_hash,
+            exclude_asset_id=asset_record.asset_id,
+            with_chunks=True,
+        )
+        if current_source is None or current_source.asset_id != source_asset.asset_id or \
+                get_asset_version(current_source) != get_asset_version(source_asset):
+            _ = await chunk_model.delete_chunks_by_asset_id(asset_id=asset_record.asset_id)
+            return None
+
+        reused_vectors = 0
+        try:
+            reused_vectors = await nlp_controller.copy_chunk_vectors(
+                source_project_id=source_asset.asset_project_id,
+                project=project,
+                asset_id=asset_record.asset_id,
+                chunk_id_pairs=chunk_id_pairs,
+            )
+        except Exception as e:
+            # the chunks are there, /nlp/index/push embeds them if needed
+            logger.error(f"Error while copying vectors of asset {source_asset.asset_id}: {e}")
+
+    _ = await asset_model.update_asset_config(
+        asset_id=asset_record.asset_id,
+        asset_config={"source_asset_id": source_asset.asset_id},
+    )
+
+    # same bytes and chunker config as the source, so the asset is up to date
+    asset_status = AssetStatusEnum.CHUNKED.value
+    if chunk_id_pairs and reused_vectors == len(chunk_id_pairs):
+        asset_status = AssetStatusEnum.INDEXED.value
+    _ = await asset_model.update_assets_status(
+        asset_status=asset_status,
+        asset_ids=[ asset_record.asset_id ],
+        chunker_fingerprint=source_asset.asset_chunker_fingerprint,
+    )
+
+    return {
+        "source_asset_id": source_asset.asset_id,
+        "reused_chunks": len(chunk_id_pairs),
+        "reused_vectors": reused_vectors,
+    }
+
+
+def get_asset_version(asset_record):
+    # same value as AssetModel.asset_version(), read from a loaded row
+    return asset_record.updated_at or asset_record.created_at
+
+def get_process_task_args(project, project_files_ids: dict, process_request: ProcessRequest) -> dict:
+    """
+    Arguments of a queued processing task. The target assets are part of
+    them, so the task of new files is never taken for a duplicate of an
+    earlier one, and the worker processes these assets only.
+    """
+    return {
+        "project_id": project.project_id,
+        **process_request.model_dump(exclude={"run_async"}),
+        "asset_ids": sorted(project_files_ids),
+    }
+
+
+@data_router.post("/process/{project_id}")
+async def process_endpoint(request: Request, project_id: int, process_request: ProcessRequest):
+
+    project_model = await ProjectModel.create_instance(
+        db_client=request.app.db_client
+    )
+
+    project = await project_model.get_project_or_create_one(
+        project_id=project_id
+    )
+
+    project_files_ids, skipped_files, error_signal = await get_project_files_ids(
+        request.app, project, process_request
     )
 
+    if error_signal is not None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": error_signal,
+            }
+        )
+
+    if len(project_files_ids) == 0:
+        return JSONResponse(
+            content={
+                "signal": ResponseSignal.PROCESSING_SUCCESS.value,
+                "inserted_chunks": 0,
+                "processed_files": 0,
+                "skipped_files": skipped_files,
+            }
+        )
+
+    if process_request.run_async:
+        return await enqueue_job(
+            request.app,
+            job_type="process",
+            task_name=TaskNameEnum.PROCESS_PROJECT.value,
+            task_args=get_process_task_args(project, project_files_ids, process_request),
+            work=lambda job: job_response(run_process_assets(
+                request.app, project, project_files_ids, process_request, job=job
+            )),
+        )
+
+    status_code, content = await run_process_assets(
+        request.app, project, project_files_ids, process_request
+    )
+    content["skipped_files"] = skipped_files
+
+    return JSONResponse(status_code=status_code, content=content)
+
+
+async def get_project_files_ids(app, project, process_request: ProcessRequest):
+    """
+    Returns ({asset_id: asset_name} of the assets to process, names of the
+    skipped assets, error signal or None). Unless the project is reset, only
+    stale assets are processed: never chunked, failed, or chunked with another
+    chunker config than the one of `process_request`.
+    """
+    file_id = process_request.file_id
+
     asset_model = await AssetModel.create_instance(
-            db_client=request.app.db_client
+            db_client=app.db_client
         )
 
-    project_files_ids = {}
-    if process_request.file_id:
+    if file_id:
         asset_record = await asset_model.get_asset_record(
             asset_project_id=project.project_id,
-            asset_name=process_request.file_id
+            asset_name=file_id
         )
 
         if asset_record is None:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={
-                    "signal": ResponseSignal.FILE_ID_ERROR.value,
-                }
-            )
+            return {}, [], ResponseSignal.FILE_ID_ERROR.value
+
+        project_files = [ asset_record ]
 
-        project_files_ids = {
-            asset_record.asset_id: asset_record.asset_name
-        }
-    
     else:
-        
+
         project_files = await asset_model.get_all_project_assets(
             asset_project_id=project.project_id,
             asset_type=AssetTypeEnum.FILE.value,
         )
 
-        project_files_ids = {
-            record.asset_id: record.asset_name
-            for record in project_files
-        }
-        print("project_files_id: ----------------------------L HNA")
-        print(project_files_ids)
+    if len(project_files) == 0:
+        return {}, [], ResponseSignal.NO_FILES_ERROR.value
 
-    if len(project_files_ids) == 0:
-        return JSONResponse(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            content={
-                "signal": ResponseSignal.NO_FILES_ERROR.value,
-            }
+    chunker_fingerprint = ProcessController(project_id=project.project_id).get_chunker_fingerprint(
+        chunk_size=process_request.chunk_size, overlap_size=process_request.overlap_size,
+        with_summaries=process_request.with_summaries,
+    )
+
+    project_files_ids = {}
+    skipped_files = []
+    for record in project_files:
+        is_fresh = (
+            record.asset_status in (AssetStatusEnum.CHUNKED.value, AssetStatusEnum.INDEXED.value)
+            and record.asset_chunker_fingerprint == chunker_fingerprint
         )
-    
-    process_controller = ProcessController(project_id=project_id)
+        if is_fresh and process_request.do_reset != 1:
+            skipped_files.append(record.asset_name)
+            continue
+        project_files_ids[record.asset_id] = record.asset_name
+
+    return project_files_ids, skipped_files, None
 
-    no_records = 0
-    no_files = 0
+
+def create_chunk_deduplicator(app_settings: Settings):
+    return ChunkDeduplicator(
+        threshold=app_settings.CHUNK_DEDUP_THRESHOLD,
+        num_perm=app_settings.CHUNK_DEDUP_NUM_PERM,
+    )
+
+
+def drop_duplicate_chunks(deduplicator: ChunkDeduplicator, file_chunks: list, asset_id: int):
+    """The chunks that are not duplicates, as (page_content, metadata, dedup_signature)."""
+    kept_chunks = []
+    for page_content, metadata in file_chunks:
+        fingerprint = deduplicator.fingerprint(page_content)
+        if deduplicator.check_and_add_fingerprint(fingerprint, owner=asset_id) is None:
+            kept_chunks.append((page_content, metadata, fingerprint))
+    return kept_chunks
+
+
+def seed_chunk_deduplicator(deduplicator: ChunkDeduplicator, signature_rows: list):
+    # stored signatures are used as is, chunks stored without one are hashed
+    deduplicator.seed_fingerprints(
+        [ signature if signature is not None else deduplicator.fingerprint(text) for _, signature, text in signature_rows ],
+        owners=[ asset_id for asset_id, _, _ in signature_rows ],
+    )
+
+
+async def run_process_assets(app, project, project_files_ids: dict, process_request: ProcessRequest, job=None):
+    """
+    Chunks the given assets ({asset_id: file_id}) of a project and stores the
+    chunks. Shared by the blocking endpoint and background jobs, returns the
+    (status_code, content) of the response.
+    """
+
+    chunk_size = process_request.chunk_size
+    overlap_size = process_request.overlap_size
+
+    nlp_controller = NLPController(
+        vectordb_client=app.vectordb_client,
+        generation_client=app.generation_client,
+        embedding_client=app.embedding_client,
+        template_parser=app.template_parser,
+    )
 
     chunk_model = await ChunkModel.create_instance(
-                        db_client=request.app.db_client
+                        db_client=app.db_client
                     )
 
-    if do_reset == 1:
-        # delete associated vectors collection
-        collection_name = nlp_controller.create_collection_name(project_id=project.project_id)
-        _ = await request.app.vectordb_client.delete_collection(collection_name=collection_name)
+    asset_model = await AssetModel.create_instance(
+        db_client=app.db_client
+    )
+
+    app_settings = get_settings()
+    process_controller = ProcessController(project_id=project.project_id)
+    chunker_fingerprint = process_controller.get_chunker_fingerprint(
+        chunk_size=chunk_size, overlap_size=overlap_size,
+        with_summaries=process_request.with_summaries,
+    )
+    # files whose summaries failed are marked as chunked without summaries,
+    # so the next processing with summaries picks them up again
+    no_summary_fingerprint = process_controller.get_chunker_fingerprint(
+        chunk_size=chunk_size, overlap_size=overlap_size, with_summaries=False,
+    )
 
-        # delete associated chunks
-        _ = await chunk_model.delete_chunks_by_project_id(
-            project_id=project.project_id
-        )
+    no_records = 0
+    no_files = 0
+    collapsed_chunks = 0
+    failed_files = []
+    unsummarized_files = []
 
-    for asset_id, file_id in project_files_ids.items():
+    if job is not None:
+        job.update(total_files=len(project_files_ids))
 
-        file_content = process_controller.get_file_content(file_id=file_id)
+    async with app.project_activity.ingestion(project.project_id):
 
-        if file_content is None:
-            logger.error(f"Error while processing file: {file_id}")
-            continue
+        if process_request.do_reset == 1:
+            # delete associated vectors collection
+            collection_name = nlp_controller.create_collection_name(project_id=project.project_id)
+            _ = await app.vectordb_client.delete_collection(collection_name=collection_name)
 
-        file_chunks = process_controller.process_file_content(
-            file_content=file_content,
-            file_id=file_id,
-            chunk_size=chunk_size,
-            overlap_size=overlap_size
-        )
+            # delete associated chunks
+            _ = await chunk_model.delete_chunks_by_project_id(
+                project_id=project.project_id
+            )
 
-        if file_chunks is None or len(file_chunks) == 0:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={
-                    "signal": ResponseSignal.PROCESSING_FAILED.value
-                }
+            _ = await asset_model.update_assets_status(
+                asset_status=AssetStatusEnum.UPLOADED.value,
+                asset_project_id=project.project_id,
             )
 
-        file_chunks_records = [
-            DataChunk(
-                chunk_text=chunk.page_content,
-                chunk_metadata=chunk.metadata,
-                chunk_order=i+1,
-                chunk_project_id=project.project_id,
-                chunk_asset_id=asset_id
+        project_deduplicator = None
+        if app_settings.CHUNK_DEDUP_SCOPE == "project":
+            project_deduplicator = create_chunk_deduplicator(app_settings)
+            if process_request.do_reset != 1:
+                # chunks already stored for the project are the reference copies
+                # except the outdated chunks of the assets about to be re-chunked
+                async for signature_rows in chunk_model.iter_project_dedup_signatures(
+                    project_id=project.project_id,
+                    signature_sizes=project_deduplicator.fingerprint_sizes(),
+                    page_size=app_settings.PROCESSING_CHUNK_PAGE_SIZE,
+                    exclude_asset_ids=list(project_files_ids),
+                ):
+                    await asyncio.to_thread(seed_chunk_deduplicator, project_deduplicator, signature_rows)
+
+        chunks_feed, indexing_task = None, None
+        indexing_batches = defaultdict(int)
+        fully_fed_asset_ids = []
+        indexed_chunks = 0
+
+        if process_request.with_indexing:
+            # fused mode: stored chunks are embedded and indexed while the next files are processed
+            collection_name = nlp_controller.create_collection_name(project_id=project.project_id)
+            _ = await app.vectordb_client.create_collection(
+                collection_name=collection_name,
+                embedding_size=app.embedding_client.embedding_size,
+                do_reset=False,
             )
-            for i, chunk in enumerate(file_chunks)
-        ]
 
-        no_records += await chunk_model.insert_many_chunks(chunks=file_chunks_records)
-        no_files += 1
+            def on_indexed_batch(batch):
+                nonlocal indexed_chunks
+                indexing_batches[batch[0].chunk_asset_id] -= 1
+                indexed_chunks += len(batch)
 
-    return JSONResponse(
-        content={
-            "signal": ResponseSignal.PROCESSING_SUCCESS.value,
-            "inserted_chunks": no_records,
-            "processed_files": no_files
+            chunks_feed = BatchFeed(max_batches=app_settings.INDEXING_QUEUE_SIZE)
+            indexing_task = asyncio.create_task(nlp_controller.index_project_chunks(
+                project=project, chunks_pages=chunks_feed, on_batch_done=on_indexed_batch,
+            ))
+
+        # pool calls of a job are dropped when the job is cancelled before they start
+        run_in_pool = job.run_in_pool if job is not None else asyncio.get_running_loop().run_in_executor
+
+        async def extract_asset(asset_id: int, file_id: str):
+            try:
+                spool_path, chunks_count, summary_error = await run_in_pool(
+                    app.process_pool, extract_file_chunks,
+                    project.project_id, file_id, chunk_size, overlap_size,
+                    process_request.with_summaries
+                )
+                return asset_id, file_id, spool_path, chunks_count, summary_error, None
+            except Exception as e:
+                return asset_id, file_id, None, 0, None, e
+
+        max_extractions = max(app_settings.PROCESSING_POOL_WORKERS, 1)
+
+        async def iter_extracted_assets():
+            # one extraction in flight per pool worker: the next file is only
+            # submitted once a result was taken, so extracted files do not pile
+            # up in memory while inserting or indexing is slower
+            pending_files = iter(project_files_ids.items())
+            in_flight = set()
+            try:
+                while True:
+                    for asset_id, file_id in itertools.islice(pending_files, max_extractions - len(in_flight)):
+                        in_flight.add(asyncio.ensure_future(extract_asset(asset_id, file_id)))
+                    if not in_flight:
+                        return
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for extracted in done:
+                        yield extracted.result()
+            finally:
+                for extraction in in_flight:
+                    extraction.cancel()
+
+        try:
+            # chunks are inserted as soon as a file is done
+            async with contextlib.aclosing(iter_extracted_assets()) as extracted_assets:
+                async for asset_id, file_id, spool_path, chunks_count, summary_error, error in extracted_assets:
+                    try:
+                        if error is not None or spool_path is None or chunks_count == 0:
+                            logger.error(f"Error while processing file: {file_id} {error or ''}")
+                            failed_files.append({
+                                "file_id": file_id,
+                                "error": str(error) if error is not None else ResponseSignal.PROCESSING_FAILED.value
+                            })
+                            _ = await asset_model.update_assets_status(
+                                asset_status=AssetStatusEnum.FAILED.value, asset_ids=[ asset_id ]
+                            )
+                            if job is not None:
+                                job.advance(files=1)
+                            continue
+
+                        # a stale asset: its previous chunks and vectors are replaced
+                        if process_request.do_reset != 1 and await chunk_model.get_asset_chunks_count(asset_id=asset_id):
+                            # vectors first, they reference the chunks
+                            try:
+                                _ = await nlp_controller.delete_asset_vectors(
+                                    project=project, asset_id=asset_id, chunk_model=chunk_model
+                                )
+                            except Exception as e:
+                                logger.error(f"Error deleting vectors for asset '{file_id}': {e}")
+                            _ = await chunk_model.delete_chunks_by_asset_id(asset_id=asset_id)
+
+                        _ = await asset_model.update_assets_status(
+                            asset_status=AssetStatusEnum.EXTRACTED.value, asset_ids=[ asset_id ]
+                        )
+
+                        deduplicator = project_deduplicator
+                        if app_settings.CHUNK_DEDUP_SCOPE == "asset":
+                            deduplicator = create_chunk_deduplicator(app_settings)
+                        elif deduplicator is not None:
+                            deduplicator.matched_owners = set()
+
+                        inserted = 0
+                        is_fed = chunks_feed is not None and not chunks_feed.is_stopped
+
+                        # the spooled chunks are stored one page at a time
+                        spooled_pages = iter_spooled_chunks(spool_path, page_size=app_settings.PROCESSING_CHUNK_PAGE_SIZE)
+                        while (file_chunks := await asyncio.to_thread(next, spooled_pages, None)) is not None:
+                            if deduplicator is not None:
+                                collapsed_before = deduplicator.collapsed
+                                file_chunks = await asyncio.to_thread(drop_duplicate_chunks, deduplicator, file_chunks, asset_id)
+                                collapsed_chunks += deduplicator.collapsed - collapsed_before
+                            else:
+                                file_chunks = [ (page_content, metadata, None) for page_content, metadata in file_chunks ]
+
+                            chunk_rows = [
+                                {
+                                    "chunk_text": page_content,
+                                    "chunk_metadata": metadata,
+                                    "chunk_order": inserted + i + 1,
+                                    "chunk_dedup_signature": dedup_signature,
+                                    "chunk_project_id": project.project_id,
+                                    "chunk_asset_id": asset_id,
+                                }
+                                for i, (page_content, metadata, dedup_signature) in enumerate(file_chunks)
+                            ]
+
+                            chunk_ids = await chunk_model.insert_chunk_rows(chunk_rows=chunk_rows)
+                            inserted += len(chunk_ids)
+
+                            if is_fed:
+                                # the chunks just stored are not read back from the database
+                                indexed_chunk_records = [
+                                    IndexedChunk(
+                                        chunk_id=chunk_id,
+                                        chunk_text=row["chunk_text"],
+                                        chunk_metadata=row["chunk_metadata"],
+                                        chunk_asset_id=asset_id,
+                                    )
+                                    for chunk_id, row in zip(chunk_ids, chunk_rows)
+                                ]
+                                try:
+                                    for i in range(0, len(indexed_chunk_records), app_settings.INDEXING_BATCH_SIZE):
+                                        indexing_batches[asset_id] += 1
+                                        await chunks_feed.put(indexed_chunk_records[i:i + app_settings.INDEXING_BATCH_SIZE])
+                                except RuntimeError:
+                                    # indexing stopped, the next assets stay chunked for /nlp/index/push
+                                    is_fed = False
+
+                        no_records += inserted
+
+                        if project_deduplicator is not None:
+                            # the assets holding the kept copies, re-checked when one of them is deleted
+                            _ = await asset_model.update_asset_config(
+                                asset_id=asset_id,
+                                asset_config={
+                                    "dedup_reference_asset_ids": sorted(project_deduplicator.matched_owners - {asset_id})
+                                },
+                            )
+
+                        asset_fingerprint = chunker_fingerprint
+                        if summary_error is not None:
+                            # already logged as a warning by extract_file_chunks
+                            unsummarized_files.append({"file_id": file_id, "error": summary_error})
+                            asset_fingerprint = no_summary_fingerprint
+
+                        _ = await asset_model.update_assets_status(
+                            asset_status=AssetStatusEnum.CHUNKED.value,
+                            asset_ids=[ asset_id ],
+                            chunker_fingerprint=asset_fingerprint,
+                        )
+                        no_files += 1
+
+                        if is_fed:
+                            fully_fed_asset_ids.append(asset_id)
+
+                        if job is not None:
+                            job.advance(files=1, chunks=inserted)
+                    finally:
+                        if spool_path is not None and os.path.exists(spool_path):
+                            os.remove(spool_path)
+        except BaseException:
+            if indexing_task is not None:
+                indexing_task.cancel()
+                await asyncio.gather(indexing_task, return_exceptions=True)
+            raise
+
+        indexing_content = None
+        if indexing_task is not None:
+            indexing_content = await finish_fused_indexing(
+                project, nlp_controller, asset_model, chunks_feed, indexing_task,
+                indexing_batches, fully_fed_asset_ids,
+            )
+            indexing_content["inserted_items_count"] = indexed_chunks
+
+    if no_files == 0:
+        return status.HTTP_400_BAD_REQUEST, {
+            "signal": ResponseSignal.PROCESSING_FAILED.value,
+            "failed_files": failed_files
         }
-    )
+
+    content = {
+        "signal": ResponseSignal.PROCESSING_SUCCESS.value,
+        "inserted_chunks": no_records,
+        "collapsed_chunks": collapsed_chunks,
+        "processed_files": no_files,
+        "failed_files": failed_files
+    }
+    if process_request.with_summaries:
+        content["unsummarized_files"] = unsummarized_files
+    if indexing_content is not None:
+        content["indexing"] = indexing_content
+
+    return status.HTTP_200_OK, content
+
+
+async def finish_fused_indexing(project, nlp_controller, asset_model, chunks_feed, indexing_task,
+                                indexing_batches: dict, fully_fed_asset_ids: list):
+    """
+    Waits for the indexing fed by run_process_assets and marks the assets
+    whose chunks were all indexed. The vectors of partly indexed assets are
+    dropped, those assets stay chunked and /nlp/index/push indexes them.
+    """
+    await chunks_feed.close()
+
+    pipeline_stats = None
+    try:
+        pipeline_stats = await indexing_task
+    except Exception as e:
+        logger.error(f"Error while indexing the chunks of project {project.project_id}: {e}")
+
+    indexed_asset_ids = [
+        asset_id for asset_id in fully_fed_asset_ids
+        if indexing_batches[asset_id] == 0
+    ]
+    partly_indexed_asset_ids = [
+        asset_id for asset_id in indexing_batches
+        if asset_id not in indexed_asset_ids
+    ]
+
+    for asset_id in partly_indexed_asset_ids:
+        try:
+            _ = await nlp_controller.delete_asset_vectors(project=project, asset_id=asset_id)
+        except Exception as e:
+            logger.error(f"Error deleting vectors for asset {asset_id}: {e}")
+
+    if indexed_asset_ids:
+        _ = await asset_model.update_assets_status(
+            asset_status=AssetStatusEnum.INDEXED.value, asset_ids=indexed_asset_ids
+        )
+
+    content = {
+        "signal": ResponseSignal.INSERT_INTO_VECTORDB_SUCCESS.value,
+        "indexed_assets": len(indexed_asset_ids),
+    }
+    if pipeline_stats is None or partly_indexed_asset_ids:
+        content["signal"] = ResponseSignal.INSERT_INTO_VECTORDB_ERROR.value
+    if pipeline_stats is not None:
+        content["pipeline_stats"] = pipeline_stats.to_dict()
+
+    return content
 
 @data_router.delete("/asset/{project_id}/{asset_name}")
 async def delete_asset_endpoint(request: Request, project_id: int, asset_name: str):
@@ -307,19 +1280,12 @@ async def delete_asset_endpoint(request: Request, project_id: int, asset_name: s
             embedding_client=request.app.embedding_client,
             template_parser=request.app.template_parser,
         )
-        collection_name = nlp_controller.create_collection_name(project_id=project.project_id)
-
-        # collect chunk ids for this asset
-        async with request.app.db_client() as session:
-            chunk_ids_sql = sql_text('SELECT chunk_id FROM chunks WHERE chunk_asset_id = :asset_id')
-            result = await session.execute(chunk_ids_sql, {"asset_id": asset_record.asset_id})
-            chunk_ids = [row[0] for row in result.fetchall()]
-
-        if len(chunk_ids):
-            async with request.app.db_client() as session:
-                delete_vectors_sql = sql_text(f'DELETE FROM {collection_name} WHERE chunk_id = ANY(:chunk_ids)')
-                await session.execute(delete_vectors_sql, {"chunk_ids": chunk_ids})
-                await session.commit()
+        chunk_model = await ChunkModel.create_instance(
+            db_client=request.app.db_client
+        )
+        _ = await nlp_controller.delete_asset_vectors(
+            project=project, asset_id=asset_record.asset_id, chunk_model=chunk_model
+        )
     except Exception as e:
         logger.error(f"Error deleting vectors for asset '{asset_name}': {e}")
 
@@ -334,9 +1300,20 @@ async def delete_asset_endpoint(request: Request, project_id: int, asset_name: s
             )
         await session.commit()
 
+    # chunks collapsed against the deleted chunks are gone with them:
+    # the next /process re-chunks the assets that held them
+    dependent_asset_ids = await asset_model.get_dedup_dependent_asset_ids(
+        asset_project_id=project.project_id, asset_id=asset_record.asset_id
+    )
+    if dependent_asset_ids:
+        _ = await asset_model.update_assets_status(
+            asset_status=AssetStatusEnum.UPLOADED.value, asset_ids=dependent_asset_ids
+        )
+
     return JSONResponse(
         content={
             "signal": "asset_delete_success",
-            "asset_name": asset_name
+            "asset_name": asset_name,
+            "reprocess_asset_ids": dependent_asset_ids,
         }
     )
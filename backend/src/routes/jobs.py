@@ -0,0 +1,273 @@
+from fastapi import APIRouter, status, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from models import ResponseSignal
+from helpers.sse import format_sse, sse_comment
+from helpers.config import get_settings
+from helpers.idempotency_manager import FINISHED_TASK_STATUSES
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger('uvicorn.error')
+
+jobs_router = APIRouter(
+    prefix="/api/v1/jobs",
+    tags=["api_v1", "jobs"],
+)
+
+SSE_KEEP_ALIVE_SECONDS = 15
+
+
+async def enqueue_job(app, job_type: str, task_name: str, task_args: dict, work):
+    """
+    Run `work(job)` as an in-memory job, or hand `task_args` to the durable
+    Postgres queue when JOBS_BACKEND is "postgres" so any worker can pick it up.
+    """
+    app_settings = get_settings()
+
+    if app_settings.JOBS_BACKEND == "postgres":
+        is_claimed, task_record = await app.idempotency_manager.claim_task(
+            task_name=task_name,
+            task_args=task_args,
+            dedupe_seconds=app_settings.TASK_DEDUPE_SECONDS,
+        )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "signal": ResponseSignal.JOB_ENQUEUED.value,
+                "task_id": task_record.execution_id,
+                "task_status": task_record.status,
+                "is_duplicate": not is_claimed,
+            }
+        )
+
+    job = app.job_manager.submit(
+        job_type=job_type,
+        project_id=task_args.get("project_id"),
+        work=work,
+    )
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "signal": ResponseSignal.JOB_ENQUEUED.value,
+            "job_id": job.job_id,
+        }
+    )
+
+
+def job_not_found():
+    return JSONResponse(
+        status_code=status.HTTP_404_NOT_FOUND,
+        content={
+            "signal": ResponseSignal.JOB_NOT_FOUND.value
+        }
+    )
+
+
+def task_to_dict(task_record) -> dict:
+    """
+    State of a queued task, with the elapsed time, throughput and ETA of its
+    stored progress, as in Job.to_dict.
+    """
+    progress = task_record.progress or {}
+    is_finished = task_record.status in FINISHED_TASK_STATUSES
+
+    elapsed = None
+    throughput = None
+    eta_seconds = None
+
+    # the progress was stored with the last heartbeat
+    progress_at = task_record.completed_at if is_finished else task_record.heartbeat_at
+    if task_record.started_at is not None and progress_at is not None:
+        elapsed = (progress_at - task_record.started_at).total_seconds()
+
+    done, total = progress.get("processed_chunks", 0), progress.get("total_chunks", 0)
+    if not total:
+        done, total = progress.get("processed_files", 0), progress.get("total_files", 0)
+
+    if elapsed and done:
+        throughput = done / elapsed
+        if total and not is_finished:
+            eta_seconds = max(0.0, (total - done) / throughput)
+
+    return {
+        "task_id": task_record.execution_id,
+        "task_name": task_record.task_name,
+        "task_args": task_record.task_args,
+        "status": task_record.status,
+        "attempts": task_record.attempts,
+        "worker_id": task_record.worker_id,
+        "progress": task_record.progress,
+        "elapsed_seconds": round(elapsed, 3) if elapsed is not None else None,
+        "throughput_per_second": round(throughput, 3) if throughput is not None else None,
+        "eta_seconds": round(eta_seconds, 1) if eta_seconds is not None else None,
+        "result": task_record.result,
+        "error": task_record.error,
+        "cancel_requested_at": str(task_record.cancel_requested_at) if task_record.cancel_requested_at else None,
+        "heartbeat_at": str(task_record.heartbeat_at) if task_record.heartbeat_at else None,
+        "started_at": str(task_record.started_at) if task_record.started_at else None,
+        "completed_at": str(task_record.completed_at) if task_record.completed_at else None,
+        "created_at": str(task_record.created_at) if task_record.created_at else None,
+    }
+
+
+@jobs_router.get("/tasks/{task_id}")
+async def get_task(request: Request, task_id: int):
+
+    task_record = await request.app.idempotency_manager.get_task(task_id)
+    if task_record is None:
+        return job_not_found()
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.JOB_STATUS.value,
+            "task": task_to_dict(task_record),
+        }
+    )
+
+
+@jobs_router.get("/tasks/{task_id}/events")
+async def stream_task_events(request: Request, task_id: int):
+
+    task_record = await request.app.idempotency_manager.get_task(task_id)
+    if task_record is None:
+        return job_not_found()
+
+    poll_interval = get_settings().TASK_EVENTS_POLL_INTERVAL
+
+    async def event_stream():
+        # the task runs in another process: its stored state is polled and
+        # an event is sent whenever the status or the progress changed
+        current_record = task_record
+        yield format_sse(task_to_dict(current_record), event="progress")
+        last_change = (current_record.status, current_record.progress)
+        last_sent = time.monotonic()
+
+        while current_record.status not in FINISHED_TASK_STATUSES:
+            await asyncio.sleep(poll_interval)
+            if await request.is_disconnected():
+                return
+
+            current_record = await request.app.idempotency_manager.get_task(task_id)
+            if current_record is None:
+                # pruned by the housekeeping of the workers
+                return
+
+            change = (current_record.status, current_record.progress)
+            if change != last_change and current_record.status not in FINISHED_TASK_STATUSES:
+                yield format_sse(task_to_dict(current_record), event="progress")
+                last_change, last_sent = change, time.monotonic()
+            elif time.monotonic() - last_sent >= SSE_KEEP_ALIVE_SECONDS:
+                yield sse_comment()
+                last_sent = time.monotonic()
+
+        yield format_sse(task_to_dict(current_record), event=current_record.status)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@jobs_router.post("/tasks/{task_id}/cancel")
+async def cancel_task(request: Request, task_id: int):
+
+    task_record = await request.app.idempotency_manager.request_cancel(task_id)
+    if task_record is None:
+        task_record = await request.app.idempotency_manager.get_task(task_id)
+        if task_record is None:
+            return job_not_found()
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "signal": ResponseSignal.JOB_NOT_CANCELLABLE.value,
+                "task": task_to_dict(task_record),
+            }
+        )
+
+    # a started task stops at the next heartbeat of its worker
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "signal": ResponseSignal.JOB_CANCELLED.value,
+            "task_id": task_id,
+            "task_status": task_record.status,
+        }
+    )
+
+
+@jobs_router.get("/{job_id}")
+async def get_job(request: Request, job_id: str):
+
+    job = request.app.job_manager.get(job_id)
+    if job is None:
+        return job_not_found()
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.JOB_STATUS.value,
+            "job": job.to_dict(),
+        }
+    )
+
+
+@jobs_router.get("/{job_id}/events")
+async def stream_job_events(request: Request, job_id: str):
+
+    job = request.app.job_manager.get(job_id)
+    if job is None:
+        return job_not_found()
+
+    async def event_stream():
+        # current state first, then one event per progress update
+        yield format_sse(job.to_dict(), event="progress")
+
+        while not job.is_finished:
+            is_changed = await job.wait_for_change(timeout=SSE_KEEP_ALIVE_SECONDS)
+            if await request.is_disconnected():
+                return
+            if not is_changed:
+                yield sse_comment()
+                continue
+            if not job.is_finished:
+                yield format_sse(job.to_dict(), event="progress")
+
+        yield format_sse(job.to_dict(), event=job.status)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@jobs_router.post("/{job_id}/cancel")
+async def cancel_job(request: Request, job_id: str):
+
+    job = request.app.job_manager.get(job_id)
+    if job is None:
+        return job_not_found()
+
+    if not request.app.job_manager.cancel(job_id):
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "signal": ResponseSignal.JOB_NOT_CANCELLABLE.value,
+                "job": job.to_dict(),
+            }
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "signal": ResponseSignal.JOB_CANCELLED.value,
+            "job_id": job_id,
+        }
+    )
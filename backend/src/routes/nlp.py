@@ -1,12 +1,21 @@
-from fastapi import FastAPI, APIRouter, status, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, Depends, status, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from routes.schemes.nlp import PushRequest, SearchRequest
+from helpers.config import get_settings, Settings
 from models.ProjectModel import ProjectModel
 from models.ChunkModel import ChunkModel
+from models.AssetModel import AssetModel
+from models.enums.AssetStatusEnum import AssetStatusEnum
 from controllers import NLPController
 from models import ResponseSignal
+from helpers.job_manager import job_response
+from models.enums.TaskNameEnum import TaskNameEnum
+from .jobs import enqueue_job
+from helpers.sse import format_sse
+from helpers.stream_bridge import StreamCapacityError
 from tqdm.auto import tqdm
 
+import asyncio
 import logging
 
 logger = logging.getLogger('uvicorn.error')
@@ -17,16 +26,13 @@ nlp_router = APIRouter(
 )
 
 @nlp_router.post("/index/push/{project_id}")
-async def index_project(request: Request, project_id: int, push_request: PushRequest):
+async def index_project(request: Request, project_id: int, push_request: PushRequest,
+                        app_settings: Settings = Depends(get_settings)):
 
     project_model = await ProjectModel.create_instance(
         db_client=request.app.db_client
     )
 
-    chunk_model = await ChunkModel.create_instance(
-        db_client=request.app.db_client
-    )
-
     project = await project_model.get_project_or_create_one(
         project_id=project_id
     )
@@ -39,66 +45,135 @@ async def index_project(request: Request, project_id: int, push_request: PushReq
             }
         )
     
+    if push_request.run_async:
+        # the assets waiting for indexing tell a new task from a duplicate one
+        asset_versions = await get_index_asset_versions(request.app, project, push_request)
+        return await enqueue_job(
+            request.app,
+            job_type="index",
+            task_name=TaskNameEnum.INDEX_PROJECT.value,
+            task_args={
+                "project_id": project.project_id,
+                **push_request.model_dump(exclude={"run_async"}),
+                "asset_ids": sorted(asset_versions),
+            },
+            work=lambda job: job_response(run_index_project(
+                request.app, project, push_request, app_settings, job=job
+            )),
+        )
+
+    status_code, content = await run_index_project(
+        request.app, project, push_request, app_settings
+    )
+
+    return JSONResponse(status_code=status_code, content=content)
+
+
+def get_index_asset_statuses(push_request: PushRequest) -> list:
+    """Assets indexed by `push_request`: the chunked ones, and the indexed ones on reset."""
+    asset_statuses = [ AssetStatusEnum.CHUNKED.value ]
+    if push_request.do_reset == 1:
+        asset_statuses.append(AssetStatusEnum.INDEXED.value)
+    return asset_statuses
+
+
+async def get_index_asset_versions(app, project, push_request: PushRequest) -> dict:
+    asset_model = await AssetModel.create_instance(
+        db_client=app.db_client
+    )
+    return await asset_model.get_project_asset_versions(
+        asset_project_id=project.project_id, asset_statuses=get_index_asset_statuses(push_request)
+    )
+
+
+async def run_index_project(app, project, push_request: PushRequest, app_settings: Settings, job=None):
+    """
+    Embeds and indexes the chunks of the project assets that are chunked but
+    not indexed yet, or of every chunked asset when the collection is reset.
+    Shared by the blocking endpoint and background jobs, returns the
+    (status_code, content) of the response.
+    """
+
     nlp_controller = NLPController(
-        vectordb_client=request.app.vectordb_client,
-        generation_client=request.app.generation_client,
-        embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser,
+        vectordb_client=app.vectordb_client,
+        generation_client=app.generation_client,
+        embedding_client=app.embedding_client,
+        template_parser=app.template_parser,
+    )
+
+    chunk_model = await ChunkModel.create_instance(
+        db_client=app.db_client
+    )
+
+    asset_model = await AssetModel.create_instance(
+        db_client=app.db_client
     )
 
-    has_records = True
-    page_no = 1
     inserted_items_count = 0
-    idx = 0
-
-    # create collection if not exists
-    collection_name = nlp_controller.create_collection_name(project_id=project.project_id)
-
-    _ = await request.app.vectordb_client.create_collection(
-        collection_name=collection_name,
-        embedding_size=request.app.embedding_client.embedding_size,
-        do_reset=push_request.do_reset,
-    )
-
-    # setup batching
-    total_chunks_count = await chunk_model.get_total_chunks_count(project_id=project.project_id)
-    pbar = tqdm(total=total_chunks_count, desc="Vector Indexing", position=0)
-
-    while has_records:
-        page_chunks = await chunk_model.get_poject_chunks(project_id=project.project_id, page_no=page_no)
-        if len(page_chunks):
-            page_no += 1
-        
-        if not page_chunks or len(page_chunks) == 0:
-            has_records = False
-            break
-
-        chunks_ids =  [ c.chunk_id for c in page_chunks ]
-        idx += len(page_chunks)
-        
-        is_inserted = await nlp_controller.index_into_vector_db(
-            project=project,
-            chunks=page_chunks,
-            chunks_ids=chunks_ids
+
+    def on_batch_done(page_chunks):
+        nonlocal inserted_items_count
+        pbar.update(len(page_chunks))
+        inserted_items_count += len(page_chunks)
+        if job is not None:
+            job.advance(chunks=len(page_chunks))
+
+    async with app.project_activity.ingestion(project.project_id):
+
+        asset_versions = await get_index_asset_versions(app, project, push_request)
+        asset_ids = list(asset_versions)
+
+        # setup batching
+        total_chunks_count = await chunk_model.get_total_chunks_count(
+            project_id=project.project_id, asset_ids=asset_ids
         )
+        pbar = tqdm(total=total_chunks_count, desc="Vector Indexing", position=0)
 
-        if not is_inserted:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={
-                    "signal": ResponseSignal.INSERT_INTO_VECTORDB_ERROR.value
-                }
+        if job is not None:
+            job.update(total_chunks=total_chunks_count)
+
+        # create collection if not exists
+        collection_name = nlp_controller.create_collection_name(project_id=project.project_id)
+
+        _ = await app.vectordb_client.create_collection(
+            collection_name=collection_name,
+            embedding_size=app.embedding_client.embedding_size,
+            do_reset=push_request.do_reset,
+        )
+
+        try:
+            pipeline_stats = await nlp_controller.index_project_chunks(
+                project=project,
+                chunks_pages=chunk_model.iter_project_chunks(
+                    project_id=project.project_id,
+                    page_size=app_settings.INDEXING_BATCH_SIZE,
+                    asset_ids=asset_ids,
+                ),
+                on_batch_done=on_batch_done,
             )
+        except Exception as e:
+            logger.error(f"Error while indexing project {project.project_id}: {e}")
+            return status.HTTP_400_BAD_REQUEST, {
+                "signal": ResponseSignal.INSERT_INTO_VECTORDB_ERROR.value,
+                "inserted_items_count": inserted_items_count
+            }
+        finally:
+            pbar.close()
 
-        pbar.update(len(page_chunks))
-        inserted_items_count += len(page_chunks)
-        
-    return JSONResponse(
-        content={
-            "signal": ResponseSignal.INSERT_INTO_VECTORDB_SUCCESS.value,
-            "inserted_items_count": inserted_items_count
-        }
-    )
+        # an asset processed again while it was indexed keeps its status, its
+        # new chunks are indexed by the next push
+        indexed_assets = await asset_model.update_assets_status(
+            asset_status=AssetStatusEnum.INDEXED.value,
+            asset_versions=asset_versions,
+            from_statuses=get_index_asset_statuses(push_request),
+        )
+
+    return status.HTTP_200_OK, {
+        "signal": ResponseSignal.INSERT_INTO_VECTORDB_SUCCESS.value,
+        "inserted_items_count": inserted_items_count,
+        "indexed_assets": indexed_assets,
+        "pipeline_stats": pipeline_stats.to_dict()
+    }
 
 @nlp_router.get("/index/info/{project_id}")
 async def get_project_index_info(request: Request, project_id: int):
@@ -204,3 +279,96 @@ async def answer_rag(request: Request, project_id: int, search_request: SearchRe
             "chat_history": chat_history
         }
     )
+
+@nlp_router.post("/index/answer/stream/{project_id}")
+async def answer_rag_stream(request: Request, project_id: int, search_request: SearchRequest):
+    """
+    Streaming variant of /index/answer, as Server-Sent Events: a
+    `citations` event with the retrieved documents, then one `token`
+    event per generated piece of text, then `done` with the full answer
+    (or `error`). When the client disconnects, the generation is aborted.
+    Answers 503 while GENERATION_STREAM_WORKERS streams are already open.
+    """
+    if request.app.stream_executor.is_saturated:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={
+                "signal": ResponseSignal.RAG_STREAM_BUSY.value
+            }
+        )
+
+    project_model = await ProjectModel.create_instance(
+        db_client=request.app.db_client
+    )
+
+    project = await project_model.get_project_or_create_one(
+        project_id=project_id
+    )
+
+    nlp_controller = NLPController(
+        vectordb_client=request.app.vectordb_client,
+        generation_client=request.app.generation_client,
+        embedding_client=request.app.embedding_client,
+        template_parser=request.app.template_parser,
+    )
+
+    retrieved_documents, full_prompt, chat_history = await nlp_controller.build_rag_prompt(
+        project=project,
+        query=search_request.text,
+        limit=search_request.limit,
+    )
+
+    if not retrieved_documents:
+        return JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={
+                    "signal": ResponseSignal.RAG_ANSWER_ERROR.value
+                }
+        )
+
+    async def event_stream():
+        # the citations are known before the first token, the client shows them right away
+        yield format_sse({
+            "citations": [
+                { "doc_num": idx + 1, **doc.dict() }
+                for idx, doc in enumerate(retrieved_documents)
+            ]
+        }, event="citations")
+
+        answer_parts = []
+        try:
+            async for text in nlp_controller.stream_rag_answer(full_prompt, chat_history,
+                                                               request.app.stream_executor):
+                answer_parts.append(text)
+                yield format_sse({"text": text}, event="token")
+        except StreamCapacityError:
+            # the streams opened since the check above took the last threads
+            yield format_sse({"signal": ResponseSignal.RAG_STREAM_BUSY.value}, event="error")
+            return
+        except asyncio.CancelledError:
+            # the client went away, leaving the loop closed the provider stream
+            logger.info(f"RAG answer stream of project {project.project_id} closed by the client "
+                        f"after {len(answer_parts)} tokens")
+            raise
+        except Exception as e:
+            logger.error(f"Error while streaming the RAG answer of project {project.project_id}: {e}")
+            yield format_sse({"signal": ResponseSignal.RAG_ANSWER_ERROR.value}, event="error")
+            return
+
+        if not answer_parts:
+            yield format_sse({"signal": ResponseSignal.RAG_ANSWER_ERROR.value}, event="error")
+            return
+
+        yield format_sse({
+            "signal": ResponseSignal.RAG_ANSWER_SUCCESS.value,
+            "answer": "".join(answer_parts),
+        }, event="done")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
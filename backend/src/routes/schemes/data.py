@@ -6,3 +6,11 @@ class ProcessRequest(BaseModel):
     chunk_size: Optional[int] = 100
     overlap_size: Optional[int] = 20
     do_reset: Optional[int] = 0
+    run_async: Optional[bool] = False
+    with_summaries: Optional[bool] = False
+    with_indexing: Optional[bool] = False
+
+class UploadCreateRequest(BaseModel):
+    file_name: str
+    file_size: int
+    content_type: str
@@ -3,6 +3,7 @@ from typing import Optional
 
 class PushRequest(BaseModel):
     do_reset: Optional[int] = 0
+    run_async: Optional[bool] = False
 
 class SearchRequest(BaseModel):
     text: str
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class MigrationRequest(BaseModel):
+    source_backend: str
+    destination_backend: str
+    project_id: Optional[int] = None
+    source_collection: Optional[str] = None
+    destination_collection: Optional[str] = None
+    batch_size: Optional[int] = 500
+    resume: Optional[bool] = True
@@ -0,0 +1,179 @@
+from fastapi import APIRouter, Depends, Request, status, Header
+from fastapi.responses import JSONResponse
+from typing import Optional
+import asyncio
+import logging
+import uuid
+
+from helpers.admin_auth import require_admin
+from helpers.config import get_settings, Settings
+from controllers import VectorMigrationController
+from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
+from .schemes.vectordb import MigrationRequest
+
+logger = logging.getLogger('uvicorn.error')
+
+
+vectordb_admin_router = APIRouter(
+    prefix="/api/v1/admin/vectordb",
+    tags=["api_v1", "admin", "vectordb"],
+)
+
+
+@vectordb_admin_router.get("/maintenance")
+async def get_maintenance_status(request: Request, authorization: str | None = Header(default=None)):
+    token_data, error = require_admin(authorization)
+    if error is not None:
+        return error
+
+    return JSONResponse(
+        content={
+            "signal": "vectordb_maintenance_status",
+            "maintenance": request.app.vector_maintenance.get_status(),
+        }
+    )
+
+
+@vectordb_admin_router.post("/maintenance/run")
+async def run_maintenance(request: Request, project_id: Optional[int] = None, force: bool = False,
+                          authorization: str | None = Header(default=None)):
+    token_data, error = require_admin(authorization)
+    if error is not None:
+        return error
+
+    try:
+        maintenance_status = await request.app.vector_maintenance.run_once(project_id=project_id, force=force)
+    except Exception as e:
+        return JSONResponse(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            content={"signal": "vectordb_maintenance_error", "error": str(e)}
+        )
+
+    return JSONResponse(
+        content={
+            "signal": "vectordb_maintenance_success",
+            "maintenance": maintenance_status,
+        }
+    )
+
+
+async def run_vector_migration(app, migration: dict, migration_request: MigrationRequest, app_settings: Settings):
+
+    factory = VectorDBProviderFactory(config=app_settings, db_client=app.db_client, db_engine=app.db_engine)
+    created_clients = {}
+
+    def get_client(backend: str):
+        # the running app client is reused, a local Qdrant path can only be opened once
+        if backend == app_settings.VECTOR_DB_BACKEND:
+            return app.vectordb_client
+        # one client per backend, source and destination of the same backend share it
+        if backend not in created_clients:
+            created_clients[backend] = factory.create(provider=backend)
+        return created_clients[backend]
+
+    try:
+        source_client = get_client(migration_request.source_backend)
+        destination_client = get_client(migration_request.destination_backend)
+        if source_client is None or destination_client is None:
+            raise ValueError("Unknown vector db backend")
+
+        for client in created_clients.values():
+            await client.connect()
+
+        migration_controller = VectorMigrationController(
+            source_client=source_client,
+            destination_client=destination_client,
+        )
+
+        source_collection = migration_request.source_collection or \
+            migration_controller.get_collection_name(source_client, migration_request.project_id)
+        destination_collection = migration_request.destination_collection or \
+            migration_controller.get_collection_name(destination_client, migration_request.project_id)
+
+        # the destination collection is reset first, it must never be the source one
+        is_same_backend = migration_request.source_backend == migration_request.destination_backend
+        if is_same_backend and source_collection == destination_collection:
+            raise ValueError("Source and destination collections are the same")
+
+        migration["source_collection"] = source_collection
+        migration["destination_collection"] = destination_collection
+
+        def on_progress(migrated: int):
+            migration["migrated"] = migrated
+
+        migration["report"] = await migration_controller.migrate(
+            source_collection=source_collection,
+            destination_collection=destination_collection,
+            batch_size=migration_request.batch_size,
+            resume=migration_request.resume,
+            on_progress=on_progress,
+        )
+        migration["status"] = "completed" if migration["report"]["verified"] else "verification_failed"
+    except Exception as e:
+        logger.error(f"Vector migration {migration['migration_id']} failed: {e}")
+        migration["status"] = "failed"
+        migration["error"] = str(e)
+    finally:
+        for client in created_clients.values():
+            if client is not None:
+                await client.disconnect()
+
+
+@vectordb_admin_router.post("/migrations")
+async def start_vector_migration(request: Request, migration_request: MigrationRequest,
+                                 app_settings: Settings = Depends(get_settings),
+                                 authorization: str | None = Header(default=None)):
+    token_data, error = require_admin(authorization)
+    if error is not None:
+        return error
+
+    if migration_request.project_id is None and not (
+        migration_request.source_collection and migration_request.destination_collection
+    ):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"signal": "vectordb_migration_invalid_request"}
+        )
+
+    migration_id = str(uuid.uuid4())
+    migration = {
+        "migration_id": migration_id,
+        "status": "running",
+        "migrated": 0,
+        "source_backend": migration_request.source_backend,
+        "destination_backend": migration_request.destination_backend,
+    }
+    request.app.vector_migrations[migration_id] = migration
+    migration["task"] = asyncio.create_task(
+        run_vector_migration(request.app, migration, migration_request, app_settings)
+    )
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "signal": "vectordb_migration_started",
+            "migration_id": migration_id,
+        }
+    )
+
+
+@vectordb_admin_router.get("/migrations/{migration_id}")
+async def get_vector_migration(request: Request, migration_id: str,
+                               authorization: str | None = Header(default=None)):
+    token_data, error = require_admin(authorization)
+    if error is not None:
+        return error
+
+    migration = request.app.vector_migrations.get(migration_id)
+    if migration is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"signal": "vectordb_migration_not_found"}
+        )
+
+    return JSONResponse(
+        content={
+            "signal": "vectordb_migration_status",
+            "migration": { k: v for k, v in migration.items() if k != "task" },
+        }
+    )
@@ -15,6 +15,12 @@ class LLMInterface(ABC):
                             temperature: float = None):
         pass
 
+    @abstractmethod
+    def generate_text_stream(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                                   temperature: float = None):
+        """Yields the generated text piece by piece; closing the generator aborts the generation."""
+        pass
+
     @abstractmethod
     def embed_text(self, text: str, document_type: str = None):
         pass
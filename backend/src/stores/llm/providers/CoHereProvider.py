@@ -3,7 +3,7 @@ from ..LLMEnums import CoHereEnums, DocumentTypeEnum
 import cohere
 import logging
 from typing import List, Union
-from sentence_transformers import SentenceTransformer
+from helpers.embedding_models import get_hugging_face_embedding_model
 
 class CoHereProvider(LLMInterface):
 
@@ -66,6 +66,36 @@ class CoHereProvider(LLMInterface):
             return None
         
         return response.text
+
+    def generate_text_stream(self, prompt: str, chat_history: list=[], max_output_tokens: int=None,
+                                   temperature: float = None):
+
+        if not self.client:
+            self.logger.error("CoHere client was not set")
+            return
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for CoHere was not set")
+            return
+
+        max_output_tokens = max_output_tokens if max_output_tokens else self.default_generation_max_output_tokens
+        temperature = temperature if temperature else self.default_generation_temperature
+
+        events = self.client.chat_stream(
+            model = self.generation_model_id,
+            chat_history = chat_history,
+            message = prompt,
+            temperature = temperature,
+            max_tokens = max_output_tokens
+        )
+
+        try:
+            for event in events:
+                if event.event_type == "text-generation" and event.text:
+                    yield event.text
+        finally:
+            # leaves the underlying http stream when the caller stops early
+            events.close()
     
     def embed_text(self, text: Union[str, List[str]], document_type: str = None):
         if not self.client:
@@ -84,7 +114,7 @@ class CoHereProvider(LLMInterface):
             input_type = CoHereEnums.QUERY
 
         if self.embedding_model_id == "hugging_face":
-            model = SentenceTransformer("sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+            model = get_hugging_face_embedding_model()
             # response = model.encode([ self.process_text(t) for t in text ])
             response = model.encode(text)
             return response.tolist()
@@ -43,10 +43,40 @@ class VectorDBInterface(ABC):
     @abstractmethod
     def insert_many(self, collection_name: str, texts: list, 
                           vectors: list, metadata: list = None, 
-                          record_ids: list = None, batch_size: int = 50):
+                          record_ids: list = None, batch_size: int = 50,
+                          asset_ids: list = None):
+        pass
+
+    @abstractmethod
+    def delete_by_chunk_ids(self, collection_name: str, chunk_ids: list) -> int:
+        pass
+
+    @abstractmethod
+    def delete_by_asset(self, collection_name: str, asset_id: int) -> int:
+        pass
+
+    @abstractmethod
+    def get_records_by_chunk_ids(self, collection_name: str, chunk_ids: list) -> List[dict]:
+        """Stored records of the given chunk ids, same dicts as `iter_records`."""
         pass
 
     @abstractmethod
     def search_by_vector(self, collection_name: str, vector: list, limit: int) -> List[RetrievedDocument]:
         pass
-    
\ No newline at end of file
+    
+    @abstractmethod
+    def get_maintenance_stats(self, collection_name: str) -> dict:
+        pass
+
+    @abstractmethod
+    def run_maintenance(self, collection_name: str, vacuum: bool = True, reindex: bool = False) -> dict:
+        pass
+
+    @abstractmethod
+    def iter_records(self, collection_name: str, batch_size: int = 500, offset=None):
+        """
+        Async generator over (records, next_offset) pages of a collection.
+        Each record is a dict with id, vector, text, metadata and asset_id.
+        Passing a previous next_offset back resumes the scan after that page.
+        """
+        pass
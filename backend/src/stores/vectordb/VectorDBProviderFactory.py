@@ -2,12 +2,14 @@ from .providers import QdrantDBProvider, PGVectorProvider
 from .VectorDBEnums import VectorDBEnums
 from controllers.BaseController import BaseController
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 class VectorDBProviderFactory:
-    def __init__(self, config, db_client: sessionmaker=None):
+    def __init__(self, config, db_client: sessionmaker=None, db_engine: AsyncEngine=None):
         self.config = config
         self.base_controller = BaseController()
         self.db_client = db_client
+        self.db_engine = db_engine
 
     def create(self, provider: str):
         if provider == VectorDBEnums.QDRANT.value:
@@ -23,6 +25,7 @@ class VectorDBProviderFactory:
         if provider == VectorDBEnums.PGVECTOR.value:
             return PGVectorProvider(
                 db_client=self.db_client,
+                db_engine=self.db_engine,
                 distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
                 default_vector_size=self.config.EMBEDDING_MODEL_SIZE,
                 index_threshold=self.config.VECTOR_DB_PGVEC_INDEX_THRESHOLD,
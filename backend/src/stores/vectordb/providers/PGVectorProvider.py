@@ -10,9 +10,11 @@ import json
 class PGVectorProvider(VectorDBInterface):
 
     def __init__(self, db_client, default_vector_size: int = 786,
-                       distance_method: str = None, index_threshold: int=100):
+                       distance_method: str = None, index_threshold: int=100, db_engine=None):
         
         self.db_client = db_client
+        # maintenance statements need a connection outside of any session
+        self.db_engine = db_engine
         self.default_vector_size = default_vector_size
         
         self.index_threshold = index_threshold
@@ -220,7 +222,9 @@ class PGVectorProvider(VectorDBInterface):
 
     async def insert_many(self, collection_name: str, texts: list,
                          vectors: list, metadata: list = None,
-                         record_ids: list = None, batch_size: int = 50):
+                         record_ids: list = None, batch_size: int = 50,
+                         asset_ids: list = None):
+        # asset_ids are not stored: the asset of a vector is resolved through chunks.chunk_id
         
         is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
         if not is_collection_existed:
@@ -267,6 +271,180 @@ class PGVectorProvider(VectorDBInterface):
 
         return True
     
+    async def delete_by_chunk_ids(self, collection_name: str, chunk_ids: list) -> int:
+
+        is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
+        if not is_collection_existed or not chunk_ids:
+            return 0
+
+        async with self.db_client() as session:
+            async with session.begin():
+                delete_sql = sql_text(f'DELETE FROM {collection_name} '
+                                      f'WHERE {PgVectorTableSchemeEnums.CHUNK_ID.value} = ANY(:chunk_ids)')
+                result = await session.execute(delete_sql, {"chunk_ids": list(chunk_ids)})
+
+        return result.rowcount
+
+    async def get_records_by_chunk_ids(self, collection_name: str, chunk_ids: list) -> List[dict]:
+
+        is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
+        if not is_collection_existed or not chunk_ids:
+            return []
+
+        async with self.db_client() as session:
+            async with session.begin():
+                select_sql = sql_text(f'SELECT v.{PgVectorTableSchemeEnums.CHUNK_ID.value} AS chunk_id, '
+                                      f'v.{PgVectorTableSchemeEnums.TEXT.value} AS text, '
+                                      f'v.{PgVectorTableSchemeEnums.VECTOR.value}::text AS vector, '
+                                      f'v.{PgVectorTableSchemeEnums.METADATA.value} AS metadata, '
+                                      'c.chunk_asset_id AS asset_id '
+                                      f'FROM {collection_name} AS v '
+                                      f'LEFT JOIN chunks AS c ON c.chunk_id = v.{PgVectorTableSchemeEnums.CHUNK_ID.value} '
+                                      f'WHERE v.{PgVectorTableSchemeEnums.CHUNK_ID.value} = ANY(:chunk_ids)')
+                result = await session.execute(select_sql, {"chunk_ids": list(chunk_ids)})
+                rows = result.fetchall()
+
+        return [
+            {
+                "id": row.chunk_id,
+                "vector": json.loads(row.vector),
+                "text": row.text,
+                "metadata": json.loads(row.metadata) if isinstance(row.metadata, str) else row.metadata,
+                "asset_id": row.asset_id,
+            }
+            for row in rows
+        ]
+
+    async def delete_by_asset(self, collection_name: str, asset_id: int) -> int:
+
+        is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
+        if not is_collection_existed:
+            return 0
+
+        # single set-based statement, the chunk ids never leave the database
+        async with self.db_client() as session:
+            async with session.begin():
+                delete_sql = sql_text(f'DELETE FROM {collection_name} AS v '
+                                      'USING chunks AS c '
+                                      f'WHERE v.{PgVectorTableSchemeEnums.CHUNK_ID.value} = c.chunk_id '
+                                      'AND c.chunk_asset_id = :asset_id')
+                result = await session.execute(delete_sql, {"asset_id": asset_id})
+
+        self.logger.info(f"Deleted {result.rowcount} vectors of asset {asset_id} from {collection_name}")
+        return result.rowcount
+
+    async def get_maintenance_stats(self, collection_name: str) -> dict:
+
+        is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
+        if not is_collection_existed:
+            return None
+
+        async with self.db_client() as session:
+            async with session.begin():
+                stats_sql = sql_text('''
+                    SELECT n_live_tup, n_dead_tup, last_vacuum, last_autovacuum, last_analyze,
+                           pg_table_size(relid) AS table_bytes,
+                           COALESCE(pg_relation_size(to_regclass(:index_name)), 0) AS index_bytes
+                    FROM pg_stat_user_tables
+                    WHERE relname = :collection_name
+                ''')
+                result = await session.execute(stats_sql, {
+                    "collection_name": collection_name,
+                    "index_name": self.default_index_name(collection_name),
+                })
+                record = result.fetchone()
+
+        if not record:
+            return None
+
+        live_rows, dead_rows = record.n_live_tup or 0, record.n_dead_tup or 0
+        total_rows = live_rows + dead_rows
+
+        return {
+            "live_rows": live_rows,
+            "dead_rows": dead_rows,
+            "dead_ratio": (dead_rows / total_rows) if total_rows else 0.0,
+            "table_bytes": record.table_bytes,
+            "index_bytes": record.index_bytes,
+            "index_bytes_per_row": (record.index_bytes / live_rows) if live_rows else None,
+            "last_vacuum": str(record.last_vacuum or record.last_autovacuum) if (record.last_vacuum or record.last_autovacuum) else None,
+            "last_analyze": str(record.last_analyze) if record.last_analyze else None,
+            "maintenance_supported": True,
+            "needs_optimization": False,
+        }
+
+    async def run_maintenance(self, collection_name: str, vacuum: bool = True, reindex: bool = False) -> dict:
+
+        actions = []
+        is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
+        if not is_collection_existed:
+            return {"actions": actions}
+
+        if self.db_engine is None:
+            raise ValueError("PGVectorProvider needs a db_engine to run maintenance")
+
+        # VACUUM and REINDEX CONCURRENTLY can not run inside a transaction block
+        async with self.db_engine.connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+
+            if vacuum:
+                self.logger.info(f"VACUUM (ANALYZE) collection: {collection_name}")
+                await connection.execute(sql_text(f'VACUUM (ANALYZE) {collection_name}'))
+                actions.append("vacuum_analyze")
+
+            if reindex and await self.is_index_existed(collection_name=collection_name):
+                index_name = self.default_index_name(collection_name)
+                self.logger.info(f"REINDEX CONCURRENTLY index: {index_name}")
+                await connection.execute(sql_text(f'REINDEX INDEX CONCURRENTLY {index_name}'))
+                actions.append("reindex")
+
+        return {"actions": actions}
+
+    async def iter_records(self, collection_name: str, batch_size: int = 500, offset=None):
+
+        is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
+        if not is_collection_existed:
+            return
+
+        # keyset over the primary key, the offset is the last seen id
+        last_id = offset or 0
+        while True:
+            async with self.db_client() as session:
+                async with session.begin():
+                    page_sql = sql_text(f'SELECT v.{PgVectorTableSchemeEnums.ID.value} AS id, '
+                                        f'v.{PgVectorTableSchemeEnums.CHUNK_ID.value} AS chunk_id, '
+                                        f'v.{PgVectorTableSchemeEnums.TEXT.value} AS text, '
+                                        f'v.{PgVectorTableSchemeEnums.VECTOR.value}::text AS vector, '
+                                        f'v.{PgVectorTableSchemeEnums.METADATA.value} AS metadata, '
+                                        'c.chunk_asset_id AS asset_id '
+                                        f'FROM {collection_name} AS v '
+                                        f'LEFT JOIN chunks AS c ON c.chunk_id = v.{PgVectorTableSchemeEnums.CHUNK_ID.value} '
+                                        f'WHERE v.{PgVectorTableSchemeEnums.ID.value} > :last_id '
+                                        f'ORDER BY v.{PgVectorTableSchemeEnums.ID.value} '
+                                        'LIMIT :batch_size')
+                    result = await session.execute(page_sql, {"last_id": last_id, "batch_size": batch_size})
+                    rows = result.fetchall()
+
+            if not rows:
+                return
+
+            records = [
+                {
+                    "id": row.chunk_id,
+                    "vector": json.loads(row.vector),
+                    "text": row.text,
+                    "metadata": json.loads(row.metadata) if isinstance(row.metadata, str) else row.metadata,
+                    "asset_id": row.asset_id,
+                }
+                for row in rows
+            ]
+            last_id = rows[-1].id
+
+            yield records, last_id
+
+            if len(rows) < batch_size:
+                return
+
     async def search_by_vector(self, collection_name: str, vector: list, limit: int):
 
         is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
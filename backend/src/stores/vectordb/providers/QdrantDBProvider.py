@@ -92,11 +92,15 @@ class QdrantDBProvider(VectorDBInterface):
     
     async def insert_many(self, collection_name: str, texts: list, 
                           vectors: list, metadata: list = None, 
-                          record_ids: list = None, batch_size: int = 50):
+                          record_ids: list = None, batch_size: int = 50,
+                          asset_ids: list = None):
         
         if metadata is None:
             metadata = [None] * len(texts)
 
+        if asset_ids is None:
+            asset_ids = [None] * len(texts)
+
         if record_ids is None:
             record_ids = list(range(0, len(texts)))
 
@@ -107,13 +111,15 @@ class QdrantDBProvider(VectorDBInterface):
             batch_vectors = vectors[i:batch_end]
             batch_metadata = metadata[i:batch_end]
             batch_record_ids = record_ids[i:batch_end]
+            batch_asset_ids = asset_ids[i:batch_end]
 
             batch_records = [
                 models.Record(
                     id=batch_record_ids[x],
                     vector=batch_vectors[x],
                     payload={
-                        "text": batch_texts[x], "metadata": batch_metadata[x]
+                        "text": batch_texts[x], "metadata": batch_metadata[x],
+                        "asset_id": batch_asset_ids[x]
                     }
                 )
 
@@ -131,6 +137,137 @@ class QdrantDBProvider(VectorDBInterface):
 
         return True
         
+    async def delete_by_chunk_ids(self, collection_name: str, chunk_ids: list) -> int:
+
+        if not chunk_ids or not await self.is_collection_existed(collection_name):
+            return 0
+
+        existing_ids = [
+            point.id
+            for point in self.client.retrieve(
+                collection_name=collection_name,
+                ids=list(chunk_ids),
+                with_payload=False,
+                with_vectors=False,
+            )
+        ]
+        if not existing_ids:
+            return 0
+
+        _ = self.client.delete(
+            collection_name=collection_name,
+            points_selector=models.PointIdsList(points=existing_ids),
+        )
+
+        return len(existing_ids)
+
+    async def get_records_by_chunk_ids(self, collection_name: str, chunk_ids: list) -> List[dict]:
+
+        if not chunk_ids or not await self.is_collection_existed(collection_name):
+            return []
+
+        points = self.client.retrieve(
+            collection_name=collection_name,
+            ids=list(chunk_ids),
+            with_payload=True,
+            with_vectors=True,
+        )
+
+        return [
+            {
+                "id": point.id,
+                "vector": list(point.vector),
+                "text": point.payload.get("text"),
+                "metadata": point.payload.get("metadata"),
+                "asset_id": point.payload.get("asset_id"),
+            }
+            for point in points
+        ]
+
+    async def delete_by_asset(self, collection_name: str, asset_id: int) -> int:
+
+        if not await self.is_collection_existed(collection_name):
+            return 0
+
+        asset_filter = models.Filter(
+            must=[
+                models.FieldCondition(key="asset_id", match=models.MatchValue(value=asset_id))
+            ]
+        )
+
+        deleted_count = self.client.count(
+            collection_name=collection_name,
+            count_filter=asset_filter,
+            exact=True,
+        ).count
+
+        _ = self.client.delete(
+            collection_name=collection_name,
+            points_selector=models.FilterSelector(filter=asset_filter),
+        )
+
+        self.logger.info(f"Deleted {deleted_count} vectors of asset {asset_id} from {collection_name}")
+        return deleted_count
+
+    async def get_maintenance_stats(self, collection_name: str) -> dict:
+
+        if not await self.is_collection_existed(collection_name):
+            return None
+
+        info = self.client.get_collection(collection_name=collection_name)
+
+        # the embedded client (local path) has no optimizers, no segments to
+        # merge and no deleted point counts: there is nothing to trigger
+        return {
+            "live_rows": info.points_count or 0,
+            "dead_rows": None,
+            "dead_ratio": None,
+            "segments": info.segments_count,
+            "status": info.status.value,
+            "maintenance_supported": False,
+            "maintenance_note": "embedded Qdrant runs no optimizers, deleted points are dropped when the collection is reopened",
+            "needs_optimization": False,
+        }
+
+    async def run_maintenance(self, collection_name: str, vacuum: bool = True, reindex: bool = False) -> dict:
+
+        # see get_maintenance_stats
+        return {"actions": [], "maintenance_supported": False}
+
+    async def iter_records(self, collection_name: str, batch_size: int = 500, offset=None):
+
+        if not await self.is_collection_existed(collection_name):
+            return
+
+        while True:
+            points, next_offset = self.client.scroll(
+                collection_name=collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+
+            if not points:
+                return
+
+            records = [
+                {
+                    "id": point.id,
+                    "vector": list(point.vector),
+                    "text": point.payload.get("text"),
+                    "metadata": point.payload.get("metadata"),
+                    "asset_id": point.payload.get("asset_id"),
+                }
+                for point in points
+            ]
+
+            yield records, next_offset
+
+            if next_offset is None:
+                return
+            offset = next_offset
+
     async def search_by_vector(self, collection_name: str, vector: list, limit: int = 5):
 
         results = self.client.search(
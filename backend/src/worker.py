@@ -0,0 +1,154 @@
+"""
+Run tasks of the Postgres job queue (JOBS_BACKEND="postgres").
+
+Usage (from backend/src):
+    python worker.py
+    python worker.py --concurrency 2 --tasks process_project
+
+Start as many workers as needed, on any node that can reach Postgres and the
+vector db: tasks are claimed with SELECT ... FOR UPDATE SKIP LOCKED, and a
+task whose worker stops heartbeating is handed to another one.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from helpers.config import get_settings
+from helpers.idempotency_manager import IdempotencyManager
+from helpers.job_manager import JobFailedError, job_response
+from helpers.project_activity import ProjectActivityRegistry
+from helpers.task_worker import TaskWorker
+from models.ProjectModel import ProjectModel
+from models.enums.TaskNameEnum import TaskNameEnum
+from routes.data import get_project_files_ids, run_process_assets
+from routes.nlp import run_index_project
+from routes.schemes.data import ProcessRequest
+from routes.schemes.nlp import PushRequest
+from stores.llm.LLMProviderFactory import LLMProviderFactory
+from stores.llm.templates.template_parser import TemplateParser
+from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
+
+
+async def create_worker_app(settings):
+    """The subset of the API app state that the ingestion functions use."""
+    postgres_conn = f"postgresql+asyncpg://{settings.POSTGRES_USERNAME}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_MAIN_DATABASE}"
+
+    app = SimpleNamespace()
+    app.db_engine = create_async_engine(postgres_conn)
+    app.db_client = sessionmaker(app.db_engine, class_=AsyncSession, expire_on_commit=False)
+
+    llm_provider_factory = LLMProviderFactory(settings)
+    app.generation_client = llm_provider_factory.create(provider=settings.GENERATION_BACKEND)
+    app.generation_client.set_generation_model(model_id=settings.GENERATION_MODEL_ID)
+    app.embedding_client = llm_provider_factory.create(provider=settings.EMBEDDING_BACKEND)
+    app.embedding_client.set_embedding_model(model_id=settings.EMBEDDING_MODEL_ID,
+                                             embedding_size=settings.EMBEDDING_MODEL_SIZE)
+
+    app.vectordb_client = VectorDBProviderFactory(config=settings, db_client=app.db_client, db_engine=app.db_engine).create(
+        provider=settings.VECTOR_DB_BACKEND
+    )
+    await app.vectordb_client.connect()
+
+    app.template_parser = TemplateParser(
+        language=settings.PRIMARY_LANG,
+        default_language=settings.DEFAULT_LANG,
+    )
+    app.project_activity = ProjectActivityRegistry(db_engine=app.db_engine)
+
+    app.process_pool = None
+    if settings.PROCESSING_POOL_WORKERS > 0:
+        app.process_pool = ProcessPoolExecutor(
+            max_workers=settings.PROCESSING_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    return app
+
+
+async def close_worker_app(app):
+    if app.process_pool is not None:
+        app.process_pool.shutdown(wait=False, cancel_futures=True)
+    await app.vectordb_client.disconnect()
+    await app.db_engine.dispose()
+
+
+def create_handlers(app, settings):
+
+    async def get_project(project_id: int):
+        project_model = await ProjectModel.create_instance(db_client=app.db_client)
+        return await project_model.get_project_or_create_one(project_id=project_id)
+
+    async def process_project(task_args: dict, job):
+        process_request = ProcessRequest(**task_args)
+        project = await get_project(task_args["project_id"])
+
+        project_files_ids, skipped_files, error_signal = await get_project_files_ids(
+            app, project, process_request
+        )
+        if error_signal is not None:
+            raise JobFailedError(error_signal, result={"signal": error_signal})
+        if task_args.get("asset_ids") is not None:
+            target_asset_ids = set(task_args["asset_ids"])
+            project_files_ids = {
+                asset_id: file_id for asset_id, file_id in project_files_ids.items()
+                if asset_id in target_asset_ids
+            }
+        if len(project_files_ids) == 0:
+            return {"processed_files": 0, "skipped_files": skipped_files}
+
+        return await job_response(run_process_assets(app, project, project_files_ids, process_request, job=job))
+
+    async def index_project(task_args: dict, job):
+        push_request = PushRequest(**task_args)
+        project = await get_project(task_args["project_id"])
+        return await job_response(run_index_project(app, project, push_request, settings, job=job))
+
+    return {
+        TaskNameEnum.PROCESS_PROJECT.value: process_project,
+        TaskNameEnum.INDEX_PROJECT.value: index_project,
+    }
+
+
+async def main(args):
+    settings = get_settings()
+    app = await create_worker_app(settings)
+
+    handlers = create_handlers(app, settings)
+    if args.tasks:
+        handlers = { name: handler for name, handler in handlers.items() if name in args.tasks }
+
+    worker = TaskWorker(
+        idempotency_manager=IdempotencyManager(db_client=app.db_client, db_engine=app.db_engine),
+        handlers=handlers,
+        concurrency=args.concurrency or settings.TASK_WORKER_CONCURRENCY,
+        poll_interval=settings.TASK_WORKER_POLL_INTERVAL,
+        heartbeat_interval=settings.TASK_HEARTBEAT_INTERVAL,
+        stale_seconds=settings.TASK_STALE_SECONDS,
+        max_attempts=settings.TASK_MAX_ATTEMPTS,
+        retention_seconds=settings.TASK_RETENTION_SECONDS,
+        cleanup_batch_size=settings.TASK_CLEANUP_BATCH_SIZE,
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        await close_worker_app(app)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run tasks of the Postgres job queue")
+    parser.add_argument("--concurrency", type=int, default=None, help="tasks run at the same time")
+    parser.add_argument("--tasks", nargs="*", default=None,
+                        choices=[ task.value for task in TaskNameEnum ],
+                        help="only run these task names")
+    asyncio.run(main(parser.parse_args()))
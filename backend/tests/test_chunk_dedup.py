@@ -0,0 +1,54 @@
+import random
+
+from helpers.chunk_dedup import ChunkDeduplicator
+
+WORDS = ["alpha", "beta", "gamma", "delta", "omega", "sigma", "kappa", "theta", "zeta", "tau"]
+
+
+def make_text(seed: int, length: int = 200) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def test_exact_duplicates_ignore_case_spacing_and_numbers():
+    deduplicator = ChunkDeduplicator()
+
+    assert deduplicator.check_and_add("Confidential - Page 3 of 40") is None
+    assert deduplicator.check_and_add("CONFIDENTIAL  page 4 of 40") == "exact"
+    assert deduplicator.get_stats()["exact_duplicates"] == 1
+
+
+def test_near_duplicates_are_collapsed_distinct_texts_kept():
+    deduplicator = ChunkDeduplicator(threshold=0.9)
+    text = make_text(seed=1)
+    words = text.split()
+    words[100] = "disclaimer"
+
+    assert deduplicator.check_and_add(text) is None
+    assert deduplicator.check_and_add(" ".join(words)) == "near"
+    assert deduplicator.check_and_add(make_text(seed=2)) is None
+    assert deduplicator.collapsed == 1
+
+
+def test_seeded_texts_are_not_counted():
+    deduplicator = ChunkDeduplicator()
+    deduplicator.seed([make_text(seed=3), make_text(seed=3)])
+
+    assert deduplicator.collapsed == 0
+    assert deduplicator.check_and_add(make_text(seed=3)) == "exact"
+
+
+def test_stored_fingerprints_seed_like_texts_and_keep_owners():
+    deduplicator = ChunkDeduplicator()
+    fingerprints = [ deduplicator.fingerprint(text) for text in (make_text(seed=4), "Page 1", "- -") ]
+    assert (len(fingerprints[2]), len(fingerprints[0])) == deduplicator.fingerprint_sizes()
+
+    seeded = ChunkDeduplicator()
+    seeded.seed_fingerprints(fingerprints, owners=[7, 8, 8])
+    words = make_text(seed=4).split()
+    words[50] = "disclaimer"
+
+    assert seeded.check_and_add(" ".join(words), owner=9) == "near"
+    assert seeded.check_and_add("page 2", owner=9) == "exact"
+    assert seeded.matched_owners == {7, 8}
+    assert seeded.collapsed == 2
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("sqlalchemy")
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+IMPORT_BUDGET_SECONDS = float(os.environ.get("IMPORT_BUDGET_SECONDS", "10"))
+HEAVY_MODULES = ("torch", "transformers", "sentence_transformers", "langchain_ollama", "pandas")
+
+
+def test_import_main_is_lean_and_within_budget():
+    script = (
+        "import sys; import main; "
+        "print('heavy:' + ','.join(m for m in sys.argv[1:] if m in sys.modules))"
+    )
+
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", script, *HEAVY_MODULES],
+        cwd=SRC_DIR, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+
+    if result.returncode != 0 and "ModuleNotFoundError" in result.stderr:
+        pytest.skip(f"API dependencies are not installed: {result.stderr.strip().splitlines()[-1]}")
+    assert result.returncode == 0, result.stderr
+
+    heavy_line = [ line for line in result.stdout.splitlines() if line.startswith("heavy:") ][-1]
+    assert heavy_line == "heavy:", f"imported at startup: {heavy_line[len('heavy:'):]}"
+    assert elapsed < IMPORT_BUDGET_SECONDS
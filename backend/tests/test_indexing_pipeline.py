@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import pytest
+
+from helpers.indexing_pipeline import BatchFeed, IndexingPipeline
+
+
+async def pages(n_pages: int, page_size: int, delay: float = 0.0):
+    for p in range(n_pages):
+        if delay:
+            await asyncio.sleep(delay)
+        yield [p * page_size + i for i in range(page_size)]
+
+
+def test_pipeline_moves_every_item_and_reports_stats():
+    inserted = []
+
+    async def embed(batch):
+        return [[float(x)] for x in batch]
+
+    async def insert(batch, vectors):
+        inserted.extend(zip(batch, vectors))
+        return True
+
+    pipeline = IndexingPipeline(source=pages(5, 4), embed_fn=embed, insert_fn=insert,
+                                embed_workers=3, queue_size=2)
+    stats = asyncio.run(pipeline.run())
+
+    assert sorted(i for i, _ in inserted) == list(range(20))
+    assert all(v == [float(i)] for i, v in inserted)
+    assert stats.fetch.items == stats.embed.items == stats.insert.items == 20
+    assert stats.insert.batches == 5
+    assert stats.to_dict()["embed"]["workers"] == 3
+
+
+def test_pipeline_overlaps_stages():
+    # 4 batches, each stage costs 0.05s per batch: sequential would take ~0.6s
+    async def embed(batch):
+        await asyncio.sleep(0.05)
+        return [[0.0]] * len(batch)
+
+    async def insert(batch, vectors):
+        await asyncio.sleep(0.05)
+        return True
+
+    pipeline = IndexingPipeline(source=pages(4, 2, delay=0.05), embed_fn=embed, insert_fn=insert,
+                                embed_workers=2, queue_size=2)
+    started = time.perf_counter()
+    asyncio.run(pipeline.run())
+    assert time.perf_counter() - started < 0.45
+
+
+def test_pipeline_stops_when_insert_fails():
+    async def embed(batch):
+        return [[0.0]] * len(batch)
+
+    async def insert(batch, vectors):
+        return False
+
+    pipeline = IndexingPipeline(source=pages(10, 2), embed_fn=embed, insert_fn=insert)
+    with pytest.raises(RuntimeError):
+        asyncio.run(pipeline.run())
+
+
+def test_fed_pipeline_applies_backpressure_and_releases_producer_on_failure():
+    async def slow_embed(batch):
+        await asyncio.sleep(0.01)
+        return [[0.0]] * len(batch)
+
+    async def insert(batch, vectors):
+        return True
+
+    async def failing_insert(batch, vectors):
+        return False
+
+    async def scenario(insert_fn):
+        feed = BatchFeed(max_batches=1)
+        pipeline = IndexingPipeline(source=feed, embed_fn=slow_embed, insert_fn=insert_fn,
+                                    embed_workers=1, queue_size=1)
+        task = asyncio.create_task(pipeline.run())
+
+        fed, producer_error = 0, None
+        try:
+            for i in range(20):
+                await feed.put([i])
+                fed += 1
+                # only a few batches can be ahead of the embedding stage
+                assert fed - pipeline.stats.embed.batches <= 5
+        except RuntimeError as e:
+            producer_error = e
+        await feed.close()
+        stats = await asyncio.gather(task, return_exceptions=True)
+        return fed, producer_error, stats[0]
+
+    fed, producer_error, stats = asyncio.run(scenario(insert))
+    assert fed == 20 and producer_error is None
+    assert stats.insert.items == 20
+
+    fed, producer_error, error = asyncio.run(scenario(failing_insert))
+    assert fed < 20 and isinstance(producer_error, RuntimeError)
+    assert isinstance(error, RuntimeError)
@@ -0,0 +1,100 @@
+import asyncio
+
+from helpers.job_manager import JobManager, job_response
+
+
+def test_job_reports_progress_and_result():
+
+    async def scenario():
+        manager = JobManager()
+
+        async def work(job):
+            job.update(total_chunks=4)
+            for _ in range(4):
+                job.advance(chunks=1)
+                await asyncio.sleep(0)
+            return {"signal": "done"}
+
+        job = manager.submit(job_type="index", project_id=1, work=work)
+        await job.task
+        return job.to_dict()
+
+    state = asyncio.run(scenario())
+    assert state["status"] == "completed"
+    assert state["processed_chunks"] == 4
+    assert state["result"] == {"signal": "done"}
+    assert state["eta_seconds"] is None
+
+
+def test_error_response_fails_job_and_keeps_content():
+
+    async def scenario():
+        manager = JobManager()
+
+        async def failing_response():
+            return 400, {"signal": "processing_failed", "failed_files": ["a.pdf"]}
+
+        job = manager.submit(job_type="process", project_id=1,
+                             work=lambda job: job_response(failing_response()))
+        await job.task
+        return job.to_dict()
+
+    state = asyncio.run(scenario())
+    assert state["status"] == "failed"
+    assert state["error"] == "processing_failed"
+    assert state["result"]["failed_files"] == ["a.pdf"]
+
+
+def test_running_job_can_be_cancelled():
+
+    async def scenario():
+        manager = JobManager()
+        started = asyncio.Event()
+
+        async def work(job):
+            started.set()
+            await asyncio.sleep(60)
+
+        job = manager.submit(job_type="process", project_id=1, work=work)
+        await started.wait()
+        assert manager.cancel(job.job_id)
+        await asyncio.gather(job.task, return_exceptions=True)
+        return job.status, manager.cancel(job.job_id)
+
+    status, cancelled_again = asyncio.run(scenario())
+    assert status == "cancelled"
+    assert cancelled_again is False
+
+
+def test_cancelled_job_drops_its_queued_pool_calls():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    release = threading.Event()
+    ran = []
+
+    def extract(file_id):
+        ran.append(file_id)
+        release.wait(timeout=2)
+
+    async def scenario():
+        manager = JobManager()
+
+        async def work(job):
+            # asyncio.wait leaves the calls running when the job is cancelled
+            await asyncio.wait([ job.run_in_pool(pool, extract, file_id) for file_id in ("a", "b", "c") ])
+
+        job = manager.submit(job_type="process", project_id=1, work=work)
+        while not ran:
+            await asyncio.sleep(0.01)
+        assert manager.cancel(job.job_id)
+        await asyncio.gather(job.task, return_exceptions=True)
+        release.set()
+        return job.status
+
+    try:
+        assert asyncio.run(scenario()) == "cancelled"
+    finally:
+        pool.shutdown(wait=True)
+    assert ran == ["a"]
@@ -0,0 +1,53 @@
+import io
+
+import pytest
+
+pytest.importorskip("pptx")
+
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Inches
+
+import Extractore.image as image_module
+from Extractore.pptx import PPTExtractor
+
+
+@pytest.fixture
+def deck_with_picture(tmp_path):
+    presentation = Presentation()
+    for i in range(3):
+        slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+        slide.shapes.title.text = f"Title {i + 1}"
+        slide.placeholders[1].text = f"Body text of slide {i + 1}"
+        if i == 1:
+            picture = io.BytesIO()
+            Image.new("RGB", (400, 300), "white").save(picture, format="PNG")
+            picture.seek(0)
+            slide.shapes.add_picture(picture, Inches(1), Inches(1), Inches(5), Inches(4))
+    path = tmp_path / "deck.pptx"
+    presentation.save(path)
+    return str(path)
+
+
+def test_failing_picture_only_loses_its_text(deck_with_picture, monkeypatch):
+    def failing_ocr(img, ocr_engine="tesseract"):
+        raise RuntimeError("tesseract is not installed")
+
+    monkeypatch.setattr(image_module, "extract_text_from_ocr", failing_ocr)
+
+    extractor = PPTExtractor(deck_with_picture, chart_from_image=False, image_cache_path=None)
+    extractor.extract()
+
+    assert [ slide.slide_number for slide in extractor.slides ] == [1, 2, 3]
+
+
+def test_failing_inference_keeps_the_slides(deck_with_picture, monkeypatch):
+    def broken_inference(self, blobs):
+        raise RuntimeError("model failed to load")
+
+    monkeypatch.setattr(PPTExtractor, "infer_image_texts", broken_inference)
+
+    extractor = PPTExtractor(deck_with_picture, image_cache_path=None)
+    extractor.extract()
+
+    assert [ slide.slide_number for slide in extractor.slides ] == [1, 2, 3]
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("pptx")
+pytest.importorskip("langchain_ollama")
+
+from pptx import Presentation
+
+from Extractore.pptx2 import PPTSummarizer
+
+SYSTEM_PROMPT = "Summarize the slide."
+
+
+class StandInOllamaHandler(BaseHTTPRequestHandler):
+    """Answers /api/generate like Ollama, later slides answering first."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.prompts.append(body["prompt"])
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+
+        slide_number = int(re.search(r"Slide Number (\d+)", body["prompt"]).group(1))
+        time.sleep(0.05 * (5 - slide_number))
+
+        with server.lock:
+            server.active -= 1
+
+        lines = [
+            {"model": body["model"], "created_at": "2024-01-01T00:00:00Z",
+             "response": f"summary of slide {slide_number}", "done": False},
+            {"model": body["model"], "created_at": "2024-01-01T00:00:00Z",
+             "response": "", "done": True, "done_reason": "stop"},
+        ]
+        payload = ("\n".join(json.dumps(line) for line in lines) + "\n").encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ollama_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInOllamaHandler)
+    server.lock = threading.Lock()
+    server.prompts = []
+    server.active = 0
+    server.max_active = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def deck_path(tmp_path):
+    presentation = Presentation()
+    for i in range(4):
+        slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+        slide.shapes.title.text = f"Title {i + 1}"
+        slide.placeholders[1].text = f"Body text of slide {i + 1}"
+    path = tmp_path / "deck.pptx"
+    presentation.save(path)
+    return str(path)
+
+
+def make_summarizer(deck_path, ollama_server, cache_path):
+    return PPTSummarizer(
+        deck_path,
+        extract_from_image=False,
+        ollama_base_url=f"http://127.0.0.1:{ollama_server.server_address[1]}",
+        summary_cache_path=cache_path,
+        summary_concurrency=2,
+    )
+
+
+def test_summaries_are_concurrent_ordered_and_cached(deck_path, ollama_server, tmp_path):
+    cache_path = str(tmp_path / "summaries.sqlite")
+
+    summarizer = make_summarizer(deck_path, ollama_server, cache_path)
+    summaries = asyncio.run(summarizer.asummarize(summarize_model="stand-in"))
+
+    assert [ s["Slide Number"] for s in summaries ] == [1, 2, 3, 4]
+    assert [ s["Summary"] for s in summaries ] == [ f"summary of slide {i}" for i in range(1, 5) ]
+    assert len(ollama_server.prompts) == 4
+    assert ollama_server.max_active == 2
+
+    # the system prompt is part of the cache key, then a second run is served from the cache
+    summarizer = make_summarizer(deck_path, ollama_server, cache_path)
+    streamed = list(summarizer.summarize_stream(summarize_model="stand-in", system_prompt=SYSTEM_PROMPT))
+    assert len(ollama_server.prompts) == 8
+    streamed_again = list(summarizer.summarize_stream(summarize_model="stand-in", system_prompt=SYSTEM_PROMPT))
+    assert len(ollama_server.prompts) == 8
+    assert streamed == streamed_again
+    assert [ s["Slide Number"] for s in streamed ] == [1, 2, 3, 4]
+
+
+def test_failing_summaries_leave_no_partial_summary_chunks(deck_path, monkeypatch):
+    import importlib
+    process_module = importlib.import_module("controllers.ProcessController")
+    Document, extract_file_chunks = process_module.Document, process_module.extract_file_chunks
+
+    def summaries_then_failure(self, file_id):
+        yield Document(page_content="summary of slide 1", metadata={"page": 1})
+        raise ConnectionError("ollama went away")
+
+    monkeypatch.setenv("CHUNK_TOKENIZER", "")
+    monkeypatch.setattr(process_module.ProjectController, "get_project_path",
+                        lambda self, project_id: os.path.dirname(deck_path))
+    monkeypatch.setattr(process_module.ProcessController, "iter_file_summaries", summaries_then_failure)
+
+    spool_path, chunks_count, summary_error = extract_file_chunks(1, "deck.pptx", 100, 20, with_summaries=True)
+    chunks = [ chunk for page in process_module.iter_spooled_chunks(spool_path) for chunk in page ]
+    os.remove(spool_path)
+
+    assert chunks_count == 4
+    assert [ metadata["page"] for _, metadata in chunks ] == [1, 2, 3, 4]
+    assert "summary of slide 1" not in [ text for text, _ in chunks ]
+    assert summary_error == "ollama went away"
+
+
+def test_long_slides_are_split_within_the_embedding_limit(tmp_path, monkeypatch):
+    import importlib
+    process_module = importlib.import_module("controllers.ProcessController")
+
+    presentation = Presentation()
+    slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+    slide.shapes.title.text = "Long slide"
+    slide.placeholders[1].text = " ".join(f"word{i}" for i in range(100))
+    presentation.save(tmp_path / "long.pptx")
+
+    monkeypatch.setenv("CHUNK_TOKENIZER", "")
+    monkeypatch.setenv("CHUNK_MAX_TOKENS", "40")
+    monkeypatch.setenv("CHUNK_TOKENS_PER_WORD", "2")
+    monkeypatch.setattr(process_module.ProjectController, "get_project_path",
+                        lambda self, project_id: str(tmp_path))
+
+    spool_path, _, _ = process_module.extract_file_chunks(1, "long.pptx", 100, 0)
+    pages = list(process_module.iter_spooled_chunks(spool_path, page_size=2))
+    os.remove(spool_path)
+    chunks = [ chunk for page in pages for chunk in page ]
+
+    assert len(chunks) > 2
+    assert all( len(page) <= 2 for page in pages )
+    assert all( metadata["chunk_tokens"] <= 20 for _, metadata in chunks )
+    assert all( metadata["asset_name"] == "long.pptx" for _, metadata in chunks )
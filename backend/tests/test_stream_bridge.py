@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from helpers.stream_bridge import StreamCapacityError, StreamExecutor, iterate_in_thread
+
+
+def test_early_stop_closes_the_blocking_iterator():
+    produced = []
+    closed = threading.Event()
+
+    def tokens():
+        try:
+            for i in range(100):
+                time.sleep(0.005)
+                produced.append(i)
+                yield f"tok{i}"
+        finally:
+            closed.set()
+
+    async def consume():
+        received = []
+        async for token in iterate_in_thread(tokens):
+            received.append(token)
+            if len(received) == 3:
+                break
+        return received
+
+    assert asyncio.run(consume()) == ["tok0", "tok1", "tok2"]
+    assert closed.wait(timeout=2)
+    assert len(produced) < 10
+
+
+def test_errors_of_the_iterator_are_raised_to_the_consumer():
+    def failing():
+        yield "first"
+        raise ValueError("provider error")
+
+    async def consume():
+        received = []
+        async for token in iterate_in_thread(failing):
+            received.append(token)
+        return received
+
+    with pytest.raises(ValueError, match="provider error"):
+        asyncio.run(consume())
+
+
+def test_stream_executor_refuses_streams_past_its_threads():
+    executor = StreamExecutor(max_streams=1)
+    release_first = threading.Event()
+
+    def slow_tokens():
+        yield "first"
+        release_first.wait(timeout=2)
+        yield "last"
+
+    async def consume():
+        first_stream = iterate_in_thread(slow_tokens, executor=executor)
+        assert await first_stream.__anext__() == "first"
+
+        with pytest.raises(StreamCapacityError):
+            await iterate_in_thread(slow_tokens, executor=executor).__anext__()
+
+        release_first.set()
+        assert [ token async for token in first_stream ] == ["last"]
+        return [ token async for token in iterate_in_thread(lambda: iter(["again"]), executor=executor) ]
+
+    try:
+        assert asyncio.run(consume()) == ["again"]
+        assert not executor.is_saturated
+    finally:
+        executor.shutdown()
@@ -0,0 +1,144 @@
+import asyncio
+from types import SimpleNamespace
+
+from helpers.job_manager import JobFailedError
+from helpers.task_worker import TaskWorker
+
+
+class FakeQueue:
+    def __init__(self, tasks):
+        self.pending = list(tasks)
+        self.finished = {}
+        self.owner = {}
+        self.cancel_requested = set()
+        self.released = []
+        self.heartbeats = []
+
+    async def dequeue_task(self, worker_id, task_names=None):
+        if not self.pending:
+            return None
+        task_record = self.pending.pop(0)
+        self.owner[task_record.execution_id] = worker_id
+        return task_record
+
+    async def heartbeat(self, execution_id, worker_id, progress=None):
+        self.heartbeats.append((execution_id, progress))
+        return self.owner.get(execution_id) == worker_id, execution_id in self.cancel_requested
+
+    async def update_task_status(self, execution_id, status, result=None, error=None,
+                                 worker_id=None, progress=None):
+        self.finished[execution_id] = (status, result, error, progress)
+        return True
+
+    async def release_task(self, execution_id, worker_id):
+        self.released.append(execution_id)
+        return True
+
+    async def requeue_stuck_tasks(self, stale_seconds, max_attempts):
+        return 0
+
+    async def cleanup_old_tasks(self, time_retention, batch_size):
+        return 0
+
+
+def make_task(execution_id, task_name="index_project"):
+    return SimpleNamespace(execution_id=execution_id, task_name=task_name, task_args={"project_id": 1})
+
+
+def run_worker(queue, handlers):
+    worker = TaskWorker(idempotency_manager=queue, handlers=handlers, poll_interval=0.01,
+                        heartbeat_interval=0.01)
+
+    async def scenario():
+        runner = asyncio.create_task(worker.run())
+        # the last task is reported once both were handled
+        while queue.finished.get(2, ("PENDING",))[0] not in ("SUCCESS", "FAILURE"):
+            await asyncio.sleep(0.01)
+        worker.stop()
+        await runner
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+    return worker
+
+
+def test_worker_reports_success_failure_and_progress():
+    queue = FakeQueue([make_task(1), make_task(2)])
+
+    async def handler(task_args, job):
+        if len(queue.finished) == 1:
+            raise JobFailedError("processing_failed", result={"signal": "processing_failed"})
+        job.update(total_chunks=2)
+        job.advance(chunks=2)
+        return {"signal": "ok"}
+
+    run_worker(queue, {"index_project": handler})
+
+    assert queue.finished[1] == ("SUCCESS", {"signal": "ok"}, None,
+                                 {"total_files": 0, "processed_files": 0, "total_chunks": 2, "processed_chunks": 2})
+    assert queue.finished[2][0] == "FAILURE"
+    assert queue.finished[2][2] == "processing_failed"
+
+
+def test_worker_abandons_task_when_lease_is_lost():
+    queue = FakeQueue([make_task(1), make_task(2)])
+
+    async def handler(task_args, job):
+        if not queue.finished:
+            queue.finished[2] = ("PENDING",)
+            # another worker reclaimed the task
+            queue.owner[1] = "other-worker"
+            await asyncio.sleep(5)
+        return {"signal": "ok"}
+
+    run_worker(queue, {"index_project": handler})
+
+    assert 1 not in queue.finished
+
+
+def test_worker_reports_cancelled_task_on_cancel_request():
+    queue = FakeQueue([make_task(1), make_task(2, task_name="other")])
+    cancelled = []
+
+    async def handler(task_args, job):
+        queue.cancel_requested.add(1)
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return {"signal": "ok"}
+
+    async def other(task_args, job):
+        return {"signal": "ok"}
+
+    run_worker(queue, {"index_project": handler, "other": other})
+
+    assert cancelled == [True]
+    assert queue.finished[1][0] == "CANCELLED"
+
+
+def test_stopped_worker_hands_running_task_back():
+    queue = FakeQueue([make_task(1)])
+    started = asyncio.Event()
+
+    async def handler(task_args, job):
+        started.set()
+        await asyncio.sleep(5)
+        return {"signal": "ok"}
+
+    worker = TaskWorker(idempotency_manager=queue, handlers={"index_project": handler},
+                        poll_interval=0.01, heartbeat_interval=0.01)
+
+    async def scenario():
+        runner = asyncio.create_task(worker.run())
+        await started.wait()
+        runner.cancel()
+        try:
+            await runner
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    assert asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+    assert queue.released == [1]
+    assert 1 not in queue.finished
@@ -0,0 +1,41 @@
+from helpers.text_splitter import TokenTextSplitter, regex_token_spans
+
+
+def test_chunks_are_token_bounded_and_overlap():
+    text = " ".join(f"word{i}" for i in range(100))
+    splitter = TokenTextSplitter(chunk_size=10, overlap_size=3)
+
+    chunks = splitter.split_text(text)
+    words = [ chunk.split() for chunk, _ in chunks ]
+
+    assert all(len(chunk_words) <= 10 for chunk_words in words)
+    for previous, current in zip(words, words[1:]):
+        assert previous[-3:] == current[:3]
+    # every word is covered, the last chunk is not empty
+    assert words[0][0] == "word0" and words[-1][-1] == "word99"
+
+
+def test_page_metadata_is_carried_to_chunks():
+    pages = [
+        ("first page text here", {"page": 0, "source": "a.pdf"}),
+        ("second page text here", {"page": 1, "source": "a.pdf"}),
+    ]
+    splitter = TokenTextSplitter(chunk_size=6, overlap_size=0)
+
+    chunks = list(splitter.split_pages(pages, extra_metadata={"asset_name": "a.pdf"}))
+
+    assert chunks[0] == ("first page text here\nsecond page", {
+        "asset_name": "a.pdf", "page": 0, "source": "a.pdf", "end_page": 1, "chunk_tokens": 6,
+    })
+    assert chunks[1][0] == "text here"
+    assert chunks[1][1]["page"] == 1
+
+
+def test_cut_prefers_line_breaks_and_skips_empty_input():
+    splitter = TokenTextSplitter(chunk_size=8, overlap_size=0)
+
+    chunks = splitter.split_text("one two three four five six\nseven eight nine ten")
+    assert chunks[0][0] == "one two three four five six"
+
+    assert splitter.split_text("   \n  ") == []
+    assert regex_token_spans("a, b") == [(0, 1), (1, 2), (3, 4)]
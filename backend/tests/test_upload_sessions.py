@@ -0,0 +1,63 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+from helpers.upload_sessions import (
+    UploadOffsetMismatchError,
+    UploadSessionRegistry,
+    UploadSizeExceededError,
+)
+
+
+async def byte_stream(data: bytes, block_size: int = 1000):
+    for start in range(0, len(data), block_size):
+        yield data[start:start + block_size]
+
+
+def test_upload_resumes_after_restart_with_one_pass_digest(tmp_path):
+    data = os.urandom(10_000)
+    project_dir = str(tmp_path)
+
+    async def scenario():
+        registry = UploadSessionRegistry()
+        session = registry.create(project_dir, 1, "deck.pptx", "application/pdf", len(data))
+        await session.append(byte_stream(data[:4_000]), offset=0)
+
+        with pytest.raises(UploadOffsetMismatchError) as mismatch:
+            await session.append(byte_stream(data[:10]), offset=0)
+        assert mismatch.value.offset == 4_000
+
+        # a new process only knows the files on disk
+        registry = UploadSessionRegistry()
+        assert registry.get(project_dir, 2, session.upload_id) is None
+        resumed = registry.get(project_dir, 1, session.upload_id)
+        assert resumed.offset == 4_000
+
+        with pytest.raises(UploadSizeExceededError):
+            await resumed.append(byte_stream(data[4_000:] + b"extra", block_size=6_005), offset=4_000)
+        assert resumed.offset == 4_000
+
+        await resumed.append(byte_stream(data[4_000:]), offset=4_000)
+        assert resumed.is_complete
+
+        file_path = os.path.join(project_dir, "deck.pptx")
+        digest = await resumed.hexdigest()
+        registry.complete(resumed, file_path)
+        return digest, file_path, registry.get(project_dir, 1, session.upload_id)
+
+    digest, file_path, forgotten = asyncio.run(scenario())
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert open(file_path, "rb").read() == data
+    assert forgotten is None
+    assert os.listdir(os.path.join(str(tmp_path), ".uploads")) == []
+
+
+def test_stale_uploads_expire(tmp_path):
+    registry = UploadSessionRegistry(ttl_seconds=60)
+    session = registry.create(str(tmp_path), 1, "a.pdf", "application/pdf", 10)
+    os.utime(session.part_path, (0, 0))
+
+    assert registry.expire_stale(str(tmp_path)) == 1
+    assert registry.get(str(tmp_path), 1, session.upload_id) is None
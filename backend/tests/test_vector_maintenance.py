@@ -0,0 +1,149 @@
+import asyncio
+
+from helpers.project_activity import ProjectActivityRegistry
+from helpers.vector_maintenance import VectorMaintenanceScheduler
+
+
+class FakeVectorDB:
+    def __init__(self, stats):
+        self.stats = stats
+        self.runs = []
+
+    async def get_maintenance_stats(self, collection_name: str):
+        return dict(self.stats)
+
+    async def run_maintenance(self, collection_name: str, vacuum: bool = True, reindex: bool = False):
+        self.runs.append((collection_name, vacuum, reindex))
+        actions = (["vacuum_analyze"] if vacuum else []) + (["reindex"] if reindex else [])
+        return {"actions": actions}
+
+
+def make_scheduler(vectordb, activity=None):
+    async def list_project_ids():
+        return [1]
+
+    return VectorMaintenanceScheduler(
+        vectordb_client=vectordb,
+        list_project_ids=list_project_ids,
+        collection_name_fn=lambda project_id: f"collection_3_{project_id}",
+        activity=activity or ProjectActivityRegistry(),
+        dead_ratio_threshold=0.2,
+        min_dead_rows=10,
+        index_bloat_threshold=0.5,
+    )
+
+
+def test_vacuum_runs_only_above_dead_tuple_threshold():
+    vectordb = FakeVectorDB({"dead_rows": 5, "dead_ratio": 0.5, "index_bytes_per_row": None})
+    scheduler = make_scheduler(vectordb)
+    asyncio.run(scheduler.run_once())
+    assert vectordb.runs == []
+
+    vectordb.stats = {"dead_rows": 50, "dead_ratio": 0.5, "index_bytes_per_row": None}
+    asyncio.run(scheduler.run_once())
+    assert vectordb.runs == [("collection_3_1", True, False)]
+
+
+def test_reindex_when_index_grows_past_baseline():
+    vectordb = FakeVectorDB({"dead_rows": 0, "dead_ratio": 0.0, "index_bytes_per_row": 100.0})
+    scheduler = make_scheduler(vectordb)
+    asyncio.run(scheduler.run_once())
+    assert vectordb.runs == []
+
+    vectordb.stats["index_bytes_per_row"] = 180.0
+    asyncio.run(scheduler.run_once())
+    assert vectordb.runs == [("collection_3_1", False, True)]
+
+
+def test_maintenance_is_skipped_while_project_is_ingesting():
+    vectordb = FakeVectorDB({"dead_rows": 50, "dead_ratio": 0.5})
+    activity = ProjectActivityRegistry()
+    scheduler = make_scheduler(vectordb, activity)
+
+    async def scenario():
+        async with activity.ingestion(1):
+            return await scheduler.run_once()
+
+    status = asyncio.run(scenario())
+    assert vectordb.runs == []
+    assert status["collections"][0]["skipped_busy"] == 1
+
+
+class FakeLockDatabase:
+    """Advisory locks of one Postgres shared by several registries (processes)."""
+
+    def __init__(self):
+        self.shared = {}
+        self.exclusive = set()
+
+    def connect(self):
+        return FakeLockConnection(self)
+
+
+class FakeLockConnection:
+    def __init__(self, database):
+        self.database = database
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def __await__(self):
+        async def connected():
+            return self
+        return connected().__await__()
+
+    async def execute(self, statement, params):
+        key = params["project_id"]
+        function = str(statement).split("SELECT ")[1].split("(")[0]
+        shared, exclusive = self.database.shared, self.database.exclusive
+        if function == "pg_advisory_lock_shared":
+            shared[key] = shared.get(key, 0) + 1
+        elif function == "pg_advisory_unlock_shared":
+            shared[key] -= 1
+        elif function == "pg_try_advisory_lock":
+            is_locked = not shared.get(key) and key not in exclusive
+            if is_locked:
+                exclusive.add(key)
+            return type("Result", (), {"scalar": lambda self: is_locked})()
+        elif function == "pg_advisory_unlock":
+            exclusive.discard(key)
+
+    async def commit(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def invalidate(self):
+        pass
+
+
+def test_maintenance_is_skipped_while_another_process_is_ingesting():
+    vectordb = FakeVectorDB({"dead_rows": 50, "dead_ratio": 0.5})
+    database = FakeLockDatabase()
+    api_activity = ProjectActivityRegistry(db_engine=database)
+    worker_activity = ProjectActivityRegistry(db_engine=database)
+    scheduler = make_scheduler(vectordb, api_activity)
+
+    async def scenario():
+        async with worker_activity.ingestion(1):
+            busy = await scheduler.run_once()
+        idle = await scheduler.run_once()
+        return busy, idle
+
+    busy, idle = asyncio.run(scenario())
+    assert busy["collections"][0]["skipped_busy"] == 1
+    assert vectordb.runs == [("collection_3_1", True, False)]
+    assert database.exclusive == set()
+
+
+def test_unsupported_backend_is_reported_not_run():
+    vectordb = FakeVectorDB({"dead_rows": None, "dead_ratio": None, "maintenance_supported": False})
+    scheduler = make_scheduler(vectordb)
+
+    status = asyncio.run(scheduler.run_once(force=True))
+    assert vectordb.runs == []
+    assert status["collections"][0]["last_action"] == "not_supported"
@@ -0,0 +1,86 @@
+import asyncio
+import math
+
+import pytest
+
+from controllers.VectorMigrationController import VectorMigrationController
+
+
+class InMemoryVectorDB:
+    """iter_records pages like Qdrant: the last page has no next offset."""
+
+    def __init__(self, records=None, normalize=False):
+        self.records = { r["id"]: r for r in (records or []) }
+        self.normalize = normalize
+        self.fail_next_scan = False
+
+    async def create_collection(self, collection_name, embedding_size, do_reset=False):
+        if do_reset:
+            self.records = {}
+
+    async def delete_by_chunk_ids(self, collection_name, chunk_ids):
+        return sum( self.records.pop(chunk_id, None) is not None for chunk_id in chunk_ids )
+
+    async def insert_many(self, collection_name, texts, vectors, metadata, record_ids, asset_ids, batch_size):
+        for text, vector, meta, record_id, asset_id in zip(texts, vectors, metadata, record_ids, asset_ids):
+            if self.normalize:
+                norm = math.sqrt(sum( x * x for x in vector ))
+                vector = [ float(f"{x / norm:.7g}") for x in vector ]
+            self.records[record_id] = {"id": record_id, "vector": vector, "text": text,
+                                       "metadata": meta, "asset_id": asset_id}
+        return True
+
+    async def iter_records(self, collection_name, batch_size=500, offset=None):
+        if self.fail_next_scan:
+            self.fail_next_scan = False
+            raise ConnectionError("destination went away")
+        ids = sorted(self.records)
+        start = ids.index(offset) if offset is not None else 0
+        for i in range(start, len(ids), batch_size):
+            page = ids[i:i + batch_size]
+            next_offset = ids[i + batch_size] if i + batch_size < len(ids) else None
+            yield [ dict(self.records[record_id]) for record_id in page ], next_offset
+
+
+def make_records(count):
+    return [
+        {"id": i, "vector": [ float(i + 1), float(i % 3) + 0.5, 2.0 ], "text": f"chunk {i}",
+         "metadata": {"page": i}, "asset_id": 1}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def migration_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(VectorMigrationController, "get_database_path", lambda self, db_name: str(tmp_path))
+
+
+def test_crash_after_the_last_page_resumes_with_verification_only(migration_dir):
+    source = InMemoryVectorDB(make_records(5))
+    destination = InMemoryVectorDB(normalize=True)
+    controller = VectorMigrationController(source_client=source, destination_client=destination)
+
+    destination.fail_next_scan = True
+    with pytest.raises(ConnectionError):
+        asyncio.run(controller.migrate("a", "b", batch_size=2))
+
+    report = asyncio.run(controller.migrate("a", "b", batch_size=2))
+    assert report["resumed"] is True
+    assert report["migrated"] == report["destination_count"] == 5
+    assert report["verified"] is True
+
+
+def test_changed_vectors_fail_the_verification(migration_dir):
+    source = InMemoryVectorDB(make_records(4))
+    destination = InMemoryVectorDB()
+    controller = VectorMigrationController(source_client=source, destination_client=destination)
+
+    destination.fail_next_scan = True
+    with pytest.raises(ConnectionError):
+        asyncio.run(controller.migrate("a", "b", batch_size=2))
+    destination.records[1]["vector"], destination.records[2]["vector"] = (
+        destination.records[2]["vector"], destination.records[1]["vector"]
+    )
+
+    report = asyncio.run(controller.migrate("a", "b", batch_size=2))
+    assert report["verified"] is False